@@ -0,0 +1,239 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject, RelatedField
+
+from shapeless_serializers.conditions import (
+    BatchCondition,
+    is_context_only,
+    is_expression_condition,
+)
+from shapeless_serializers.exceptions import (
+    DynamicSerializerConfigError,
+    ExcessiveNestingError,
+)
+from shapeless_serializers.optimization import has_default_representation
+
+RENDERER_CACHE_SIZE = 512
+
+# Kinds of output slot of a compiled shape.
+FIELD = "field"
+NESTED = "nested"
+
+# Kinds of condition of a slot.
+INSTANCE_CONDITION = "instance"
+CONTEXT_CONDITION = "context"
+BATCH_CONDITION = "batch"
+EXPRESSION_CONDITION = "expression"
+
+# Globals of the generated code.
+RENDERER_GLOBALS = {
+    "ConfigError": DynamicSerializerConfigError,
+    "ExcessiveNestingError": ExcessiveNestingError,
+    "PKOnlyObject": PKOnlyObject,
+    "SkipField": SkipField,
+}
+
+
+def compile_renderer(serializer: Any) -> Optional[Callable[[Any], Dict[str, Any]]]:
+    """Compile the shape of ``serializer`` into a single-pass render function.
+
+    The returned function builds the final dictionary of an instance directly:
+    keys are already renamed and ordered, conditions are checked before the
+    value is computed and nested branches are written in place. Returns None
+    for shapes the regular ``to_representation`` chain has to handle.
+    """
+    if not has_default_representation(serializer):
+        return None
+
+    layout = get_render_layout(serializer)
+    if layout is None:
+        return None
+
+    binder = _build_binder(*layout)
+
+    plan = serializer.get_shape_plan()
+    return binder(
+        serializer, serializer.fields, dict(plan.conditions), dict(plan.nested)
+    )
+
+
+def get_render_layout(serializer: Any) -> Optional[Tuple[Any, bool]]:
+    """Return the output slots of ``serializer`` in their final order.
+
+    Each slot is ``(kind, name, key, condition, is_related)`` where ``name`` is
+    the field or nested branch, ``key`` its output name and ``condition`` the
+    kind of its condition, if any. Slots replay the key order produced by the
+    mixin chain: readable fields, then nested branches that are not fields,
+    then renamed keys in ``rename_fields`` order. Constant conditions are
+    resolved here.
+    """
+    plan = serializer.get_shape_plan()
+    nested = dict(plan.nested)
+    conditions = dict(plan.conditions)
+
+    slots = {}
+    for field in serializer.fields.values():
+        if field.write_only or field.field_name in plan.write_only_nested:
+            continue
+        slots[field.field_name] = (
+            NESTED if field.field_name in nested else FIELD,
+            isinstance(field, RelatedField),
+        )
+    for name in nested:
+        if name not in slots:
+            slots[name] = (NESTED, False)
+
+    keys = {name: name for name in slots}
+    for old_name, new_name in plan.renames:
+        if old_name not in keys:
+            continue
+        if new_name in keys and new_name != old_name:
+            # Overwriting another key depends on which keys exist per row.
+            return None
+        keys[new_name] = keys.pop(old_name)
+
+    layout = []
+    for key, name in keys.items():
+        kind, is_related = slots[name]
+        condition = conditions.get(name)
+        if is_context_only(condition):
+            condition_kind = CONTEXT_CONDITION
+        elif isinstance(condition, BatchCondition):
+            condition_kind = BATCH_CONDITION
+        elif is_expression_condition(condition):
+            condition_kind = EXPRESSION_CONDITION
+        elif callable(condition):
+            condition_kind = INSTANCE_CONDITION
+        elif condition is None or condition:
+            condition_kind = None
+        else:
+            continue
+        layout.append((kind, name, key, condition_kind, is_related))
+
+    get_aggregates = getattr(serializer, "_get_active_aggregates", None)
+    has_aggregates = bool(get_aggregates()) if get_aggregates is not None else False
+    return tuple(layout), has_aggregates
+
+
+@lru_cache(maxsize=RENDERER_CACHE_SIZE)
+def _build_binder(slots, has_aggregates: bool):
+    """Generate and compile the binder of a layout, once per distinct layout."""
+    source = generate_source(slots, has_aggregates)
+    namespace = dict(RENDERER_GLOBALS)
+    exec(compile(source, "<shapeless renderer>", "exec"), namespace)
+    return namespace["bind"]
+
+
+def generate_source(slots, has_aggregates: bool) -> str:
+    """Return the Python source of the binder of a layout.
+
+    User-provided names only ever appear as ``repr()`` string literals.
+    """
+    has_nested = any(slot[0] == NESTED for slot in slots)
+    condition_kinds = {slot[3] for slot in slots}
+
+    bind = ["def bind(serializer, fields, conditions, branches):"]
+    if has_aggregates:
+        bind.append("    load_aggregates = serializer._load_aggregates")
+    if has_nested:
+        bind += [
+            "    process_instance = serializer._process_nested_instance",
+            "    process_dict = serializer._process_nested_dict",
+            "    represent_base = serializer._represent_base_field",
+            "    max_depth = serializer.MAX_DEPTH",
+        ]
+    if BATCH_CONDITION in condition_kinds:
+        bind.append("    batch_decision = serializer._get_batch_decision")
+    if EXPRESSION_CONDITION in condition_kinds:
+        bind.append("    expression_decision = serializer._get_expression_decision")
+
+    render = ["    def render(instance):"]
+    if has_aggregates:
+        render += [
+            "        if not serializer._aggregates_loaded:",
+            "            load_aggregates([instance])",
+        ]
+    if has_nested:
+        render += [
+            "        if serializer._nesting_level >= max_depth:",
+            "            raise ExcessiveNestingError('Depth exceeds safety margin')",
+        ]
+    if INSTANCE_CONDITION in condition_kinds:
+        render.append("        context = serializer._context")
+    if CONTEXT_CONDITION in condition_kinds:
+        render.append("        context_excluded = serializer._get_context_exclusions()")
+    render.append("        ret = {}")
+
+    for index, (kind, name, key, condition, is_related) in enumerate(slots):
+        indent = "        "
+        if condition == CONTEXT_CONDITION:
+            render.append(f"{indent}if {name!r} not in context_excluded:")
+            indent += "    "
+        elif condition == INSTANCE_CONDITION:
+            bind.append(f"    condition_{index} = conditions[{name!r}]")
+            message = f"Error evaluating condition for field '{name}': "
+            render += [
+                f"{indent}try:",
+                f"{indent}    include = condition_{index}(instance, context)",
+                f"{indent}except Exception as e:",
+                f"{indent}    raise ConfigError({message!r} + str(e))",
+                f"{indent}if include:",
+            ]
+            indent += "    "
+        elif condition == BATCH_CONDITION:
+            bind.append(f"    condition_{index} = conditions[{name!r}]")
+            render.append(
+                f"{indent}if batch_decision({name!r}, condition_{index}, instance):"
+            )
+            indent += "    "
+        elif condition == EXPRESSION_CONDITION:
+            render.append(f"{indent}if expression_decision({name!r}, instance):")
+            indent += "    "
+
+        if kind == NESTED:
+            bind += [
+                f"    branch_{index} = branches[{name!r}]",
+                f"    process_{index} = process_dict"
+                f" if isinstance(branch_{index}, dict) else process_instance",
+            ]
+            if key == name:
+                render += [
+                    f"{indent}process_{index}(instance, {name!r}, branch_{index}, ret)",
+                    f"{indent}if {name!r} not in ret:",
+                    f"{indent}    represent_base(instance, {name!r}, ret)",
+                ]
+            else:
+                render += [
+                    f"{indent}scratch = {{}}",
+                    f"{indent}process_{index}"
+                    f"(instance, {name!r}, branch_{index}, scratch)",
+                    f"{indent}if {name!r} not in scratch:",
+                    f"{indent}    represent_base(instance, {name!r}, scratch)",
+                    f"{indent}if {name!r} in scratch:",
+                    f"{indent}    ret[{key!r}] = scratch[{name!r}]",
+                ]
+            continue
+
+        bind += [
+            f"    get_{index} = fields[{name!r}].get_attribute",
+            f"    represent_{index} = fields[{name!r}].to_representation",
+        ]
+        check = (
+            "value.pk if isinstance(value, PKOnlyObject) else value"
+            if is_related
+            else "value"
+        )
+        render += [
+            f"{indent}try:",
+            f"{indent}    value = get_{index}(instance)",
+            f"{indent}except SkipField:",
+            f"{indent}    pass",
+            f"{indent}else:",
+            f"{indent}    ret[{key!r}] = None if ({check}) is None"
+            f" else represent_{index}(value)",
+        ]
+
+    render.append("        return ret")
+    return "\n".join(bind + render + ["    return render", ""])
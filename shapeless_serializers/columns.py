@@ -0,0 +1,52 @@
+from typing import Any, Dict, Optional
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework.relations import PrimaryKeyRelatedField
+
+
+def get_source_column(model: Any, field: Any) -> Optional[models.Field]:
+    """Return the concrete model field holding the value of ``field``, or None.
+
+    Primary key related fields read the foreign key column when it stores the
+    primary key of the related model. Other relations are not columns.
+    """
+    if len(field.source_attrs) != 1:
+        return None
+
+    source = field.source_attrs[0]
+    if source == "pk":
+        source = model._meta.pk.name
+
+    try:
+        model_field = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+    if not model_field.concrete or model_field.many_to_many:
+        return None
+
+    if type(field) is PrimaryKeyRelatedField:
+        if not model_field.is_relation:
+            return None
+        if model_field.target_field != model_field.related_model._meta.pk:
+            return None
+    elif model_field.is_relation:
+        return None
+    return model_field
+
+
+def move_renamed_keys(rename_fields: Dict[Any, Any], *mappings: Dict[Any, Any]) -> None:
+    """Apply ``rename_fields`` to the keys of ``mappings``, in place.
+
+    The first mapping holds every output key. Renamed keys move to the end, as
+    DynamicFieldRenamingMixin does, and the other mappings follow the first.
+    """
+    keys = mappings[0]
+    for old_name, new_name in rename_fields.items():
+        if old_name not in keys:
+            continue
+        for mapping in mappings:
+            if old_name in mapping:
+                mapping[new_name] = mapping.pop(old_name)
+            else:
+                mapping.pop(new_name, None)
@@ -0,0 +1,112 @@
+from typing import Any, Callable, Dict, List, Tuple
+
+from django.db.models import BooleanField, Case, ExpressionWrapper, F, Q, When
+
+# Annotations holding the result of an expression condition and the value of
+# the column it gates.
+CONDITION_ANNOTATION = "_shapeless_condition_{}"
+GATED_VALUE_ANNOTATION = "_shapeless_value_{}"
+
+
+class ContextCondition:
+    """A condition that only reads the serializer context.
+
+    The wrapped callable keeps the ``(instance, context)`` signature, so it
+    can still be called directly.
+    """
+
+    def __init__(self, func: Callable[[Any, Any], Any]):
+        self.func = func
+
+    def __call__(self, instance: Any, context: Dict[str, Any]) -> Any:
+        return self.func(instance, context)
+
+
+def context_only(condition: Callable[[Any, Any], Any]) -> ContextCondition:
+    """Mark a condition that does not depend on the instance.
+
+    The condition is evaluated once per top-level serialization call, with
+    ``None`` as the instance, instead of once per row:
+
+    .. code-block:: python
+
+        conditional_fields={
+            "view_count": context_only(
+                lambda instance, ctx: ctx["request"].user.is_staff
+            ),
+        }
+    """
+    return ContextCondition(condition)
+
+
+def is_context_only(condition: Any) -> bool:
+    """Whether ``condition`` was marked with ``context_only``."""
+    return isinstance(condition, ContextCondition)
+
+
+class BatchCondition:
+    """Decide the visibility of a field for every instance of a level at once.
+
+    The wrapped callable receives the list of instances and the serializer
+    context, and returns the instances (or primary keys) the field is shown for.
+    """
+
+    def __init__(self, func: Callable[[List[Any], Dict[str, Any]], Any]):
+        self.func = func
+
+    def __call__(self, instances: List[Any], context: Dict[str, Any]) -> Any:
+        return self.func(instances, context)
+
+    def evaluate(
+        self, instances: List[Any], context: Dict[str, Any]
+    ) -> Dict[int, Tuple[Any, bool]]:
+        """Call the condition and return ``(instance, included)`` keyed by ``id()``."""
+        allowed = self(instances, context)
+        if not isinstance(allowed, (set, frozenset, dict)):
+            allowed = set(allowed)
+
+        results = {}
+        for instance in instances:
+            pk = getattr(instance, "pk", None)
+            if pk is not None and pk in allowed:
+                included = True
+            else:
+                try:
+                    included = instance in allowed
+                except TypeError:
+                    included = False
+            results[id(instance)] = (instance, included)
+        return results
+
+
+def batch_condition(func: Callable[[List[Any], Dict[str, Any]], Any]) -> BatchCondition:
+    """Mark a ``conditional_fields`` callable as deciding for a whole level.
+
+    Example::
+
+        @batch_condition
+        def followed_authors(authors, ctx):
+            return set(
+                Follow.objects.filter(
+                    follower=ctx["request"].user, author__in=authors
+                ).values_list("author_id", flat=True)
+            )
+    """
+    return BatchCondition(func)
+
+
+def is_expression_condition(condition: Any) -> bool:
+    """Whether ``condition`` is a ``Q`` object or a boolean query expression."""
+    return hasattr(condition, "resolve_expression")
+
+
+def get_condition_expression(condition: Any) -> Any:
+    """Return an expression condition as an annotation producing a boolean."""
+    if isinstance(condition, Q):
+        return ExpressionWrapper(condition, output_field=BooleanField())
+    return condition
+
+
+def get_gated_expression(condition: Any, column: str) -> Any:
+    """Return ``column`` for the rows matching ``condition`` and NULL otherwise."""
+    return Case(When(condition, then=F(column)), default=None)
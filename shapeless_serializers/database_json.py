@@ -0,0 +1,205 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.db import connections, models
+from django.db.models import Case, F, JSONField, When
+from django.db.models.functions import JSONObject
+from rest_framework import fields as drf_fields
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.serializers import ListSerializer
+
+from shapeless_serializers.columns import get_source_column, move_renamed_keys
+from shapeless_serializers.optimization import (
+    get_relation,
+    has_default_batch_hooks,
+    has_default_representation,
+    is_optimizable_queryset,
+)
+
+# Fields whose DRF representation is the column value as stored in JSON.
+JSON_NATIVE_FIELDS = {
+    drf_fields.CharField: None,
+    drf_fields.SlugField: None,
+    drf_fields.EmailField: None,
+    drf_fields.URLField: None,
+    drf_fields.ChoiceField: None,
+    drf_fields.IntegerField: None,
+    drf_fields.FloatField: None,
+    # SQLite stores booleans as integers.
+    drf_fields.BooleanField: bool,
+}
+
+# Backends whose JSON objects do not keep the key order they were built with:
+# PostgreSQL builds JSONB, and MySQL normalizes JSON_OBJECT keys.
+KEY_SORTING_VENDORS = {"mysql", "postgresql"}
+
+# Keys of a JSON object in output order, with the layout of nested objects.
+Layout = Tuple[Tuple[str, Optional["Layout"]], ...]
+
+
+class JSONShape:
+    """A serializer shape compiled into a single ``JSONObject`` expression."""
+
+    def __init__(
+        self,
+        expression: Any,
+        converters: List[Tuple[Tuple[str, ...], Callable[[Any], Any]]],
+        layout: Layout,
+    ):
+        self.expression = expression
+        self.converters = converters
+        self.layout = layout
+
+    def fetch(self, queryset: models.QuerySet) -> List[Dict[str, Any]]:
+        """Return one ready-made representation per row of ``queryset``."""
+        rows = list(queryset.values_list(self.expression, flat=True))
+        if connections[queryset.db].vendor in KEY_SORTING_VENDORS:
+            rows = [self._reorder(row, self.layout) for row in rows]
+        if self.converters:
+            for row in rows:
+                for path, converter in self.converters:
+                    self._convert(row, path, converter)
+        return rows
+
+    @classmethod
+    def _reorder(cls, row: Dict[str, Any], layout: Layout) -> Dict[str, Any]:
+        """Rebuild ``row`` with its keys in the order of ``layout``."""
+        return {
+            key: (
+                cls._reorder(row[key], nested)
+                if nested is not None and row[key] is not None
+                else row[key]
+            )
+            for key, nested in layout
+        }
+
+    @staticmethod
+    def _convert(row: Dict[str, Any], path: Tuple[str, ...], converter) -> None:
+        for key in path[:-1]:
+            row = row.get(key)
+            if row is None:
+                return
+        value = row.get(path[-1])
+        if value is not None:
+            row[path[-1]] = converter(value)
+
+
+def supports_database_json(queryset: Any) -> bool:
+    """Whether ``queryset`` can be rendered by the database JSON engine."""
+    if not is_optimizable_queryset(queryset):
+        return False
+    return connections[queryset.db].features.has_json_object_function
+
+
+def compile_json_shape(serializer: Any) -> Optional[JSONShape]:
+    """Compile ``serializer`` into a ``JSONShape``, or return None.
+
+    Only flat shapes are supported: plain column fields, ``rename_fields`` and
+    forward foreign keys serialized by another compilable serializer. Shapes
+    using method fields, callables, conditions or custom representations
+    return None and are serialized by the regular path.
+    """
+    compiled = _compile(serializer, "")
+    if compiled is None:
+        return None
+    return JSONShape(*compiled)
+
+
+def _compile(serializer, prefix: str):
+    """Return the ``JSONObject`` of one level, its value converters and layout."""
+    get_model = getattr(serializer, "_get_model", None)
+    model = get_model() if get_model is not None else None
+    if model is None or not has_default_representation(serializer):
+        return None
+    if not has_default_batch_hooks(serializer):
+        return None
+    if getattr(serializer, "_conditional_fields", None):
+        return None
+    if getattr(serializer, "_collection_spec", None) or getattr(
+        serializer, "_tree", False
+    ):
+        return None
+
+    nested = getattr(serializer, "_nested", None) or {}
+    if not isinstance(nested, dict):
+        return None
+
+    selected = getattr(serializer, "_fields", None)
+    selected = set(selected) if selected else None
+    nested = {
+        name: value
+        for name, value in nested.items()
+        if selected is None or name in selected
+    }
+
+    values = {}
+    converters = {}
+    layouts = {}
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in nested:
+            values[name] = None
+            continue
+        column, converter = _compile_field(model, field)
+        if column is None:
+            return None
+        values[name] = F(f"{prefix}{column}")
+        if converter is not None:
+            converters[name] = [((), converter)]
+
+    for name, nested_serializer in nested.items():
+        relation = get_relation(model, name)
+        if (
+            relation is None
+            or not relation.concrete
+            or not relation.many_to_one
+            and not relation.one_to_one
+            or isinstance(nested_serializer, (dict, ListSerializer))
+            or getattr(nested_serializer, "instance", None) is not None
+        ):
+            return None
+
+        compiled = _compile(nested_serializer, f"{prefix}{name}__")
+        if compiled is None:
+            return None
+        nested_expression, nested_converters, layouts[name] = compiled
+        if relation.null:
+            nested_expression = Case(
+                When(**{f"{prefix}{relation.attname}__isnull": True}, then=None),
+                default=nested_expression,
+                output_field=JSONField(),
+            )
+        values[name] = nested_expression
+        if nested_converters:
+            converters[name] = nested_converters
+
+    rename_fields = getattr(serializer, "_rename_fields", None) or {}
+    if not isinstance(rename_fields, dict):
+        return None
+    move_renamed_keys(rename_fields, values, converters, layouts)
+
+    if not values:
+        return None
+    converters = [
+        ((name, *path), converter)
+        for name, items in converters.items()
+        for path, converter in items
+    ]
+    layout = tuple((name, layouts.get(name)) for name in values)
+    return JSONObject(**values), converters, layout
+
+
+def _compile_field(model, field) -> Tuple[Optional[str], Any]:
+    """Return the column read by ``field`` and a value converter."""
+    model_field = get_source_column(model, field)
+    if model_field is None:
+        return None, None
+
+    if type(field) is PrimaryKeyRelatedField:
+        if field.pk_field is not None:
+            return None, None
+        return model_field.attname, None
+
+    if type(field) not in JSON_NATIVE_FIELDS:
+        return None, None
+    return model_field.attname, JSON_NATIVE_FIELDS[type(field)]
@@ -0,0 +1,198 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict, TypeVar
+
+from django.core.exceptions import EmptyResultSet
+from django.db import models
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+from shapeless_serializers.conditions import BatchCondition, ContextCondition
+from shapeless_serializers.exceptions import DynamicSerializerConfigError
+from shapeless_serializers.loaders import BatchLoader
+
+# Serializer attributes making up a shape, in the order they are encoded.
+SHAPE_ATTRS = (
+    ("fields", "_fields"),
+    ("field_attributes", "_field_attributes"),
+    ("rename_fields", "_rename_fields"),
+    ("aggregates", "_aggregates"),
+    ("conditional_fields", "_conditional_fields"),
+    ("nested", "_nested"),
+    ("tree", "_tree"),
+    ("side_load", "_side_load"),
+)
+
+# Attribute set by ``shape_key`` on callables and other objects.
+SHAPE_KEY_ATTR = "__shape_key__"
+
+T = TypeVar("T")
+
+
+def shape_key(key: str) -> Callable[[T], T]:
+    """Give a callable an explicit identity in shape fingerprints.
+
+    .. code-block:: python
+
+        @shape_key("books.is_staff")
+        def is_staff(instance, context):
+            return context["request"].user.is_staff
+    """
+
+    def decorator(obj: T) -> T:
+        setattr(obj, SHAPE_KEY_ATTR, key)
+        return obj
+
+    return decorator
+
+
+def get_shape_fingerprint(serializer: BaseSerializer) -> str:
+    """Return a stable SHA-256 hex digest of the effective shape of ``serializer``.
+
+    Equal configurations produce the same fingerprint in every process: dict
+    and set ordering is ignored, serializers are identified by class and
+    configuration, and callables by ``shape_key`` or qualified name.
+    """
+    encoded = json.dumps(
+        get_canonical_shape(serializer),
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def get_canonical_shape(serializer: BaseSerializer) -> Any:
+    """Return the shape of ``serializer`` as JSON-serializable data."""
+    return _canonicalize(serializer)
+
+
+def _canonicalize(value: Any) -> Any:
+    key = getattr(value, SHAPE_KEY_ATTR, None)
+    if key is not None:
+        return {"key": str(key)}
+
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+
+    if isinstance(value, dict):
+        items = [
+            [_canonicalize(key), _canonicalize(item)] for key, item in value.items()
+        ]
+        return {"dict": sorted(items, key=_sort_key)}
+
+    if isinstance(value, (list, tuple)):
+        return {"list": [_canonicalize(item) for item in value]}
+
+    if isinstance(value, (set, frozenset)):
+        return {"set": sorted((_canonicalize(item) for item in value), key=_sort_key)}
+
+    if isinstance(value, ListSerializer):
+        return _add_loader({"many": _canonicalize(value.child)}, value)
+
+    if isinstance(value, BaseSerializer):
+        return _add_loader(_canonicalize_serializer(value), value)
+
+    if isinstance(value, BatchLoader):
+        return {"batch_loader": _canonicalize(value.func)}
+
+    if isinstance(value, BatchCondition):
+        return {"batch_condition": _canonicalize(value.func)}
+
+    if isinstance(value, ContextCondition):
+        return {"context_only": _canonicalize(value.func)}
+
+    if isinstance(value, type):
+        return {"class": _get_qualified_name(value)}
+
+    if isinstance(value, models.Model):
+        return {"instance": value._meta.label, "pk": _canonicalize(value.pk)}
+
+    if isinstance(value, models.QuerySet):
+        try:
+            sql = str(value.query)
+        except EmptyResultSet:
+            sql = ""
+        return {"queryset": value.model._meta.label, "sql": sql}
+
+    if hasattr(value, "deconstruct"):
+        # Q objects, expressions such as Count() and model fields.
+        path, args, kwargs = value.deconstruct()
+        return {
+            "object": path,
+            "args": _canonicalize(args),
+            "kwargs": _canonicalize(kwargs),
+        }
+
+    if callable(value):
+        return {"callable": _get_callable_name(value)}
+
+    if type(value).__repr__ is object.__repr__:
+        raise DynamicSerializerConfigError(
+            f"Cannot fingerprint {value!r}; give it an explicit key with shape_key()"
+        )
+    return {"type": _get_qualified_name(type(value)), "repr": repr(value)}
+
+
+def _canonicalize_serializer(serializer: BaseSerializer) -> Any:
+    shape = {"class": _get_qualified_name(type(serializer))}
+
+    model = getattr(getattr(serializer, "Meta", None), "model", None)
+    if model is not None:
+        shape["model"] = model._meta.label
+
+    for name, attr in SHAPE_ATTRS:
+        value = getattr(serializer, attr, None)
+        if value:
+            shape[name] = _canonicalize(_normalize_config(name, value))
+
+    spec = getattr(serializer, "_collection_spec", None)
+    if spec:
+        shape["collection"] = _canonicalize(
+            {"filter": spec.filter, "order_by": spec.order_by, "limit": spec.limit}
+        )
+    return shape
+
+
+def _add_loader(shape: Dict[str, Any], serializer: BaseSerializer) -> Dict[str, Any]:
+    """Add the loader of a nested serializer; data instances are not shape."""
+    loader = serializer.instance
+    if isinstance(loader, BatchLoader) or callable(loader):
+        shape["loader"] = _canonicalize(loader)
+    return shape
+
+
+def _normalize_config(name: str, value: Any) -> Any:
+    """Drop the ordering of configuration values whose order has no effect."""
+    if name == "fields" and isinstance(value, (list, tuple)):
+        # The output follows the declared order whatever the selection order.
+        return set(value)
+    if name == "nested" and isinstance(value, dict):
+        return {
+            field_name: (
+                {key: _normalize_config(key, item) for key, item in nested_obj.items()}
+                if isinstance(nested_obj, dict)
+                else nested_obj
+            )
+            for field_name, nested_obj in value.items()
+        }
+    return value
+
+
+def _get_callable_name(func: Any) -> str:
+    name = _get_qualified_name(func)
+    if "<lambda>" in name:
+        # Lambdas of one scope share a name; tell them apart by position.
+        code = getattr(func, "__code__", None)
+        if code is not None:
+            name = f"{name}:{code.co_firstlineno}"
+    return name
+
+
+def _get_qualified_name(obj: Any) -> str:
+    module = getattr(obj, "__module__", None) or ""
+    qualname = getattr(obj, "__qualname__", None) or type(obj).__qualname__
+    return f"{module}.{qualname}"
+
+
+def _sort_key(item: Any) -> str:
+    return json.dumps(item, sort_keys=True, separators=(",", ":"))
@@ -0,0 +1,62 @@
+from typing import Any, Callable, Dict, Iterable, List
+
+from django.db import models
+
+
+class BatchLoader:
+    """Resolve nested data for every parent instance of a level at once.
+
+    The wrapped callable receives the list of parent instances and the
+    serializer context, and returns a mapping from parent (instance or pk)
+    to the data to serialize for that parent.
+    """
+
+    def __init__(self, func: Callable[[List[Any], Dict[str, Any]], Any]):
+        self.func = func
+
+    def __call__(self, instances: List[Any], context: Dict[str, Any]) -> Any:
+        return self.func(instances, context)
+
+    def load(
+        self, instances: List[Any], context: Dict[str, Any], default: Any = None
+    ) -> Dict[int, Any]:
+        """Call the loader and return the data of each parent keyed by ``id()``."""
+        mapping = self(instances, context)
+        results = {}
+        for instance in instances:
+            if instance in mapping:
+                data = mapping[instance]
+            else:
+                data = mapping.get(getattr(instance, "pk", None), default)
+            results[id(instance)] = data
+        return results
+
+
+def batch_loader(func: Callable[[List[Any], Dict[str, Any]], Any]) -> BatchLoader:
+    """Mark a nested ``instance=`` callable as receiving all parents at once.
+
+    Example::
+
+        @batch_loader
+        def approved_comments(posts, ctx):
+            comments = defaultdict(list)
+            for comment in Comment.objects.filter(post__in=posts, is_approved=True):
+                comments[comment.post_id].append(comment)
+            return comments
+    """
+    return BatchLoader(func)
+
+
+def flatten_batch_data(values: Iterable[Any]) -> List[Any]:
+    """Flatten per-parent nested data into the list of child instances."""
+    items = []
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, models.Manager):
+            value = value.all()
+        if isinstance(value, (list, tuple, models.QuerySet)):
+            items.extend(value)
+        else:
+            items.append(value)
+    return items
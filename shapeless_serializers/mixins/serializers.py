@@ -1,22 +1,549 @@
-from typing import Any, Dict
+import copy
+from collections import OrderedDict, defaultdict
+from contextlib import ExitStack, contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
 
 from django.db import models
-from rest_framework.serializers import BaseSerializer, ListSerializer
-
+from django.db.models import Prefetch
+from rest_framework.fields import SkipField
+from rest_framework.relations import ManyRelatedField, PKOnlyObject
+from rest_framework.serializers import (
+    LIST_SERIALIZER_KWARGS,
+    BaseSerializer,
+    ListSerializer,
+    ModelSerializer,
+    ReadOnlyField,
+    ReturnDict,
+)
+from rest_framework.utils import model_meta
+
+from shapeless_serializers.codegen import compile_renderer
+from shapeless_serializers.conditions import (
+    CONDITION_ANNOTATION,
+    GATED_VALUE_ANNOTATION,
+    BatchCondition,
+    get_condition_expression,
+    get_gated_expression,
+    is_context_only,
+    is_expression_condition,
+)
+from shapeless_serializers.database_json import (
+    JSONShape,
+    compile_json_shape,
+    supports_database_json,
+)
 from shapeless_serializers.exceptions import (
     DynamicSerializerConfigError,
     ExcessiveNestingError,
 )
+from shapeless_serializers.fingerprints import get_shape_fingerprint
+from shapeless_serializers.loaders import BatchLoader, flatten_batch_data
+from shapeless_serializers.optimization import (
+    CollectionSpec,
+    QueryPlan,
+    get_relation,
+    get_required_columns,
+    get_tree_queryset,
+    has_default_representation,
+    is_optimizable_queryset,
+    is_self_referential,
+    is_single_valued,
+    load_annotations,
+)
+from shapeless_serializers.shapes import ShapePlan, get_cached_shape_plan
+from shapeless_serializers.side_loading import IncludedObjects
+from shapeless_serializers.values import ValuesShape, compile_values_shape
+
+LIST_SERIALIZER_KWARGS_REMOVE = ("allow_empty", "min_length", "max_length")
+
+INLINE_SERIALIZER_CACHE_SIZE = 256
+
+# State of the top-level ``.data`` call running in the current thread or task.
+# Serializer instances may be shared between concurrent calls, for example as
+# nested configuration declared on a view, so they never hold this state.
+_CALL_STATE: ContextVar[Optional["CallState"]] = ContextVar(
+    "shapeless_call_state", default=None
+)
+
+# Conditions evaluated for the rows being serialized, as ``id(serializer)``
+# mapped to ``(instance, excluded names)``.
+_CONDITION_SCOPES: ContextVar[Optional[Dict[int, Tuple[Any, FrozenSet[str]]]]] = (
+    ContextVar("shapeless_condition_scopes", default=None)
+)
+
+# Instance attributes holding the configuration compiled into a ShapePlan.
+SHAPE_CONFIG_ATTRS = ("_fields", "_rename_fields", "_conditional_fields", "_nested")
+
+FIELD_CACHE_SIZE = 256
+
+# Attribute of prototype fields holding the ``field_attributes`` set on them.
+FIELD_OVERLAY_ATTR = "_shapeless_attributes"
+
+
+class FieldCache:
+    """Bounded LRU cache of prototype fields.
+
+    Entries are keyed by (class, model, selected field names), plus the
+    constant ``field_attributes`` applied to them, if any. The same class
+    caches the names a selection can build, keyed by the requested names.
+    """
+
+    def __init__(self, maxsize: int = FIELD_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._fields = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Any) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            fields = self._fields.get(key)
+            if fields is not None:
+                self._fields.move_to_end(key)
+            return fields
+
+    def set(self, key: Any, fields: Dict[str, Any]) -> None:
+        with self._lock:
+            self._fields[key] = fields
+            self._fields.move_to_end(key)
+            while len(self._fields) > self.maxsize:
+                self._fields.popitem(last=False)
+
+    def clear(self, serializer_class: Any = None) -> None:
+        with self._lock:
+            if serializer_class is None:
+                self._fields.clear()
+                return
+            for key in [
+                key for key in self._fields if issubclass(key[0], serializer_class)
+            ]:
+                del self._fields[key]
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+
+_FIELD_CACHE = FieldCache()
+
+# Requested names each (class, model) can build, keyed by the requested names.
+_FIELD_NAMES_CACHE = FieldCache()
+
+
+def _clone_field(field: Any) -> Any:
+    """Return an unbound copy of a prototype field."""
+    if isinstance(field, (BaseSerializer, ManyRelatedField)):
+        # These hold child fields that are bound to their parent. Deep copies
+        # are rebuilt from the constructor arguments, so overrides are replayed.
+        clone = copy.deepcopy(field)
+        for attr_name, value in getattr(field, FIELD_OVERLAY_ATTR, {}).items():
+            setattr(clone, attr_name, value)
+        return clone
+    clone = copy.copy(field)
+    # Shallow copies would share these with the prototype and every other clone.
+    clone.validators = list(field.validators)
+    clone.error_messages = dict(field.error_messages)
+    return clone
+
+
+def clear_field_cache(serializer_class: Any = None) -> None:
+    """Drop the cached prototype fields of ``serializer_class`` (or of all classes)."""
+    _FIELD_CACHE.clear(serializer_class)
+    _FIELD_NAMES_CACHE.clear(serializer_class)
+
+
+class CallState:
+    """Per-call state shared by every level of a top-level ``.data`` call."""
+
+    __slots__ = ("included", "condition_results", "identity_map", "stores", "members")
+
+    def __init__(self, identity_map: bool = False):
+        self.included = IncludedObjects()
+        self.condition_results = {}
+        self.identity_map = {} if identity_map else None
+        self.stores = {}
+        # Serializers taking part in the call, keyed by id(). Holding them
+        # keeps their ids unique for the whole call.
+        self.members = {}
+
+
+class NestedPlaceholder:
+    """Keeps the position of a field whose value a nested branch produces."""
+
+    write_only = False
+
+    def __init__(self, field_name: str):
+        self.field_name = field_name
+
+    def get_attribute(self, instance: Any) -> "NestedPlaceholder":
+        return self
+
+    def to_representation(self, value: Any) -> "NestedPlaceholder":
+        # Left in the output only if the branch writes no value.
+        return value
+
+
+class ShapelessListSerializer(ListSerializer):
+    """List serializer that prepares the whole collection before iterating it."""
+
+    @property
+    def data(self):
+        """Add the side-loaded objects of a top-level call to the output."""
+        if not isinstance(self.child, DynamicSerializerBaseMixin):
+            return super().data
+        with self.child._call_scope() as included:
+            data = super().data
+        return self.child._with_included(self, data, included)
+
+    def to_representation(self, data):
+        """Optimize the collection for the child shape, then serialize each item."""
+        iterable = data.all() if isinstance(data, models.Manager) else data
+
+        if not isinstance(self.child, DynamicSerializerBaseMixin):
+            return [self.child.to_representation(item) for item in iterable]
+
+        # Validate the shape once, before any query is run.
+        self.child.get_shape_plan()
+
+        if self.child.DATABASE_JSON and supports_database_json(iterable):
+            shape = self.child.get_json_shape()
+            if shape is not None:
+                return shape.fetch(iterable)
+
+        if self.child.AUTO_OPTIMIZE_QUERYSET and is_optimizable_queryset(iterable):
+            shape = self.child.get_values_shape()
+            if shape is not None:
+                return shape.fetch(iterable)
+
+        if is_optimizable_queryset(iterable):
+            iterable = list(self.child.optimize_queryset(iterable))
+        else:
+            iterable = list(iterable)
+            self.child.optimize_instances(iterable)
+
+        with self.child._call_scope():
+            self.child.prepare_batch(iterable)
+            return self.child.represent_batch(iterable)
 
 
 class DynamicSerializerBaseMixin:
     """Base mixin for dynamic serializer functionality."""
 
+    AUTO_OPTIMIZE_QUERYSET = True
+    CACHE_FIELDS = True
+    COMPILED_REPRESENTATION = False
+    DATABASE_JSON = False
+    IDENTITY_MAP = False
+
     def __init__(self, *args, **kwargs):
         """Initialize the dynamic serializer base mixin."""
         self._context = kwargs.get("context", {})
+        self._shape_plan = None
+        self._renderer = None
+        self._identity_shape = None
         super().__init__(*args, **kwargs)
 
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        """Use ShapelessListSerializer unless Meta declares its own list class."""
+        list_kwargs = {}
+        for key in LIST_SERIALIZER_KWARGS_REMOVE:
+            value = kwargs.pop(key, None)
+            if value is not None:
+                list_kwargs[key] = value
+        list_kwargs["child"] = cls(*args, **kwargs)
+        list_kwargs.update(
+            {
+                key: value
+                for key, value in kwargs.items()
+                if key in LIST_SERIALIZER_KWARGS
+            }
+        )
+        meta = getattr(cls, "Meta", None)
+        list_serializer_class = getattr(
+            meta, "list_serializer_class", ShapelessListSerializer
+        )
+        return list_serializer_class(*args, **list_kwargs)
+
+    def get_fields(self):
+        """Clone the fields of model serializers from a per-class prototype.
+
+        Model introspection and ``build_field`` run once per class, model and
+        field selection; every instance gets copies of the prototype fields.
+        """
+        if not self._caches_fields():
+            return super().get_fields()
+
+        prototype = self._get_prototype_fields()
+        return {name: _clone_field(field) for name, field in prototype.items()}
+
+    def _caches_fields(self) -> bool:
+        """Whether the fields are cloned from a cached prototype."""
+        return self.CACHE_FIELDS and isinstance(self, ModelSerializer)
+
+    def _get_field_cache_key(self) -> Tuple[Any, ...]:
+        """Return the class, model and field selection the prototype depends on."""
+        return (type(self), self._get_model(), self._get_field_selection())
+
+    def _get_field_selection(self) -> Optional[FrozenSet[str]]:
+        """Return the names of the selected fields the class can build, if any."""
+        return None
+
+    def _get_prototype_fields(self) -> Dict[str, Any]:
+        """Return the cached prototype fields, building them on the first use."""
+        key = self._get_field_cache_key()
+        prototype = _FIELD_CACHE.get(key)
+        if prototype is None:
+            prototype = super().get_fields()
+            _FIELD_CACHE.set(key, prototype)
+        return prototype
+
+    @property
+    def data(self):
+        """Prefetch the shape's relations for a single root instance."""
+        with self._call_scope() as included:
+            if not hasattr(self, "_data") and isinstance(self.instance, models.Model):
+                self.optimize_instances([self.instance])
+                self.prepare_batch([self.instance])
+            data = super().data
+        return self._with_included(self, data, included)
+
+    def prepare_batch(self, instances: List[Any]) -> None:
+        """Hook called with every instance of a level before they are serialized."""
+
+    def represent_batch(self, instances: List[Any]) -> List[Any]:
+        """Serialize every prepared instance of a level.
+
+        Mixins extend this hook to do their per-item setup once for the batch;
+        the loop itself only calls the renderer.
+        """
+        if self._identity_map is not None:
+            return [self.get_representation(item) for item in instances]
+        render = self.get_renderer()
+        return [render(item) for item in instances]
+
+    def get_representation(self, instance: Any) -> Any:
+        """Return the representation of ``instance``, reusing it when mapped.
+
+        While an identity map is active, every model instance is serialized
+        once per shape and the resulting dictionary is shared. The shape is
+        the serializer itself, or the dictionary configuration it was built
+        from, so serializers rebuilt for every parent share their entries.
+        """
+        render = self.get_renderer()
+        identity_map = self._identity_map
+        if (
+            identity_map is None
+            or not isinstance(instance, models.Model)
+            or instance.pk is None
+        ):
+            return render(instance)
+
+        shape = self._identity_shape
+        key = (type(instance), instance.pk, id(self) if shape is None else shape)
+        if key not in identity_map:
+            identity_map[key] = render(instance)
+        return identity_map[key]
+
+    def get_renderer(self) -> Callable[[Any], Any]:
+        """Return the function building the representation of one instance.
+
+        With ``COMPILED_REPRESENTATION`` this is a function generated for the
+        shape, falling back to ``to_representation`` when it is not supported.
+        """
+        if not self.COMPILED_REPRESENTATION:
+            return self.to_representation
+
+        plan = self.get_shape_plan()
+        cached = self._renderer
+        if cached is None or cached[0] is not plan:
+            renderer = compile_renderer(self) or self.to_representation
+            cached = self._renderer = (plan, renderer)
+        return cached[1]
+
+    def get_shape_plan(self) -> ShapePlan:
+        """Return the compiled plan of the current shape configuration.
+
+        Plans are shared through a process-wide LRU cache; the instance only
+        recompiles when one of its configuration attributes is replaced.
+        """
+        config = tuple(getattr(self, attr, None) for attr in SHAPE_CONFIG_ATTRS)
+        cached = self._shape_plan
+        if cached is None or any(old is not new for old, new in zip(cached[0], config)):
+            cached = self._shape_plan = (config, get_cached_shape_plan(*config))
+        return cached[1]
+
+    def get_shape_fingerprint(self) -> str:
+        """Return a stable fingerprint of the shape, identical across processes."""
+        return get_shape_fingerprint(self)
+
+    def uses_side_loading(self) -> bool:
+        """Whether the shape side-loads any relation into ``included``."""
+        return False
+
+    @contextmanager
+    def _condition_scope(self, instance: Any):
+        """Evaluate the conditions of ``instance`` once for the whole mixin chain.
+
+        Yields the names of the fields and nested branches excluded for it.
+        """
+        scopes = _CONDITION_SCOPES.get()
+        entry = scopes.get(id(self)) if scopes else None
+        if entry is not None and entry[0] is instance:
+            yield entry[1]
+            return
+
+        excluded = self._evaluate_conditions(instance)
+        token = _CONDITION_SCOPES.set(
+            {**(scopes or {}), id(self): (instance, excluded)}
+        )
+        try:
+            yield excluded
+        finally:
+            _CONDITION_SCOPES.reset(token)
+
+    @property
+    def _excluded_fields(self) -> Optional[FrozenSet[str]]:
+        """The names excluded for the row being serialized, if any."""
+        scopes = _CONDITION_SCOPES.get()
+        entry = scopes.get(id(self)) if scopes else None
+        return entry[1] if entry is not None else None
+
+    def _evaluate_conditions(self, instance: Any) -> FrozenSet[str]:
+        """Return the names that ``conditional_fields`` excludes for ``instance``."""
+        return frozenset()
+
+    @property
+    def _call_state(self) -> Optional[CallState]:
+        """The state of the call this serializer takes part in, if any."""
+        state = _CALL_STATE.get()
+        if state is not None and id(self) in state.members:
+            return state
+        return None
+
+    @property
+    def _included(self) -> Optional[IncludedObjects]:
+        state = self._call_state
+        return state.included if state is not None else None
+
+    @property
+    def _identity_map(self) -> Optional[Dict[Any, Any]]:
+        state = self._call_state
+        return state.identity_map if state is not None else None
+
+    @property
+    def _condition_results(self) -> Optional[Dict[Any, Any]]:
+        state = self._call_state
+        return state.condition_results if state is not None else None
+
+    @contextmanager
+    def _call_scope(self):
+        """Create the per-call state of a top-level serialization call.
+
+        Yields the collector of side-loaded objects, or None when a parent
+        call is already in progress.
+        """
+        if self._call_state is not None:
+            yield None
+            return
+
+        state = CallState(identity_map=self.IDENTITY_MAP)
+        state.members[id(self)] = self
+        token = _CALL_STATE.set(state)
+        try:
+            yield state.included
+        finally:
+            _CALL_STATE.reset(token)
+
+    def _join_call(self, serializer: BaseSerializer) -> None:
+        """Make a nested serializer take part in the call of this serializer."""
+        state = self._call_state
+        target = (
+            serializer.child if isinstance(serializer, ListSerializer) else serializer
+        )
+        if state is not None and isinstance(target, DynamicSerializerBaseMixin):
+            state.members.setdefault(id(target), target)
+
+    def _get_call_store(self, name: str) -> Dict[Any, Any]:
+        """Return the ``name`` store of this serializer for the current call.
+
+        Stores are dropped when the top-level call ends, so serializers shared
+        between calls keep no data. Outside a call a new store is returned.
+        """
+        state = self._call_state
+        if state is None:
+            return {}
+        return state.stores.setdefault((id(self), name), {})
+
+    def _with_included(self, owner: BaseSerializer, data: Any, included: Any) -> Any:
+        """Wrap top-level ``data`` with the objects side-loaded while building it."""
+        if included is None or not self.uses_side_loading():
+            return data
+        if not hasattr(owner, "_included_data"):
+            owner._included_data = included.as_dict()
+        return ReturnDict(
+            {"data": data, "included": owner._included_data}, serializer=owner
+        )
+
+    def get_query_plan(self) -> QueryPlan:
+        """Build the select/prefetch/only plan required by the current shape."""
+        plan = QueryPlan()
+        if self.AUTO_OPTIMIZE_QUERYSET:
+            self._collect_query_plan(plan, "")
+        return plan
+
+    def optimize_queryset(self, queryset: models.QuerySet) -> models.QuerySet:
+        """Return ``queryset`` with the relations of the shape preloaded."""
+        return self.get_query_plan().apply(queryset)
+
+    def optimize_instances(self, instances) -> None:
+        """Preload the relations of the shape on already fetched instances."""
+        self.get_query_plan().apply_to_instances(instances)
+
+    def get_json_shape(self) -> Optional[JSONShape]:
+        """Compile the shape for the database JSON engine, if it is supported."""
+        return compile_json_shape(self)
+
+    def get_values_shape(self) -> Optional[ValuesShape]:
+        """Compile the shape for the ``values_list()`` fast path, if it is flat."""
+        return compile_values_shape(self)
+
+    def _collect_query_plan(self, plan: QueryPlan, prefix: str) -> None:
+        """Add the optimizations needed by this serializer to ``plan``."""
+        model = self._get_model()
+        if model is None:
+            return
+
+        all_columns = [field.name for field in model._meta.concrete_fields]
+        if self._reads_instances():
+            columns = None
+        else:
+            columns = get_required_columns(
+                model, self.fields.values(), self._get_annotation_names()
+            )
+
+        if columns is None:
+            columns = all_columns
+        elif len(columns) < len(all_columns):
+            plan.prune_columns = True
+
+        plan.add_columns(prefix, columns)
+
+    def _get_model(self):
+        """Return the model backing this serializer, if any."""
+        return getattr(getattr(self, "Meta", None), "model", None)
+
+    def _get_annotation_names(self) -> Set[str]:
+        """Return the names of output values computed by the database."""
+        return set()
+
+    def _reads_instances(self) -> bool:
+        """Whether code outside the fields reads the instances of this level.
+
+        Such code may use any column, so the columns of the level are not pruned.
+        """
+        return not has_default_representation(self)
+
 
 class DynamicFieldsMixin(DynamicSerializerBaseMixin):
     """Mixin to dynamically control which fields are included."""
@@ -24,17 +551,61 @@ class DynamicFieldsMixin(DynamicSerializerBaseMixin):
     def __init__(self, *args, **kwargs):
         """Initialize with fields configuration."""
         self._fields = kwargs.pop("fields", None)
+        if self._fields is not None and not isinstance(
+            self._fields, (list, tuple, set)
+        ):
+            raise DynamicSerializerConfigError("'fields' must be a list, tuple, or set")
         super().__init__(*args, **kwargs)
         self._apply_dynamic_fields()
 
+    def get_fields(self):
+        """Only copy the declared fields that were requested."""
+        if self._fields is not None:
+            allowed_fields = set(self._fields)
+            self._declared_fields = {
+                name: field
+                for name, field in self._declared_fields.items()
+                if name in allowed_fields
+            }
+        return super().get_fields()
+
+    def get_field_names(self, declared_fields, info):
+        """Restrict model serializers to the requested fields before building them."""
+        field_names = super().get_field_names(declared_fields, info)
+        if self._fields is None:
+            return field_names
+
+        allowed_fields = set(self._fields)
+        return [name for name in field_names if name in allowed_fields]
+
+    def _get_field_selection(self) -> Optional[FrozenSet[str]]:
+        """Key the field cache on the requested names the class can build.
+
+        Unknown names do not change the built fields, so they do not create
+        cache entries of their own.
+        """
+        if self._fields is None:
+            return None
+
+        requested = frozenset(self._fields)
+        key = (type(self), self._get_model(), requested)
+        field_names = _FIELD_NAMES_CACHE.get(key)
+        if field_names is None:
+            info = model_meta.get_field_info(self._get_model())
+            # The instance copy of the declared fields may already be filtered
+            # by this selection, so the names come from the class.
+            declared_fields = type(self)._declared_fields
+            field_names = requested.intersection(
+                super().get_field_names(declared_fields, info)
+            )
+            _FIELD_NAMES_CACHE.set(key, field_names)
+        return field_names
+
     def _apply_dynamic_fields(self) -> None:
         """Filter fields based on dynamic configuration."""
         if self._fields is None:
             return
 
-        if not isinstance(self._fields, (list, tuple, set)):
-            raise DynamicSerializerConfigError("'fields' must be a list, tuple, or set")
-
         allowed_fields = set(self._fields)
         existing_fields = set(self.fields.keys())
 
@@ -48,11 +619,70 @@ class DynamicFieldAttributesMixin(DynamicSerializerBaseMixin):
     def __init__(self, *args, **kwargs):
         """Initialize with field_attributes configuration."""
         self._field_attributes = kwargs.pop("field_attributes", None)
+        self._overlay_key = self._get_overlay_key()
         super().__init__(*args, **kwargs)
         self._apply_dynamic_field_attributes()
 
+    def _get_prototype_fields(self) -> Dict[str, Any]:
+        """Return prototype fields with the constant attributes already applied.
+
+        Serializers sharing the same constant ``field_attributes`` share one
+        prepared copy of the prototype instead of setting them on every clone.
+        """
+        prototype = super()._get_prototype_fields()
+        if self._overlay_key is None:
+            return prototype
+
+        key = (*self._get_field_cache_key(), self._overlay_key)
+        fields = _FIELD_CACHE.get(key)
+        if fields is None:
+            fields = {name: _clone_field(field) for name, field in prototype.items()}
+            for field_name, attributes in self._field_attributes.items():
+                constants = {
+                    attr_name: value
+                    for attr_name, value in attributes.items()
+                    if not callable(value)
+                }
+                if field_name in fields and constants:
+                    self._set_field_attributes(
+                        field_name, fields[field_name], constants
+                    )
+                    setattr(fields[field_name], FIELD_OVERLAY_ATTR, constants)
+            _FIELD_CACHE.set(key, fields)
+        return fields
+
+    def _get_overlay_key(self) -> Optional[Tuple[Any, ...]]:
+        """Return a hashable key of the constant ``field_attributes``, if any."""
+        if not self._field_attributes or not isinstance(self._field_attributes, dict):
+            return None
+
+        key = []
+        for field_name, attributes in self._field_attributes.items():
+            if not isinstance(attributes, dict):
+                return None
+            constants = sorted(
+                (attr_name, type(value), value)
+                for attr_name, value in attributes.items()
+                if not callable(value)
+            )
+            if constants:
+                key.append((field_name, tuple(constants)))
+        if not key:
+            return None
+
+        key = tuple(sorted(key))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
     def _apply_dynamic_field_attributes(self) -> None:
-        """Apply dynamic attributes to fields."""
+        """Apply dynamic attributes to fields.
+
+        When the fields come from a prepared prototype only the callable
+        values are left to resolve, once per serializer.
+        """
         if not self._field_attributes:
             return
 
@@ -61,6 +691,7 @@ class DynamicFieldAttributesMixin(DynamicSerializerBaseMixin):
                 "'field_attributes' must be a dictionary"
             )
 
+        overlaid = self._overlay_key is not None and self._caches_fields()
         for field_name, attributes in self._field_attributes.items():
             if field_name not in self.fields:
                 continue
@@ -70,14 +701,29 @@ class DynamicFieldAttributesMixin(DynamicSerializerBaseMixin):
                     f"Attributes for field '{field_name}' must be a dictionary"
                 )
 
-            try:
-                self._apply_attributes_to_field(
-                    self.fields[field_name], attributes, self.instance, self._context
-                )
-            except Exception as e:
-                raise DynamicSerializerConfigError(
-                    f"Error applying attributes to field '{field_name}': {str(e)}"
-                )
+            if overlaid:
+                attributes = {
+                    attr_name: value
+                    for attr_name, value in attributes.items()
+                    if callable(value)
+                }
+                if not attributes:
+                    continue
+
+            self._set_field_attributes(field_name, self.fields[field_name], attributes)
+
+    def _set_field_attributes(
+        self, field_name: str, field_instance: Any, attributes: Dict[str, Any]
+    ) -> None:
+        """Apply ``attributes`` to one field, reporting errors as config errors."""
+        try:
+            self._apply_attributes_to_field(
+                field_instance, attributes, self.instance, self._context
+            )
+        except Exception as e:
+            raise DynamicSerializerConfigError(
+                f"Error applying attributes to field '{field_name}': {str(e)}"
+            )
 
     def _apply_attributes_to_field(
         self,
@@ -112,64 +758,392 @@ class DynamicFieldRenamingMixin(DynamicSerializerBaseMixin):
 
     def _apply_dynamic_renaming(self, representation: Dict[str, Any]) -> Dict[str, Any]:
         """Process field renaming configuration."""
-        if not self._rename_fields:
-            return representation
-
-        if not isinstance(self._rename_fields, dict):
-            raise DynamicSerializerConfigError("'rename_fields' must be a dictionary")
-
-        for old_name, new_name in self._rename_fields.items():
+        for old_name, new_name in self.get_shape_plan().renames:
             if old_name in representation:
                 representation[new_name] = representation.pop(old_name)
 
         return representation
 
 
+class DynamicAggregateFieldsMixin(DynamicSerializerBaseMixin):
+    """Mixin to add database aggregates such as ``Count`` as read-only fields."""
+
+    def __init__(self, *args, **kwargs):
+        """Initialize with aggregates configuration."""
+        self._aggregates = kwargs.pop("aggregates", None) or {}
+        super().__init__(*args, **kwargs)
+        self._validate_aggregates()
+
+    def get_fields(self):
+        """Expose every aggregate as a read-only field."""
+        fields = super().get_fields()
+        selected = getattr(self, "_fields", None)
+        for name in self._aggregates:
+            if selected is None or name in selected:
+                fields[name] = ReadOnlyField()
+        return fields
+
+    def to_representation(self, instance: Any) -> Dict[str, Any]:
+        """Compute the aggregates missing on ``instance`` before serializing it."""
+        if not self._aggregates_loaded:
+            self._load_aggregates([instance])
+        return super().to_representation(instance)
+
+    def prepare_batch(self, instances: List[Any]) -> None:
+        """Compute the aggregates missing on ``instances`` with one query."""
+        super().prepare_batch(instances)
+        self._load_aggregates(instances)
+
+    def represent_batch(self, instances: List[Any]) -> List[Any]:
+        """Load the aggregates of the batch once instead of checking every item."""
+        store = self._get_call_store("aggregates")
+        if store.get("loaded"):
+            return super().represent_batch(instances)
+
+        self._load_aggregates(instances)
+        store["loaded"] = True
+        try:
+            return super().represent_batch(instances)
+        finally:
+            store["loaded"] = False
+
+    @property
+    def _aggregates_loaded(self) -> bool:
+        """Whether the batch being represented already has its aggregates."""
+        return self._get_call_store("aggregates").get("loaded", False)
+
+    def _validate_aggregates(self) -> None:
+        """Validate aggregates configuration."""
+        if not isinstance(self._aggregates, dict):
+            raise DynamicSerializerConfigError("'aggregates' must be a dictionary")
+
+        model = self._get_model()
+        if self._aggregates and model is None:
+            raise DynamicSerializerConfigError(
+                "'aggregates' require a model serializer"
+            )
+
+        field_names = (
+            {field.name for field in model._meta.get_fields()} if model else ()
+        )
+        for name, expression in self._aggregates.items():
+            if not hasattr(expression, "resolve_expression"):
+                raise DynamicSerializerConfigError(
+                    f"Aggregate '{name}' must be a query expression"
+                )
+            if name in field_names:
+                raise DynamicSerializerConfigError(
+                    f"Aggregate '{name}' conflicts with a field on the model"
+                )
+
+    def _get_annotation_names(self) -> Set[str]:
+        return super()._get_annotation_names() | set(self._aggregates)
+
+    def _get_active_aggregates(self) -> Dict[str, Any]:
+        """Return the aggregates that are part of the output."""
+        return {
+            name: expression
+            for name, expression in self._aggregates.items()
+            if name in self.fields
+        }
+
+    def _load_aggregates(self, instances: List[Any]) -> None:
+        """Fetch the aggregates of instances with one separate query."""
+        aggregates = self._get_active_aggregates()
+        model = self._get_model()
+        if aggregates and model is not None:
+            load_annotations(model, instances, aggregates)
+
+
 class DynamicConditionalFieldsMixin(DynamicSerializerBaseMixin):
     """Mixin to dynamically include/exclude fields based on conditions."""
 
     def __init__(self, *args, **kwargs):
         """Initialize with conditional_fields configuration."""
         self._conditional_fields = kwargs.pop("conditional_fields", None)
+        self._active_conditions = None
+        self._gated_columns = None
         super().__init__(*args, **kwargs)
 
     def to_representation(self, instance: Any) -> Dict[str, Any]:
-        """Apply conditional field filtering to representation."""
-        representation = super().to_representation(instance)
-        return self._apply_conditional_fields(instance, representation)
-
-    def _apply_conditional_fields(
-        self, instance: Any, representation: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Process conditional fields configuration."""
-        if not self._conditional_fields:
-            return representation
+        """Serialize ``instance`` without computing the fields it excludes."""
+        with self._condition_scope(instance):
+            return super().to_representation(instance)
+
+    @property
+    def _readable_fields(self):
+        """Leave out the fields excluded for the instance being serialized."""
+        excluded = self._excluded_fields
+        for field in super()._readable_fields:
+            if not excluded or field.field_name not in excluded:
+                yield field
+
+    def prepare_batch(self, instances: List[Any]) -> None:
+        """Evaluate the batch and expression conditions of ``instances`` at once.
+
+        Nested levels may be prepared again for the items of each parent, so
+        decisions are kept for the call and only undecided instances are passed
+        to the batch conditions.
+        """
+        super().prepare_batch(instances)
+        self._load_condition_annotations(instances)
+
+        _, _, batch_conditions, _, _ = self._get_active_conditions()
+        store = self._get_call_store("batch_conditions")
+        for field_name, condition in batch_conditions:
+            results = store.setdefault(field_name, {})
+            pending = [
+                instance
+                for instance in instances
+                if results.get(id(instance), (None,))[0] is not instance
+            ]
+            if pending:
+                results.update(
+                    self._call_batch_condition(field_name, condition, pending)
+                )
 
-        if not isinstance(self._conditional_fields, dict):
+    def _evaluate_conditions(self, instance: Any) -> FrozenSet[str]:
+        """Evaluate the conditions of the fields and branches in the output."""
+        constant, _, batch_conditions, expressions, dynamic = (
+            self._get_active_conditions()
+        )
+        excluded = set(super()._evaluate_conditions(instance))
+        excluded |= constant
+        excluded |= self._get_context_exclusions()
+
+        for field_name, condition in batch_conditions:
+            if not self._get_batch_decision(field_name, condition, instance):
+                excluded.add(field_name)
+
+        for field_name, _ in expressions:
+            if not self._get_expression_decision(field_name, instance):
+                excluded.add(field_name)
+
+        for field_name, condition in dynamic:
+            if not self._call_condition(field_name, condition, instance):
+                excluded.add(field_name)
+
+        return frozenset(excluded)
+
+    def _get_batch_decision(
+        self, field_name: str, condition: BatchCondition, instance: Any
+    ) -> bool:
+        """Return the decision prepared for ``instance``, or evaluate it alone."""
+        results = self._get_call_store("batch_conditions").get(field_name)
+        entry = results.get(id(instance)) if results is not None else None
+        if entry is None or entry[0] is not instance:
+            # Serialized without prepare_batch: decide for this instance alone.
+            entry = self._call_batch_condition(field_name, condition, [instance])[
+                id(instance)
+            ]
+        return entry[1]
+
+    def _call_batch_condition(
+        self, field_name: str, condition: BatchCondition, instances: List[Any]
+    ) -> Dict[int, Any]:
+        """Evaluate one batch condition, reporting errors as config errors."""
+        try:
+            return condition.evaluate(instances, self._context)
+        except Exception as e:
             raise DynamicSerializerConfigError(
-                "'conditional_fields' must be a dictionary"
+                f"Error evaluating condition for field '{field_name}': {str(e)}"
             )
 
-        for field_name in list(representation.keys()):
-            condition = self._conditional_fields.get(field_name)
+    def _get_expression_decision(self, field_name: str, instance: Any) -> bool:
+        """Read the annotated result of an expression condition for ``instance``.
+
+        The value of a gated column is moved to its attribute on included rows.
+        """
+        alias = CONDITION_ANNOTATION.format(field_name)
+        if not hasattr(instance, alias):
+            self._load_condition_annotations([instance])
+        if not getattr(instance, alias, False):
+            return False
+
+        column = self._get_gated_columns().get(field_name)
+        value_alias = GATED_VALUE_ANNOTATION.format(field_name)
+        if column is not None and hasattr(instance, value_alias):
+            setattr(instance, column, getattr(instance, value_alias))
+        return True
+
+    def _load_condition_annotations(self, instances: List[Any]) -> None:
+        """Evaluate the expression conditions of instances with one separate query.
+
+        The same query reads the value of each gated column on the rows that
+        show its field.
+        """
+        _, _, _, expressions, _ = self._get_active_conditions()
+        model = self._get_model()
+        if not expressions or model is None:
+            return
 
-            if condition is None:
-                continue
-            try:
-                should_include = (
-                    condition(instance, self._context)
-                    if callable(condition)
-                    else bool(condition)
+        gated = self._get_gated_columns()
+        annotations = {}
+        for field_name, condition in expressions:
+            annotations[CONDITION_ANNOTATION.format(field_name)] = (
+                get_condition_expression(condition)
+            )
+            if field_name in gated:
+                annotations[GATED_VALUE_ANNOTATION.format(field_name)] = (
+                    get_gated_expression(condition, gated[field_name])
                 )
-                if not should_include:
-                    representation.pop(field_name)
+        load_annotations(model, instances, annotations)
 
-            except Exception as e:
-                raise DynamicSerializerConfigError(
-                    f"Error evaluating condition for field '{field_name}': {str(e)}"
-                )
+    def _collect_query_plan(self, plan: QueryPlan, prefix: str) -> None:
+        """Leave out the columns only read by fields with expression conditions.
 
-        return representation
+        Their values are read with the conditions in prepare_batch, for the
+        rows that show the field only.
+        """
+        super()._collect_query_plan(plan, prefix)
+        if prefix:
+            return
+
+        gated = self._get_gated_columns()
+        if not gated:
+            return
+        plan.only = [column for column in plan.only if column not in gated.values()]
+        plan.prune_columns = True
+
+    def _reads_instances(self) -> bool:
+        """Callable conditions receive the instances of this level."""
+        _, _, batch_conditions, _, dynamic = self._get_active_conditions()
+        return super()._reads_instances() or bool(batch_conditions or dynamic)
+
+    def _get_gated_columns(self) -> Dict[str, str]:
+        """Return the columns only read by a field with an expression condition."""
+        plan = self.get_shape_plan()
+        cached = self._gated_columns
+        if cached is not None and cached[0] is plan:
+            return cached[1]
+
+        _, _, _, expressions, _ = self._get_active_conditions()
+        model = self._get_model()
+        candidates = {}
+        if model is not None and not self._reads_instances():
+            concrete_fields = {
+                field.name: field for field in model._meta.concrete_fields
+            }
+            for field_name, _ in expressions:
+                field = self.fields.get(field_name)
+                if field is None or field_name in plan.nested_names:
+                    continue
+                source = field.source_attrs[0] if len(field.source_attrs) == 1 else None
+                model_field = concrete_fields.get(source)
+                if (
+                    model_field is not None
+                    and not model_field.is_relation
+                    and not model_field.primary_key
+                ):
+                    candidates[field_name] = source
+
+        gated = {}
+        if candidates:
+            required = get_required_columns(
+                model,
+                [
+                    field
+                    for field in self.fields.values()
+                    if field.field_name not in candidates
+                ],
+                self._get_annotation_names(),
+            )
+            if required is not None:
+                gated = {
+                    field_name: column
+                    for field_name, column in candidates.items()
+                    if column not in required
+                }
+
+        self._gated_columns = (plan, gated)
+        return gated
+
+    def _get_context_exclusions(self) -> FrozenSet[str]:
+        """Return the names excluded by ``context_only`` conditions.
+
+        Each condition runs once per top-level call; its result is shared by
+        every row and every nested serializer of the call.
+        """
+        _, context_conditions, _, _, _ = self._get_active_conditions()
+        if not context_conditions:
+            return frozenset()
+
+        store = self._get_call_store("context_exclusions")
+        if "excluded" in store:
+            return store["excluded"]
+
+        results = self._condition_results
+
+        excluded = set()
+        for field_name, condition in context_conditions:
+            key = id(condition)
+            if results is not None and key in results:
+                should_include = results[key]
+            else:
+                should_include = self._call_condition(field_name, condition, None)
+                if results is not None:
+                    results[key] = should_include
+            if not should_include:
+                excluded.add(field_name)
+
+        excluded = store["excluded"] = frozenset(excluded)
+        return excluded
+
+    def _call_condition(self, field_name: str, condition: Any, instance: Any) -> bool:
+        """Evaluate one callable condition, reporting errors as config errors."""
+        try:
+            return bool(condition(instance, self._context))
+        except Exception as e:
+            raise DynamicSerializerConfigError(
+                f"Error evaluating condition for field '{field_name}': {str(e)}"
+            )
+
+    def _get_active_conditions(
+        self,
+    ) -> Tuple[FrozenSet[str], Tuple, Tuple, Tuple, Tuple]:
+        """Split the conditions of output names by when they are evaluated.
+
+        Returns the constant exclusions, the ``context_only`` conditions, the
+        batch conditions, the expression conditions and the per-instance
+        conditions.
+        """
+        plan = self.get_shape_plan()
+        cached = self._active_conditions
+        if cached is None or cached[0] is not plan:
+            names = set(self.fields) | plan.nested_names
+            constant = set()
+            context_conditions = []
+            batch_conditions = []
+            expressions = []
+            dynamic = []
+            for field_name, condition in plan.conditions:
+                if condition is None or field_name not in names:
+                    continue
+                if is_context_only(condition):
+                    context_conditions.append((field_name, condition))
+                elif isinstance(condition, BatchCondition):
+                    batch_conditions.append((field_name, condition))
+                elif is_expression_condition(condition):
+                    if self._get_model() is None:
+                        raise DynamicSerializerConfigError(
+                            f"Condition for field '{field_name}' is a query "
+                            "expression and requires a model serializer"
+                        )
+                    expressions.append((field_name, condition))
+                elif callable(condition):
+                    dynamic.append((field_name, condition))
+                elif not condition:
+                    constant.add(field_name)
+            cached = (
+                plan,
+                frozenset(constant),
+                tuple(context_conditions),
+                tuple(batch_conditions),
+                tuple(expressions),
+                tuple(dynamic),
+            )
+            self._active_conditions = cached
+        return cached[1:]
 
 
 class DynamicNestedSerializerMixin(DynamicSerializerBaseMixin):
@@ -180,26 +1154,526 @@ class DynamicNestedSerializerMixin(DynamicSerializerBaseMixin):
     def __init__(self, *args, **kwargs):
         self._nested = kwargs.pop("nested", None)
         self._nesting_level = kwargs.pop("nesting_level", 0)
+        self._collection_spec = CollectionSpec(
+            filter=kwargs.pop("filter", None),
+            order_by=kwargs.pop("order_by", None),
+            limit=kwargs.pop("limit", None),
+        )
+        self._tree = kwargs.pop("tree", False)
+        self._side_load = kwargs.pop("side_load", False)
+        if not isinstance(self._side_load, (bool, str)):
+            raise DynamicSerializerConfigError(
+                "'side_load' must be a boolean or a type name"
+            )
         super().__init__(*args, **kwargs)
 
+    @property
+    def _readable_fields(self):
+        """Skip the base value of fields that a nested branch overwrites.
+
+        The field keeps its position in the output, but its related ids (a
+        query per row for many-to-many fields) are never computed.
+        """
+        nested_names = self.get_shape_plan().nested_names
+        for field in super()._readable_fields:
+            if field.field_name not in nested_names:
+                yield field
+                continue
+            placeholders = self._get_call_store("placeholders")
+            placeholder = placeholders.get(field.field_name)
+            if placeholder is None:
+                placeholder = NestedPlaceholder(field.field_name)
+                placeholders[field.field_name] = placeholder
+            yield placeholder
+
     def to_representation(self, instance):
         """Apply nested serializer processing."""
-        representation = super().to_representation(instance)
+        with self._condition_scope(instance):
+            representation = super().to_representation(instance)
+
+            plan = self.get_shape_plan()
+            if not plan.nested and not plan.write_only_nested:
+                return representation
+
+            # Initial filtering for dict-based write_only fields
+            for field_name in plan.write_only_nested:
+                representation.pop(field_name, None)
+
+            return self._apply_dynamic_nested(instance, representation)
+
+    def prepare_batch(self, instances: List[Any]) -> None:
+        """Resolve the data of every nested branch for all ``instances`` at once."""
+        super().prepare_batch(instances)
+
+        branches = self.get_shape_plan().nested
+        if not instances or not branches:
+            return
+
+        self._load_forward_relations(instances, branches)
 
-        if not self._nested:
-            return representation
+        for field_name, nested_obj in branches:
+            serializer = nested_obj
+            if isinstance(nested_obj, dict):
+                loader = nested_obj.get("instance")
+                serializer = None
+            else:
+                loader = getattr(nested_obj, "instance", None)
 
-        if not isinstance(self._nested, dict):
-            raise DynamicSerializerConfigError("'nested' must be a dictionary")
+            if self._is_tree_branch(nested_obj):
+                self._load_tree(field_name, nested_obj, instances)
+                continue
 
-        # Initial filtering for dict-based write_only fields
-        for field_name, nested_params in self._nested.items():
-            if isinstance(nested_params, dict) and nested_params.get(
-                "write_only", False
+            if isinstance(loader, BatchLoader):
+                store = self._load_batch(field_name, loader, instances, serializer)
+                children = flatten_batch_data(
+                    store[id(instance)][1] for instance in instances
+                )
+            elif loader is None and serializer is not None:
+                children = flatten_batch_data(
+                    self._get_loaded_relation(instance, field_name, serializer)
+                    for instance in instances
+                )
+            else:
+                continue
+
+            if isinstance(serializer, ListSerializer):
+                serializer = serializer.child
+            if isinstance(serializer, DynamicSerializerBaseMixin) and children:
+                with self._nested_scope(serializer):
+                    serializer.prepare_batch(children)
+
+    def _load_forward_relations(self, instances: List[Any], branches) -> None:
+        """Resolve uncached forward relations with one ``in_bulk()`` per model.
+
+        Foreign key values are collected across all sibling instances and
+        deduplicated, then the fetched objects are stored in each instance's
+        relation cache so per-item serialization does not query again.
+        """
+        model = self._get_model()
+        if model is None or not self.AUTO_OPTIMIZE_QUERYSET:
+            return
+
+        instances = [item for item in instances if isinstance(item, model)]
+        groups = {}
+
+        for field_name, nested_obj in branches:
+            if isinstance(nested_obj, dict):
+                if (
+                    nested_obj.get("write_only")
+                    or nested_obj.get("instance") is not None
+                ):
+                    continue
+                serializer = None
+            elif getattr(nested_obj, "instance", None) is not None:
+                continue
+            else:
+                serializer = nested_obj
+
+            relation = get_relation(model, field_name)
+            if (
+                relation is None
+                or not relation.concrete
+                or not is_single_valued(relation)
             ):
-                representation.pop(field_name, None)
+                continue
 
-        return self._apply_dynamic_nested(instance, representation)
+            key = (relation.related_model, relation.target_field.name)
+            group = groups.setdefault(
+                key, {"relations": [], "serializers": [], "ids": set()}
+            )
+            group["relations"].append(relation)
+            group["serializers"].append(serializer)
+            group["ids"].update(
+                getattr(instance, relation.attname)
+                for instance in instances
+                if not relation.is_cached(instance)
+            )
+
+        for (related_model, target_field), group in groups.items():
+            ids = group["ids"] - {None}
+            if not ids:
+                continue
+
+            queryset = related_model._default_manager.all()
+            serializers = group["serializers"]
+            if len(serializers) == 1 and isinstance(
+                serializers[0], DynamicSerializerBaseMixin
+            ):
+                queryset = serializers[0].optimize_queryset(queryset)
+
+            related_objects = queryset.in_bulk(list(ids), field_name=target_field)
+
+            for relation in group["relations"]:
+                for instance in instances:
+                    if relation.is_cached(instance):
+                        continue
+                    related = related_objects.get(getattr(instance, relation.attname))
+                    if related is not None:
+                        relation.set_cached_value(instance, related)
+
+    def _get_loaded_relation(
+        self, instance: Any, field_name: str, serializer: Any
+    ) -> Any:
+        """Return related data only if it is already cached on ``instance``."""
+        model = self._get_model()
+        relation = get_relation(model, field_name) if model else None
+        if relation is None or not isinstance(instance, models.Model):
+            return None
+
+        spec = self._get_collection_spec(serializer)
+        if spec and hasattr(instance, spec.get_prefetch_attr(field_name)):
+            return getattr(instance, spec.get_prefetch_attr(field_name))
+
+        if is_single_valued(relation):
+            return getattr(instance, field_name) if relation.is_cached(instance) else None
+
+        queryset = getattr(instance, field_name).all()
+        return queryset if queryset._result_cache is not None else None
+
+    def _load_batch(
+        self,
+        field_name: str,
+        loader: BatchLoader,
+        instances: List[Any],
+        serializer: Any = None,
+    ) -> Dict[int, Any]:
+        """Call ``loader`` once for the instances that were not resolved yet.
+
+        Returns the store of the branch, keyed by ``id()`` of the instances.
+        """
+        store = self._get_call_store("batch_data").setdefault(field_name, {})
+        pending = [instance for instance in instances if id(instance) not in store]
+        if not pending:
+            return store
+
+        try:
+            results = loader.load(
+                pending,
+                self.context,
+                default=[] if self._is_many_branch(field_name, serializer) else None,
+            )
+        except Exception as e:
+            raise DynamicSerializerConfigError(
+                f"Error evaluating batch instance for '{field_name}': {e}"
+            )
+
+        for instance in pending:
+            store[id(instance)] = (instance, results[id(instance)])
+        return store
+
+    def _get_batched_data(
+        self, field_name: str, loader: BatchLoader, instance: Any, serializer: Any
+    ) -> Any:
+        """Return the data a batch loader resolved for ``instance``."""
+        store = self._load_batch(field_name, loader, [instance], serializer)
+        return store[id(instance)][1]
+
+    def _is_many_branch(self, field_name: str, serializer: Any) -> bool:
+        """Whether a nested branch serializes a collection."""
+        if isinstance(serializer, ListSerializer):
+            return True
+        model = self._get_model()
+        relation = get_relation(model, field_name) if model else None
+        return relation is not None and not is_single_valued(relation)
+
+    def _is_tree_branch(self, nested_obj: Any) -> bool:
+        """Whether a nested branch loads a self-referential tree at once."""
+        if isinstance(nested_obj, ListSerializer):
+            nested_obj = nested_obj.child
+        return bool(getattr(nested_obj, "_tree", False))
+
+    def _get_tree_relation(self, field_name: str):
+        """Return the self-referential relation a tree branch follows."""
+        model = self._get_model()
+        relation = get_relation(model, field_name) if model else None
+        if relation is None or not is_self_referential(relation):
+            raise DynamicSerializerConfigError(
+                f"Tree mode for '{field_name}' requires a self-referential relation"
+            )
+        return relation
+
+    def _load_tree(
+        self, field_name: str, serializer: BaseSerializer, instances: List[Any]
+    ) -> Dict[Any, List[Any]]:
+        """Load the subtrees of ``instances`` with one recursive query.
+
+        Returns the children of every loaded node, keyed by parent pk.
+        """
+        children, loaded = self._get_call_store("tree_data").setdefault(
+            field_name, (defaultdict(list), set())
+        )
+        root_ids = [
+            instance.pk
+            for instance in instances
+            if instance is not None and instance.pk not in loaded
+        ]
+        if not root_ids:
+            return children
+
+        relation = self._get_tree_relation(field_name)
+        if isinstance(serializer, ListSerializer):
+            serializer = serializer.child
+
+        queryset = get_tree_queryset(relation, root_ids, self.MAX_DEPTH)
+        spec = self._get_collection_spec(serializer)
+        queryset = spec.apply(queryset)
+        if isinstance(serializer, DynamicSerializerBaseMixin):
+            plan = serializer.get_query_plan()
+            plan.add_columns("", [relation.field.name])
+            queryset = plan.apply(queryset)
+
+        nodes = list(queryset)
+        for node in nodes:
+            children[getattr(node, relation.field.attname)].append(node)
+
+        loaded.update(root_ids)
+        loaded.update(node.pk for node in nodes)
+
+        if isinstance(serializer, DynamicSerializerBaseMixin) and nodes:
+            with self._nested_scope(serializer):
+                serializer.prepare_batch(nodes)
+        return children
+
+    def _serialize_tree(
+        self, instance: Any, field_name: str, serializer: BaseSerializer
+    ) -> List[Dict[str, Any]]:
+        """Serialize the subtree below ``instance`` without recursion."""
+        children = self._load_tree(field_name, serializer, [instance])
+        if isinstance(serializer, ListSerializer):
+            serializer = serializer.child
+
+        spec = self._get_collection_spec(serializer)
+        rename_fields = getattr(serializer, "_rename_fields", None) or {}
+        output_name = rename_fields.get(field_name, field_name)
+
+        result = []
+        stack = [(node, result) for node in reversed(spec.slice(children[instance.pk]))]
+        while stack:
+            node, siblings = stack.pop()
+            representation = serializer.to_representation(node)
+            representation[output_name] = []
+            siblings.append(representation)
+
+            for child in reversed(spec.slice(children.get(node.pk, []))):
+                stack.append((child, representation[output_name]))
+
+        return result
+
+    def _reads_instances(self) -> bool:
+        """Callable ``instance`` loaders of nested branches receive the parents."""
+        if super()._reads_instances():
+            return True
+        for _, nested_obj in self.get_shape_plan().nested:
+            if isinstance(nested_obj, dict):
+                loader = nested_obj.get("instance")
+            else:
+                loader = getattr(nested_obj, "instance", None)
+            if callable(loader):
+                return True
+        return False
+
+    def uses_side_loading(self) -> bool:
+        """Whether this level or a nested level side-loads a relation."""
+        for field_name, nested_obj in self.get_shape_plan().nested:
+            if isinstance(nested_obj, dict):
+                if nested_obj.get("side_load"):
+                    return True
+                params_copy = nested_obj.copy()
+                serializer_class = params_copy.pop("serializer", None)
+                if not serializer_class:
+                    continue
+                serializer = self._build_nested_serializer(
+                    serializer_class, None, False, params_copy
+                )
+            else:
+                serializer = nested_obj
+
+            if self._get_side_load(serializer):
+                return True
+            if isinstance(serializer, ListSerializer):
+                serializer = serializer.child
+            if (
+                isinstance(serializer, DynamicSerializerBaseMixin)
+                and serializer.uses_side_loading()
+            ):
+                return True
+
+        return False
+
+    def _get_side_load(self, serializer: Any) -> Any:
+        """Return the ``side_load`` setting of a nested serializer."""
+        if isinstance(serializer, ListSerializer):
+            serializer = serializer.child
+        return getattr(serializer, "_side_load", False)
+
+    def _side_load_data(
+        self, field_name: str, serializer: BaseSerializer, data: Any, side_load: Any
+    ) -> Any:
+        """Move related objects to ``included`` and return their primary keys."""
+        if self._included is None:
+            raise DynamicSerializerConfigError(
+                f"Side-loaded field '{field_name}' requires serializing through .data"
+            )
+        if isinstance(serializer, ListSerializer):
+            serializer = serializer.child
+        if isinstance(data, models.Manager):
+            data = data.all()
+
+        def add(item):
+            type_name = side_load if isinstance(side_load, str) else None
+            if type_name is None and isinstance(item, models.Model):
+                type_name = item._meta.model_name
+            return self._included.add(type_name, item, serializer)
+
+        try:
+            if isinstance(data, (models.QuerySet, list, tuple)):
+                items = list(data)
+                if isinstance(serializer, DynamicSerializerBaseMixin):
+                    serializer.prepare_batch(items)
+                return [add(item) for item in items]
+            return add(data)
+        except Exception as e:
+            raise DynamicSerializerConfigError(
+                f"Error side-loading nested field '{field_name}': {str(e)}"
+            )
+
+    def represent_batch(self, instances: List[Any]) -> List[Any]:
+        """Enter the scope of every nested serializer instance once per batch."""
+        open_scopes = self._get_call_store("open_scopes")
+        with ExitStack() as stack:
+            for _, nested_obj in self.get_shape_plan().nested:
+                key = id(nested_obj)
+                if isinstance(nested_obj, dict) or key in open_scopes:
+                    continue
+                stack.enter_context(self._nested_scope(nested_obj))
+                open_scopes[key] = nested_obj
+                stack.callback(open_scopes.pop, key, None)
+            return super().represent_batch(instances)
+
+    def _branch_scope(self, serializer: BaseSerializer):
+        """Return the nested scope of ``serializer`` unless the batch holds it."""
+        if id(serializer) in self._get_call_store("open_scopes"):
+            return nullcontext(serializer)
+        return self._nested_scope(serializer)
+
+    @contextmanager
+    def _nested_scope(self, serializer: BaseSerializer):
+        """Temporarily merge this serializer's context into a nested serializer."""
+        original_context = getattr(serializer, "_context", {})
+        if self.context:
+            new_context = original_context.copy()
+            new_context.update(self.context)
+            serializer._context = new_context
+
+        if hasattr(serializer, "_nesting_level"):
+            serializer._nesting_level = self._nesting_level + 1
+
+        self._join_call(serializer)
+        try:
+            yield serializer
+        finally:
+            # Restore context to avoid side effects if instance is reused
+            serializer._context = original_context
+
+    def _collect_query_plan(self, plan: QueryPlan, prefix: str) -> None:
+        """Join forward relations and prefetch collections used by ``nested``."""
+        super()._collect_query_plan(plan, prefix)
+
+        model = self._get_model()
+        if model is None:
+            return
+
+        for field_name, nested_obj in self.get_shape_plan().nested:
+            relation = get_relation(model, field_name)
+            if relation is None:
+                continue
+
+            if self._is_tree_branch(nested_obj):
+                continue
+
+            serializer = self._get_planning_serializer(nested_obj)
+            if serializer is None:
+                continue
+
+            is_shapeless = isinstance(serializer, DynamicSerializerBaseMixin)
+            path = f"{prefix}{field_name}"
+
+            if is_single_valued(relation):
+                plan.select_related.append(path)
+                if relation.concrete:
+                    plan.add_columns(prefix, [field_name])
+                if is_shapeless:
+                    serializer._collect_query_plan(plan, f"{path}__")
+                else:
+                    plan.add_columns(
+                        f"{path}__",
+                        [f.name for f in relation.related_model._meta.concrete_fields],
+                    )
+                continue
+
+            queryset = relation.related_model._default_manager.all()
+            to_attr = None
+            spec = self._get_collection_spec(nested_obj)
+            if spec:
+                queryset = spec.apply(queryset)
+                to_attr = spec.get_prefetch_attr(field_name)
+
+            if is_shapeless:
+                nested_plan = serializer.get_query_plan()
+                if isinstance(relation, models.ManyToOneRel):
+                    # The prefetch matches rows back to their parent by this key.
+                    nested_plan.add_columns("", [relation.field.name])
+                queryset = nested_plan.apply(queryset)
+
+            if spec:
+                queryset = spec.limit_per_parent(queryset, relation)
+            plan.prefetch_related.append(
+                Prefetch(path, queryset=queryset, to_attr=to_attr)
+            )
+
+    def _get_collection_spec(self, nested_obj: Any) -> CollectionSpec:
+        """Return the declarative filter/order/limit of a nested branch."""
+        if isinstance(nested_obj, dict):
+            return CollectionSpec(
+                filter=nested_obj.get("filter"),
+                order_by=nested_obj.get("order_by"),
+                limit=nested_obj.get("limit"),
+            )
+        if isinstance(nested_obj, ListSerializer):
+            nested_obj = nested_obj.child
+        return getattr(nested_obj, "_collection_spec", None) or CollectionSpec()
+
+    def _get_planning_serializer(self, nested_obj: Any):
+        """Return the serializer describing a nested branch, if it can be planned.
+
+        Branches that resolve their data through an explicit ``instance`` are
+        not relation traversals and are left alone.
+        """
+        if isinstance(nested_obj, BaseSerializer):
+            if getattr(nested_obj, "instance", None) is not None:
+                return None
+            if isinstance(nested_obj, ListSerializer):
+                nested_obj = nested_obj.child
+            serializer = nested_obj
+
+        elif isinstance(nested_obj, dict):
+            if nested_obj.get("write_only", False):
+                return None
+            if nested_obj.get("instance") is not None:
+                return None
+
+            params_copy = nested_obj.copy()
+            serializer_class = params_copy.pop("serializer", None)
+            if not serializer_class:
+                return None
+            serializer = self._build_nested_serializer(
+                serializer_class, None, False, params_copy
+            )
+
+        else:
+            return None
+
+        return serializer
 
     def _apply_dynamic_nested(
         self,
@@ -207,39 +1681,43 @@ class DynamicNestedSerializerMixin(DynamicSerializerBaseMixin):
         representation: Dict[str, Any],
     ) -> Dict[str, Any]:
         """Process nested serializer configuration."""
-        fields = getattr(self, "_fields", None)
-        fields = set(fields) if fields else None
-
         if self._nesting_level >= self.MAX_DEPTH:
             raise ExcessiveNestingError("Depth exceeds safety margin")
 
-        for field_name, nested_obj in self._nested.items():
-            # Skip fields not in dynamic 'fields' list if it exists
-            if fields is not None and field_name not in fields:
+        excluded = self._excluded_fields
+        for field_name, nested_obj in self.get_shape_plan().nested:
+            if excluded and field_name in excluded:
                 continue
-
             if isinstance(nested_obj, BaseSerializer):
                 self._process_nested_instance(
                     instance, field_name, nested_obj, representation
                 )
-                continue
-
-            # --- OLD PATTERN: Dictionary Configuration ---
-            if isinstance(nested_obj, dict):
-                if nested_obj.get("write_only", False):
-                    continue
-
+            else:
                 self._process_nested_dict(
                     instance, field_name, nested_obj, representation
                 )
-                continue
-
-            raise DynamicSerializerConfigError(
-                f"Nested config for '{field_name}' must be a dictionary or Serializer instance"
-            )
+            if isinstance(representation.get(field_name), NestedPlaceholder):
+                self._represent_base_field(instance, field_name, representation)
 
         return representation
 
+    def _represent_base_field(
+        self, instance: Any, field_name: str, representation: Dict[str, Any]
+    ) -> None:
+        """Write the value of the field a nested branch left without data."""
+        field = self.fields.get(field_name)
+        if field is None:
+            return
+        try:
+            attribute = field.get_attribute(instance)
+        except SkipField:
+            representation.pop(field_name, None)
+            return
+        check = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+        representation[field_name] = (
+            None if check is None else field.to_representation(attribute)
+        )
+
     def _process_nested_instance(
         self,
         instance: Any,
@@ -248,6 +1726,13 @@ class DynamicNestedSerializerMixin(DynamicSerializerBaseMixin):
         representation: Dict[str, Any],
     ) -> None:
         """Handle cases where the nested value is an instantiated serializer."""
+        if self._is_tree_branch(serializer):
+            with self._branch_scope(serializer):
+                representation[field_name] = self._serialize_tree(
+                    instance, field_name, serializer
+                )
+            return
+
         # 1. Resolve Data Source
         # Priority:
         # A. `serializer.instance` if explicitly set (and not None)
@@ -258,7 +1743,11 @@ class DynamicNestedSerializerMixin(DynamicSerializerBaseMixin):
         data_source = getattr(serializer, "instance", None)
 
         if data_source is not None:
-            if callable(data_source):
+            if isinstance(data_source, BatchLoader):
+                data = self._get_batched_data(
+                    field_name, data_source, instance, serializer
+                )
+            elif callable(data_source):
                 try:
                     data = data_source(instance, self.context)
                 except Exception as e:
@@ -270,7 +1759,17 @@ class DynamicNestedSerializerMixin(DynamicSerializerBaseMixin):
         else:
             sentinel = object()
 
-            attr_data = getattr(instance, field_name, sentinel)
+            spec = self._get_collection_spec(serializer)
+            if spec:
+                attr_data = getattr(
+                    instance, spec.get_prefetch_attr(field_name), sentinel
+                )
+                if attr_data is not sentinel:
+                    attr_data = spec.slice(attr_data)
+                else:
+                    attr_data = spec.resolve(getattr(instance, field_name, sentinel))
+            else:
+                attr_data = getattr(instance, field_name, sentinel)
 
             if attr_data is sentinel:
                 try:
@@ -285,43 +1784,49 @@ class DynamicNestedSerializerMixin(DynamicSerializerBaseMixin):
             representation[field_name] = None
             return
 
-        # We merge parent context into the nested serializer context temporarily
-        original_context = getattr(serializer, "_context", {})
-        if self.context:
-            new_context = original_context.copy()
-            new_context.update(self.context)
-            serializer._context = new_context
-
-        # 3. Update Nesting Level
-        if hasattr(serializer, "_nesting_level"):
-            serializer._nesting_level = self._nesting_level + 1
-
-        try:
-            if isinstance(data, models.Manager):
-                data = data.all()
-
-            # Determine if we should iterate
-            # If serializer is a ListSerializer, it handles iteration.
-            # If serializer is a standard Serializer, we only iterate if data is clearly a list/queryset
-            # AND the data is not a single model instance.
-
-            is_serializer_list = isinstance(serializer, ListSerializer)
-            is_data_iterable = isinstance(data, (models.QuerySet, list, tuple))
+        side_load = self._get_side_load(serializer)
+        if side_load:
+            with self._branch_scope(serializer):
+                representation[field_name] = self._side_load_data(
+                    field_name, serializer, data, side_load
+                )
+            return
 
-            if is_data_iterable and not is_serializer_list:
-                representation[field_name] = [
-                    serializer.to_representation(item) for item in data
-                ]
-            else:
-                representation[field_name] = serializer.to_representation(data)
+        # We merge parent context into the nested serializer context temporarily
+        # and update its nesting level.
+        with self._branch_scope(serializer):
+            try:
+                if isinstance(data, models.Manager):
+                    data = data.all()
+
+                # Determine if we should iterate
+                # If serializer is a ListSerializer, it handles iteration.
+                # If serializer is a standard Serializer, we only iterate if data is clearly a list/queryset
+                # AND the data is not a single model instance.
+
+                is_serializer_list = isinstance(serializer, ListSerializer)
+                is_data_iterable = isinstance(data, (models.QuerySet, list, tuple))
+
+                is_shapeless = isinstance(serializer, DynamicSerializerBaseMixin)
+
+                if is_data_iterable and not is_serializer_list:
+                    items = list(data)
+                    if is_shapeless:
+                        serializer.prepare_batch(items)
+                        representation[field_name] = serializer.represent_batch(items)
+                    else:
+                        representation[field_name] = [
+                            serializer.to_representation(item) for item in items
+                        ]
+                elif is_shapeless:
+                    representation[field_name] = serializer.get_representation(data)
+                else:
+                    representation[field_name] = serializer.to_representation(data)
 
-        except Exception as e:
-            raise DynamicSerializerConfigError(
-                f"Error serializing nested field '{field_name}': {str(e)}"
-            )
-        finally:
-            # Restore context to avoid side effects if instance is reused
-            serializer._context = original_context
+            except Exception as e:
+                raise DynamicSerializerConfigError(
+                    f"Error serializing nested field '{field_name}': {str(e)}"
+                )
 
     def _process_nested_dict(
         self,
@@ -360,7 +1865,27 @@ class DynamicNestedSerializerMixin(DynamicSerializerBaseMixin):
                 is_many,
                 params_copy,
             )
-            representation[field_name] = serializer.data
+            target = (
+                serializer.child
+                if isinstance(serializer, ListSerializer)
+                else serializer
+            )
+            is_shapeless = isinstance(target, DynamicSerializerBaseMixin)
+            if is_shapeless:
+                # The configuration outlives the serializers built from it.
+                target._identity_shape = (type(target), id(nested_params))
+            with self._nested_scope(serializer):
+                side_load = self._get_side_load(serializer)
+                if side_load:
+                    representation[field_name] = self._side_load_data(
+                        field_name, serializer, data_to_serialize, side_load
+                    )
+                elif is_shapeless and target is serializer:
+                    representation[field_name] = serializer.get_representation(
+                        data_to_serialize
+                    )
+                else:
+                    representation[field_name] = serializer.data
         except Exception as e:
             raise DynamicSerializerConfigError(
                 f"Error processing '{field_name}' at level {self._nesting_level}: {str(e)}"
@@ -371,11 +1896,14 @@ class DynamicNestedSerializerMixin(DynamicSerializerBaseMixin):
         explicit_instance = nested_params.get("instance")
 
         if explicit_instance is not None:
-            data_to_serialize = (
-                explicit_instance(instance, self.context)
-                if callable(explicit_instance)
-                else explicit_instance
-            )
+            if isinstance(explicit_instance, BatchLoader):
+                data_to_serialize = self._get_batched_data(
+                    field_name, explicit_instance, instance, None
+                )
+            elif callable(explicit_instance):
+                data_to_serialize = explicit_instance(instance, self.context)
+            else:
+                data_to_serialize = explicit_instance
             many = nested_params.get(
                 "many",
                 isinstance(
@@ -387,7 +1915,15 @@ class DynamicNestedSerializerMixin(DynamicSerializerBaseMixin):
         if not hasattr(instance, field_name):
             raise KeyError(f"Field {field_name} not found on instance")
 
+        spec = self._get_collection_spec(nested_params)
+        prefetch_attr = spec.get_prefetch_attr(field_name)
+        if spec and hasattr(instance, prefetch_attr):
+            data_to_serialize = spec.slice(getattr(instance, prefetch_attr))
+            return nested_params.get("many", True), data_to_serialize
+
         related_data = getattr(instance, field_name)
+        if spec:
+            related_data = spec.resolve(related_data)
 
         data_to_serialize = (
             related_data.all()
@@ -426,6 +1962,8 @@ class DynamicNestedSerializerMixin(DynamicSerializerBaseMixin):
 
         params_copy.pop("instance", None)
         params_copy.pop("many", None)
+        for param in ("filter", "order_by", "limit"):
+            params_copy.pop(param, None)
 
         common_params = [
             "read_only",
@@ -446,13 +1984,47 @@ class DynamicNestedSerializerMixin(DynamicSerializerBaseMixin):
 
 
 class InlineShapelessSerializerMixin:
-    """Inline shapeless serializer mixin that dynamically sets Meta.model and Meta.fields."""
+    """Inline shapeless serializer mixin that serializes the ``model`` argument.
+
+    Instances are created from a generated subclass per serializer class and
+    model, whose ``Meta`` declares the model with ``fields = "__all__"``.
+    """
+
+    _inline_model = None
+
+    def __new__(cls, *args, **kwargs):
+        model = kwargs.get("model")
+        if model and cls._inline_model is not model:
+            cls = get_inline_serializer_class(cls, model)
+        return super().__new__(cls, *args, **kwargs)
 
     def __init__(self, *args, **kwargs):
-        model = kwargs.pop("model", None)
-        if model:
-            meta = getattr(self, "Meta", type("Meta", (), {}))
-            meta.model = model
-            meta.fields = "__all__"
-            self.Meta = meta
+        kwargs.pop("model", None)
         super().__init__(*args, **kwargs)
+
+
+@lru_cache(maxsize=INLINE_SERIALIZER_CACHE_SIZE)
+def get_inline_serializer_class(serializer_class: type, model: Any) -> type:
+    """Return the subclass of an inline serializer class bound to ``model``.
+
+    Classes are generated once per pair and shared, so inline serializers
+    reuse the field cache like declared classes and never mutate a ``Meta``
+    shared between threads.
+    """
+    base_meta = getattr(serializer_class, "Meta", None)
+    meta = type(
+        "Meta",
+        (base_meta,) if base_meta is not None else (),
+        {"model": model, "fields": "__all__"},
+    )
+    name = f"{model.__name__}{serializer_class.__name__}"
+    return type(
+        name,
+        (serializer_class,),
+        {
+            "Meta": meta,
+            "_inline_model": model,
+            "__module__": serializer_class.__module__,
+            "__qualname__": f"{serializer_class.__qualname__}.{name}",
+        },
+    )
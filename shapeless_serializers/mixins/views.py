@@ -33,6 +33,7 @@ class ShapelessViewMixin:
             "rename_fields": self.get_serializer_rename_fields(),
             "field_attributes": self.get_serializer_field_attributes(),
             "conditional_fields": self.get_serializer_conditional_fields(),
+            "aggregates": self.get_serializer_aggregates(),
         }
 
     def get_serializer_fields(self) -> Optional[Union[List[str], Set[str]]]:
@@ -69,3 +70,10 @@ class ShapelessViewMixin:
         Default: Looks for 'serializer_conditional_fields' attribute or returns None.
         """
         return getattr(self, "serializer_conditional_fields", None)
+
+    def get_serializer_aggregates(self) -> Optional[Dict[str, Any]]:
+        """
+        Return dictionary of aggregate expressions.
+        Default: Looks for 'serializer_aggregates' attribute or returns None.
+        """
+        return getattr(self, "serializer_aggregates", None)
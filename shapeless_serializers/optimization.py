@@ -0,0 +1,399 @@
+from collections import defaultdict
+from typing import Any, Collection, Dict, Iterable, List, Optional, Sequence, Set
+
+import django
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, models, router
+from django.db.models import F, Prefetch, Q, Window, prefetch_related_objects
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+from rest_framework.relations import HyperlinkedIdentityField
+
+from shapeless_serializers.exceptions import DynamicSerializerConfigError
+
+PREFETCH_ATTR_PREFIX = "_shapeless_"
+ROW_NUMBER_ALIAS = "_shapeless_row_number"
+
+# Modules whose ``to_representation`` implementations the fast paths replicate.
+DEFAULT_REPRESENTATION_MODULES = ("rest_framework.", "shapeless_serializers.")
+
+# Hooks that shapes read from the database without instances bypass.
+BATCH_HOOKS = ("prepare_batch", "represent_batch")
+
+# Filtering on window functions (and sliced prefetches) need Django 4.2.
+SUPPORTS_WINDOW_FILTER = django.VERSION >= (4, 2)
+
+
+def get_relation(model, field_name: str) -> Optional[Any]:
+    """Return the relation reachable through ``getattr(instance, field_name)``."""
+    try:
+        field = model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        field = None
+
+    if field is not None and field.auto_created and not field.concrete:
+        # Reverse relations are registered under their query name, which
+        # differs from the accessor when no related_name is declared.
+        if field.get_accessor_name() != field_name:
+            field = None
+
+    if field is None:
+        for related_object in model._meta.related_objects:
+            if related_object.get_accessor_name() == field_name:
+                field = related_object
+                break
+
+    if field is None or not field.is_relation or field.related_model is None:
+        return None
+    return field
+
+
+def is_single_valued(relation) -> bool:
+    """Whether the relation can be followed with ``select_related``."""
+    return bool(relation.many_to_one or relation.one_to_one)
+
+
+class CollectionSpec:
+    """Declarative filter, ordering and limit of a nested collection."""
+
+    def __init__(
+        self,
+        filter: Optional[Q] = None,
+        order_by: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+    ):
+        if filter is not None and not isinstance(filter, Q):
+            raise DynamicSerializerConfigError("'filter' must be a Q object")
+        if order_by is not None and (
+            not isinstance(order_by, (list, tuple))
+            or not all(isinstance(name, str) for name in order_by)
+        ):
+            raise DynamicSerializerConfigError(
+                "'order_by' must be a list or tuple of field names"
+            )
+        if limit is not None and (
+            isinstance(limit, bool) or not isinstance(limit, int) or limit < 1
+        ):
+            raise DynamicSerializerConfigError("'limit' must be a positive integer")
+
+        self.filter = filter
+        self.order_by = tuple(order_by) if order_by is not None else None
+        self.limit = limit
+
+    def __bool__(self) -> bool:
+        return any(
+            value is not None for value in (self.filter, self.order_by, self.limit)
+        )
+
+    @staticmethod
+    def get_prefetch_attr(field_name: str) -> str:
+        """Name of the attribute holding the prefetched collection."""
+        return f"{PREFETCH_ATTR_PREFIX}{field_name}"
+
+    def apply(self, queryset: models.QuerySet) -> models.QuerySet:
+        """Filter and order ``queryset`` (the limit is applied separately)."""
+        if self.filter is not None:
+            queryset = queryset.filter(self.filter)
+        if self.order_by is not None:
+            queryset = queryset.order_by(*self.order_by)
+        return queryset
+
+    def limit_per_parent(
+        self, queryset: models.QuerySet, relation: Any
+    ) -> models.QuerySet:
+        """Keep at most ``limit`` rows per parent in a prefetch queryset.
+
+        Reverse foreign keys are numbered with ``ROW_NUMBER() OVER (PARTITION
+        BY <fk> ORDER BY ...)`` and filtered on that number, so the database
+        only returns the top rows of each parent.
+        """
+        if self.limit is None or not SUPPORTS_WINDOW_FILTER:
+            return queryset
+
+        if isinstance(relation, models.ManyToOneRel):
+            return queryset.annotate(
+                **{
+                    ROW_NUMBER_ALIAS: Window(
+                        expression=RowNumber(),
+                        partition_by=[F(relation.field.attname)],
+                        order_by=get_order_expressions(queryset),
+                    )
+                }
+            ).filter(**{f"{ROW_NUMBER_ALIAS}__lte": self.limit})
+
+        if relation.many_to_many:
+            # Django partitions sliced many-to-many prefetches itself.
+            return queryset[: self.limit]
+
+        return queryset
+
+    def slice(self, items):
+        """Apply the limit to a queryset or a prefetched list."""
+        return items if self.limit is None else items[: self.limit]
+
+    def resolve(self, related: Any) -> Any:
+        """Return the collection of a related manager with the spec applied."""
+        if not isinstance(related, models.Manager):
+            return related
+        return self.slice(self.apply(related.all()))
+
+
+class QueryPlan:
+    """Collects the queryset optimizations required by a serializer shape."""
+
+    def __init__(self):
+        self.select_related: List[str] = []
+        self.prefetch_related: List[Prefetch] = []
+        self.only: List[str] = []
+        self.prune_columns = False
+
+    def __bool__(self) -> bool:
+        return bool(self.select_related or self.prefetch_related or self.prune_columns)
+
+    def add_columns(self, prefix: str, columns: Iterable[str]) -> None:
+        """Require ``columns`` of the model reached through ``prefix``."""
+        self.only.extend(f"{prefix}{column}" for column in columns)
+
+    def apply(self, queryset: models.QuerySet) -> models.QuerySet:
+        """Apply the plan to an unevaluated queryset."""
+        if not self or not is_optimizable_queryset(queryset):
+            return queryset
+
+        # Relations the caller joined must keep their columns: a deferred
+        # foreign key cannot be traversed by select_related.
+        joined = get_select_related_paths(queryset)
+        prune_columns = (
+            self.prune_columns
+            and joined is not None
+            and joined <= set(self.select_related)
+            and not has_deferred_loading(queryset)
+        )
+
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+
+        prefetches = self._missing_prefetches(queryset._prefetch_related_lookups)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+
+        if prune_columns:
+            queryset = queryset.only(*dict.fromkeys(self.only))
+
+        return queryset
+
+    def apply_to_instances(self, instances: Iterable[models.Model]) -> None:
+        """Apply the plan to already fetched model instances."""
+        instances = [item for item in instances if isinstance(item, models.Model)]
+        if not self or not instances:
+            return
+
+        # Forward relations cannot be joined after the fact, so they are
+        # fetched as prefetch lookups instead (one query per relation).
+        prefetch_related_objects(
+            instances, *self.select_related, *self._missing_prefetches(())
+        )
+
+    def _missing_prefetches(self, existing_lookups) -> List[Prefetch]:
+        """Drop prefetches the caller already declared on the queryset."""
+        existing = {
+            lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+            for lookup in existing_lookups
+        }
+        return [
+            prefetch
+            for prefetch in self.prefetch_related
+            if prefetch.prefetch_to not in existing
+        ]
+
+
+def is_self_referential(relation) -> bool:
+    """Whether ``relation`` is a reverse foreign key of a model onto itself."""
+    return (
+        isinstance(relation, models.ManyToOneRel)
+        and not relation.one_to_one
+        and relation.related_model is relation.model
+    )
+
+
+def get_tree_queryset(
+    relation, root_ids: Sequence[Any], max_depth: int
+) -> models.QuerySet:
+    """Return every descendant of ``root_ids`` through a self-referential FK.
+
+    The subtree is collected with a recursive CTE used as a subquery, so the
+    whole tree of a page of roots is loaded by a single query.
+    """
+    model = relation.related_model
+    connection = connections[router.db_for_read(model)]
+    quote_name = connection.ops.quote_name
+
+    table = quote_name(model._meta.db_table)
+    pk_column = quote_name(model._meta.pk.column)
+    parent_column = quote_name(relation.field.column)
+    placeholders = ", ".join(["%s"] * len(root_ids))
+
+    sql = (
+        "WITH RECURSIVE shapeless_tree (node_id, depth) AS ("
+        f"SELECT {pk_column}, 1 FROM {table} WHERE {parent_column} IN ({placeholders})"
+        " UNION ALL "
+        f"SELECT child.{pk_column}, shapeless_tree.depth + 1 FROM {table} child"
+        f" INNER JOIN shapeless_tree ON child.{parent_column} = shapeless_tree.node_id"
+        " WHERE shapeless_tree.depth < %s"
+        ") SELECT node_id FROM shapeless_tree"
+    )
+    return model._default_manager.filter(
+        pk__in=RawSQL(sql, [*root_ids, max_depth])
+    )
+
+
+def get_order_expressions(queryset: models.QuerySet) -> List[Any]:
+    """Return the ordering of ``queryset`` as expressions usable in a window."""
+    ordering = queryset.query.order_by or queryset.model._meta.ordering or ()
+    if not all(isinstance(name, str) for name in ordering):
+        ordering = ()
+
+    expressions = []
+    for name in ordering:
+        if name == "?":
+            continue
+        descending = name.startswith("-")
+        expression = F(name.lstrip("-"))
+        expressions.append(expression.desc() if descending else expression.asc())
+    return expressions or [F("pk").asc()]
+
+
+def load_annotations(
+    model, instances: Iterable[Any], annotations: Dict[str, Any]
+) -> None:
+    """Set ``annotations`` on the ``model`` instances missing them.
+
+    The values are computed by a separate query grouped by primary key instead
+    of annotating the caller's queryset, where an aggregate would add a GROUP
+    BY that drops its ordering and joins that multiply the counts. Instances
+    the database no longer has get None.
+    """
+    # Joined rows are distinct objects even when they share a primary key.
+    pending = defaultdict(list)
+    for instance in instances:
+        if (
+            isinstance(instance, model)
+            and instance.pk is not None
+            and not all(hasattr(instance, name) for name in annotations)
+        ):
+            pending[instance.pk].append(instance)
+    if not pending:
+        return
+
+    rows = (
+        model._default_manager.filter(pk__in=list(pending))
+        .order_by()
+        .annotate(**annotations)
+        .values_list("pk", *annotations)
+    )
+    values = {row[0]: row[1:] for row in rows}
+
+    for pk, pk_instances in pending.items():
+        row = values.get(pk, (None,) * len(annotations))
+        for instance in pk_instances:
+            for name, value in zip(annotations, row):
+                setattr(instance, name, value)
+
+
+def is_optimizable_queryset(queryset: Any) -> bool:
+    """Return True for querysets that were not evaluated nor turned into values.
+
+    Combined querysets (``union()`` and friends) only allow slicing and
+    ordering, so their rows are loaded after iteration instead.
+    """
+    return (
+        isinstance(queryset, models.QuerySet)
+        and queryset._result_cache is None
+        and queryset._fields is None
+        and not queryset.query.combinator
+        and not getattr(queryset, "_prefetch_done", False)
+    )
+
+
+def get_select_related_paths(queryset: models.QuerySet) -> Optional[Set[str]]:
+    """Return the relation paths joined by ``select_related``, None for all."""
+    select_related = queryset.query.select_related
+    if select_related is True:
+        return None
+
+    paths = set()
+    stack = [("", select_related or {})]
+    while stack:
+        prefix, tree = stack.pop()
+        for name, subtree in tree.items():
+            path = f"{prefix}{name}"
+            paths.add(path)
+            stack.append((f"{path}__", subtree))
+    return paths
+
+
+def has_deferred_loading(queryset: models.QuerySet) -> bool:
+    """Return True if ``only()`` or ``defer()`` was already applied."""
+    field_names, defer = queryset.query.deferred_loading
+    return bool(field_names) or not defer
+
+
+def get_required_columns(
+    model, fields: Iterable[Any], annotations: Collection[str] = ()
+) -> Optional[List[str]]:
+    """Return the concrete columns of ``model`` read by the serializer ``fields``.
+
+    Returns None when a field reads data that cannot be mapped to a column
+    (``source="*"``, method fields, properties), in which case every column
+    has to be loaded. Fields reading one of ``annotations`` need no column.
+    """
+    concrete_fields = {field.name: field for field in model._meta.concrete_fields}
+    columns = {model._meta.pk.name}
+
+    for field in fields:
+        if field.write_only:
+            continue
+
+        if isinstance(field, HyperlinkedIdentityField):
+            lookup_field = field.lookup_field
+            columns.add(model._meta.pk.name if lookup_field == "pk" else lookup_field)
+            continue
+
+        if field.source == "*":
+            return None
+
+        source = field.source_attrs[0]
+        if source == "pk" or source in annotations:
+            continue
+
+        if source in concrete_fields:
+            if not concrete_fields[source].many_to_many:
+                columns.add(source)
+            continue
+
+        if get_relation(model, source) is not None:
+            # Collections are fetched by their own queries.
+            continue
+
+        return None
+
+    return [name for name in concrete_fields if name in columns]
+
+
+def has_default_representation(serializer: Any) -> bool:
+    """Whether ``to_representation`` is only implemented by DRF and this package."""
+    return _has_default_methods(serializer, ("to_representation",))
+
+
+def has_default_batch_hooks(serializer: Any) -> bool:
+    """Whether ``prepare_batch`` and ``represent_batch`` are only implemented here."""
+    return _has_default_methods(serializer, BATCH_HOOKS)
+
+
+def _has_default_methods(serializer: Any, names: Sequence[str]) -> bool:
+    """Whether no class outside DRF and this package implements ``names``."""
+    for klass in type(serializer).__mro__:
+        if klass.__module__.startswith(DEFAULT_REPRESENTATION_MODULES):
+            continue
+        if any(name in vars(klass) for name in names):
+            return False
+    return True
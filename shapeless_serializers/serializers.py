@@ -1,14 +1,26 @@
 from rest_framework import serializers
 
 from shapeless_serializers.mixins.serializers import (
+    DynamicAggregateFieldsMixin,
     DynamicConditionalFieldsMixin,
     DynamicFieldAttributesMixin,
     DynamicFieldRenamingMixin,
     DynamicFieldsMixin,
     DynamicNestedSerializerMixin,
     InlineShapelessSerializerMixin,
+    ShapelessListSerializer,
+    clear_field_cache,
 )
 
+__all__ = [
+    "InlineShapelessModelSerializer",
+    "ShapelessHyperlinkedModelSerializer",
+    "ShapelessListSerializer",
+    "ShapelessModelSerializer",
+    "ShapelessSerializer",
+    "clear_field_cache",
+]
+
 
 class ShapelessSerializer(
     DynamicFieldsMixin,
@@ -25,6 +37,7 @@ class ShapelessModelSerializer(
     DynamicFieldsMixin,
     DynamicFieldAttributesMixin,
     DynamicFieldRenamingMixin,
+    DynamicAggregateFieldsMixin,
     DynamicNestedSerializerMixin,
     DynamicConditionalFieldsMixin,
     serializers.ModelSerializer,
@@ -43,6 +56,7 @@ class ShapelessHyperlinkedModelSerializer(
     DynamicFieldsMixin,
     DynamicFieldAttributesMixin,
     DynamicFieldRenamingMixin,
+    DynamicAggregateFieldsMixin,
     DynamicNestedSerializerMixin,
     DynamicConditionalFieldsMixin,
     serializers.HyperlinkedModelSerializer,
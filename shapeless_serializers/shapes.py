@@ -0,0 +1,306 @@
+from collections import OrderedDict
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
+
+from rest_framework.serializers import BaseSerializer
+
+from shapeless_serializers.exceptions import DynamicSerializerConfigError
+
+SHAPE_PLAN_CACHE_SIZE = 512
+
+# Configuration keys of a nested dictionary that describe the nested shape.
+NESTED_SHAPE_KEYS = ("fields", "rename_fields", "conditional_fields", "nested")
+
+_UNHASHABLE = object()
+
+
+class ShapePlan:
+    """Validated, immutable form of a shapeless configuration.
+
+    Plans are built once per distinct configuration and shared by every
+    serializer instance with that shape, so the representation path only
+    iterates precomputed tuples.
+    """
+
+    __slots__ = (
+        "fields",
+        "renames",
+        "conditions",
+        "nested",
+        "nested_names",
+        "write_only_nested",
+        "nested_plans",
+    )
+
+    def __init__(
+        self,
+        fields: Optional[frozenset],
+        renames: Tuple[Tuple[Any, Any], ...],
+        conditions: Tuple[Tuple[str, Any], ...],
+        nested: Tuple[Tuple[str, Any], ...],
+        write_only_nested: Tuple[str, ...],
+        nested_plans: Dict[str, "ShapePlan"],
+    ):
+        object.__setattr__(self, "fields", fields)
+        object.__setattr__(self, "renames", renames)
+        object.__setattr__(self, "conditions", conditions)
+        object.__setattr__(self, "nested", nested)
+        object.__setattr__(self, "nested_names", frozenset(name for name, _ in nested))
+        object.__setattr__(self, "write_only_nested", write_only_nested)
+        object.__setattr__(self, "nested_plans", MappingProxyType(nested_plans))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ShapePlan is immutable")
+
+    def includes(self, field_name: str) -> bool:
+        """Whether ``field_name`` is selected by ``fields``."""
+        return self.fields is None or field_name in self.fields
+
+
+class ShapeStructure:
+    """Names and layout of a shapeless configuration, without its values.
+
+    Conditions, nested serializer instances and nested dictionaries are only
+    recorded by name, so configurations holding callables or serializer
+    instances share one structure. ``bind`` turns it into the ``ShapePlan``
+    of a configuration with that structure.
+    """
+
+    __slots__ = (
+        "fields",
+        "renames",
+        "conditions",
+        "nested",
+        "write_only_nested",
+        "nested_configs",
+        "_plan",
+    )
+
+    def __init__(
+        self,
+        fields: Optional[frozenset],
+        renames: Tuple[Tuple[Any, Any], ...],
+        conditions: Tuple[str, ...],
+        nested: Tuple[str, ...],
+        write_only_nested: Tuple[str, ...],
+        nested_configs: Tuple[str, ...],
+    ):
+        self.fields = fields
+        self.renames = renames
+        self.conditions = conditions
+        self.nested = nested
+        self.write_only_nested = write_only_nested
+        self.nested_configs = nested_configs
+        self._plan = None
+
+    def bind(self, conditional_fields: Any = None, nested: Any = None) -> ShapePlan:
+        """Return the plan of a configuration with this structure.
+
+        Plans without conditions or nested branches hold no values, so one
+        plan is shared by every configuration with the structure.
+        """
+        if self._plan is not None:
+            return self._plan
+
+        plan = ShapePlan(
+            fields=self.fields,
+            renames=self.renames,
+            conditions=tuple(
+                (name, conditional_fields[name]) for name in self.conditions
+            ),
+            nested=tuple((name, nested[name]) for name in self.nested),
+            write_only_nested=self.write_only_nested,
+            nested_plans={
+                name: get_cached_shape_plan(
+                    *(nested[name].get(key) for key in NESTED_SHAPE_KEYS)
+                )
+                for name in self.nested_configs
+            },
+        )
+        if not self.conditions and not self.nested and not self.nested_configs:
+            self._plan = plan
+        return plan
+
+
+class ShapePlanCache:
+    """Bounded LRU cache of shape structures keyed by structure fingerprint."""
+
+    def __init__(self, maxsize: int = SHAPE_PLAN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._plans = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, fingerprint: Any) -> Optional[ShapeStructure]:
+        with self._lock:
+            plan = self._plans.get(fingerprint)
+            if plan is not None:
+                self._plans.move_to_end(fingerprint)
+            return plan
+
+    def set(self, fingerprint: Any, plan: ShapeStructure) -> None:
+        with self._lock:
+            self._plans[fingerprint] = plan
+            self._plans.move_to_end(fingerprint)
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+
+shape_plan_cache = ShapePlanCache()
+
+
+def get_cached_shape_plan(
+    fields: Any = None,
+    rename_fields: Any = None,
+    conditional_fields: Any = None,
+    nested: Any = None,
+) -> ShapePlan:
+    """Return the plan of a configuration, compiling its structure on the first use."""
+    config = (fields, rename_fields, conditional_fields, nested)
+    fingerprint = get_structure_fingerprint(*config)
+    if fingerprint is _UNHASHABLE:
+        return compile_shape_plan(*config)
+
+    structure = shape_plan_cache.get(fingerprint)
+    if structure is None:
+        structure = compile_shape_structure(*config)
+        shape_plan_cache.set(fingerprint, structure)
+    return structure.bind(conditional_fields, nested)
+
+
+def get_structure_fingerprint(
+    fields: Any = None,
+    rename_fields: Any = None,
+    conditional_fields: Any = None,
+    nested: Any = None,
+) -> Any:
+    """Return the fingerprint of the structure of a configuration.
+
+    Conditions are keyed by name and nested branches by name and kind, so the
+    callables, serializer instances and dictionaries they hold do not take
+    part in the key.
+    """
+    if conditional_fields and not isinstance(conditional_fields, dict):
+        return _UNHASHABLE
+    if nested and not isinstance(nested, dict):
+        return _UNHASHABLE
+
+    branches = []
+    for field_name, nested_obj in (nested or {}).items():
+        if isinstance(nested_obj, dict):
+            kind = (dict, bool(nested_obj.get("write_only", False)))
+        elif isinstance(nested_obj, BaseSerializer):
+            kind = BaseSerializer
+        else:
+            return _UNHASHABLE
+        branches.append((field_name, kind))
+
+    return get_fingerprint(
+        (fields, rename_fields, tuple(conditional_fields or ()), tuple(branches))
+    )
+
+
+def get_fingerprint(value: Any) -> Any:
+    """Return a canonical hashable form of a configuration value.
+
+    Containers are compared by content and classes by identity. Dictionaries
+    keep their order, which decides the order of renamed and nested keys in
+    the output. Returns a
+    sentinel for values that cannot be hashed and for callables, serializer
+    instances and other objects only comparable by identity: a key holding
+    them never matches a rebuilt configuration and would keep them alive.
+    """
+    if isinstance(value, dict):
+        items = []
+        for key, item in value.items():
+            item = get_fingerprint(item)
+            if item is _UNHASHABLE:
+                return _UNHASHABLE
+            items.append((key, item))
+        return (dict, tuple(items))
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [get_fingerprint(item) for item in value]
+        if any(item is _UNHASHABLE for item in items):
+            return _UNHASHABLE
+        if isinstance(value, (set, frozenset)):
+            return (frozenset, frozenset(items))
+        return (type(value), tuple(items))
+
+    if (
+        value is not None
+        and not isinstance(value, type)
+        and (callable(value) or type(value).__hash__ is object.__hash__)
+    ):
+        return _UNHASHABLE
+
+    try:
+        hash(value)
+    except TypeError:
+        return _UNHASHABLE
+    return (type(value), value)
+
+
+def compile_shape_plan(
+    fields: Any = None,
+    rename_fields: Any = None,
+    conditional_fields: Any = None,
+    nested: Any = None,
+) -> ShapePlan:
+    """Validate a configuration and compile it into a ``ShapePlan``."""
+    structure = compile_shape_structure(
+        fields, rename_fields, conditional_fields, nested
+    )
+    return structure.bind(conditional_fields, nested)
+
+
+def compile_shape_structure(
+    fields: Any = None,
+    rename_fields: Any = None,
+    conditional_fields: Any = None,
+    nested: Any = None,
+) -> ShapeStructure:
+    """Validate a configuration and compile it into a ``ShapeStructure``."""
+    if fields is not None and not isinstance(fields, (list, tuple, set)):
+        raise DynamicSerializerConfigError("'fields' must be a list, tuple, or set")
+    if rename_fields and not isinstance(rename_fields, dict):
+        raise DynamicSerializerConfigError("'rename_fields' must be a dictionary")
+    if conditional_fields and not isinstance(conditional_fields, dict):
+        raise DynamicSerializerConfigError("'conditional_fields' must be a dictionary")
+    if nested and not isinstance(nested, dict):
+        raise DynamicSerializerConfigError("'nested' must be a dictionary")
+
+    selected = frozenset(fields) if fields else None
+
+    branches = []
+    write_only = []
+    nested_configs = []
+    for field_name, nested_obj in (nested or {}).items():
+        if isinstance(nested_obj, dict):
+            if nested_obj.get("write_only", False):
+                write_only.append(field_name)
+                continue
+            nested_configs.append(field_name)
+        elif not isinstance(nested_obj, BaseSerializer):
+            raise DynamicSerializerConfigError(
+                f"Nested config for '{field_name}' must be a dictionary or Serializer instance"
+            )
+
+        if selected is None or field_name in selected:
+            branches.append(field_name)
+
+    return ShapeStructure(
+        fields=selected,
+        renames=tuple((rename_fields or {}).items()),
+        conditions=tuple(conditional_fields or ()),
+        nested=tuple(branches),
+        write_only_nested=tuple(write_only),
+        nested_configs=tuple(nested_configs),
+    )
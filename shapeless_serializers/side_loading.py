@@ -0,0 +1,42 @@
+from collections import defaultdict
+from typing import Any, Dict
+
+from django.db import models
+
+from shapeless_serializers.exceptions import DynamicSerializerConfigError
+
+
+class IncludedObjects:
+    """Distinct side-loaded objects of one serialization call, grouped by type."""
+
+    def __init__(self):
+        self.objects = defaultdict(dict)
+        self._shapes = set()
+
+    def add(self, type_name: str, instance: Any, serializer: Any) -> Any:
+        """Serialize ``instance`` into its group once per shape and return its pk."""
+        if not isinstance(instance, models.Model):
+            raise DynamicSerializerConfigError(
+                "Side-loaded relations must resolve to model instances"
+            )
+
+        pk = instance.pk
+        key = (type_name, pk, id(serializer))
+        if key in self._shapes:
+            return pk
+        self._shapes.add(key)
+
+        represent = getattr(serializer, "get_representation", None)
+        representation = (represent or serializer.to_representation)(instance)
+
+        group = self.objects[type_name]
+        if pk in group:
+            # The same object rendered by another shape: keep every field.
+            group[pk] = {**group[pk], **representation}
+        else:
+            group[pk] = representation
+        return pk
+
+    def as_dict(self) -> Dict[str, Dict[Any, Any]]:
+        """Return the objects as ``{type: {pk: representation}}``."""
+        return {type_name: dict(group) for type_name, group in self.objects.items()}
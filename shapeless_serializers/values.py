@@ -0,0 +1,130 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.db import models
+from rest_framework import fields as drf_fields
+from rest_framework.relations import PrimaryKeyRelatedField
+
+from shapeless_serializers.columns import get_source_column, move_renamed_keys
+from shapeless_serializers.optimization import (
+    has_default_batch_hooks,
+    has_default_representation,
+)
+
+# Fields whose representation of these columns is the column value itself.
+IDENTITY_FIELDS = {
+    drf_fields.BooleanField: models.BooleanField,
+    drf_fields.CharField: (models.CharField, models.TextField),
+    drf_fields.EmailField: models.CharField,
+    drf_fields.IntegerField: models.IntegerField,
+    drf_fields.SlugField: models.CharField,
+    drf_fields.URLField: models.CharField,
+}
+
+# Fields that need the model instance rather than a column value.
+INSTANCE_FIELDS = (
+    drf_fields.FileField,
+    drf_fields.HiddenField,
+    drf_fields.ImageField,
+    drf_fields.ModelField,
+    drf_fields.SerializerMethodField,
+)
+
+ITERATOR_CHUNK_SIZE = 2000
+
+
+class ValuesShape:
+    """A flat serializer shape read from ``values_list()`` tuples."""
+
+    def __init__(
+        self,
+        columns: List[str],
+        keys: Tuple[str, ...],
+        converters: List[Tuple[str, Callable[[Any], Any]]],
+    ):
+        self.columns = columns
+        self.keys = keys
+        self.converters = converters
+
+    def fetch(self, queryset: models.QuerySet) -> List[Dict[str, Any]]:
+        """Serialize every row of ``queryset`` without instantiating models."""
+        keys = self.keys
+        converters = self.converters
+        rows = queryset.values_list(*self.columns).iterator(
+            chunk_size=ITERATOR_CHUNK_SIZE
+        )
+
+        result = []
+        for row in rows:
+            item = dict(zip(keys, row))
+            for key, converter in converters:
+                value = item[key]
+                if value is not None:
+                    item[key] = converter(value)
+            result.append(item)
+        return result
+
+
+def compile_values_shape(serializer: Any) -> Optional[ValuesShape]:
+    """Compile ``serializer`` into a ``ValuesShape``, or return None.
+
+    Only shapes whose every field reads a single column of the model are
+    supported. Nested branches, conditions and custom representations need
+    model instances and return None.
+    """
+    get_model = getattr(serializer, "_get_model", None)
+    model = get_model() if get_model is not None else None
+    if model is None or not has_default_representation(serializer):
+        return None
+    if not has_default_batch_hooks(serializer):
+        return None
+    if getattr(serializer, "_conditional_fields", None):
+        return None
+
+    nested = getattr(serializer, "_nested", None)
+    if nested:
+        selected = getattr(serializer, "_fields", None)
+        if not isinstance(nested, dict) or any(
+            not selected or name in selected for name in nested
+        ):
+            return None
+
+    columns = {}
+    converters = {}
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        compiled = _compile_field(model, field)
+        if compiled is None:
+            return None
+        columns[name], converter = compiled
+        if converter is not None:
+            converters[name] = converter
+
+    rename_fields = getattr(serializer, "_rename_fields", None) or {}
+    if not isinstance(rename_fields, dict):
+        return None
+    move_renamed_keys(rename_fields, columns, converters)
+
+    if not columns:
+        return None
+    return ValuesShape(list(columns.values()), tuple(columns), list(converters.items()))
+
+
+def _compile_field(model, field) -> Optional[Tuple[str, Any]]:
+    """Return the column read by ``field`` and the formatting it needs."""
+    model_field = get_source_column(model, field)
+    if model_field is None:
+        return None
+
+    field_class = type(field)
+    if field_class is PrimaryKeyRelatedField:
+        converter = field.pk_field.to_representation if field.pk_field else None
+        return model_field.attname, converter
+
+    if field_class.__module__ != drf_fields.__name__ or issubclass(
+        field_class, INSTANCE_FIELDS
+    ):
+        return None
+    if isinstance(model_field, IDENTITY_FIELDS.get(field_class, ())):
+        return model_field.attname, None
+    return model_field.attname, field.to_representation
@@ -0,0 +1,139 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.db.models import Count
+from django.test import TestCase
+
+from shapeless_serializers import codegen
+from shapeless_serializers.exceptions import DynamicSerializerConfigError
+from test_app.models import Author, Book
+from test_app.serializers import DynamicAuthorSerializer, DynamicBookSerializer
+
+
+class CompiledBookSerializer(DynamicBookSerializer):
+    COMPILED_REPRESENTATION = True
+
+
+class CompiledAuthorSerializer(DynamicAuthorSerializer):
+    COMPILED_REPRESENTATION = True
+
+
+class CompiledRepresentationTests(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(name="Author", bio="Bio")
+        for index in range(3):
+            Book.objects.create(
+                title=f"Book {index}",
+                author=self.author,
+                price=Decimal(f"1{index}.50"),
+                publication_date=datetime.date(2024, 1, index + 1),
+            )
+
+    def assert_same_output(self, **kwargs):
+        compiled = CompiledBookSerializer(
+            list(Book.objects.order_by("pk")), many=True, **kwargs
+        )
+        self.assertIsNot(
+            compiled.child.get_renderer(), compiled.child.to_representation
+        )
+        expected = DynamicBookSerializer(
+            list(Book.objects.order_by("pk")), many=True, **kwargs
+        ).data
+
+        data = compiled.data
+        self.assertEqual(
+            [list(item.items()) for item in data],
+            [list(item.items()) for item in expected],
+        )
+        return data
+
+    def test_fields_and_renames(self):
+        data = self.assert_same_output(
+            fields=["id", "title", "price", "author"],
+            rename_fields={"title": "name", "id": "book_id"},
+        )
+
+        self.assertEqual(list(data[0]), ["price", "author", "name", "book_id"])
+
+    def test_conditions(self):
+        data = self.assert_same_output(
+            conditional_fields={
+                "price": lambda instance, ctx: instance.title != "Book 1",
+                "publication_date": False,
+            }
+        )
+
+        self.assertNotIn("price", data[1])
+        self.assertNotIn("publication_date", data[0])
+
+    def test_nested_branches(self):
+        self.assert_same_output(
+            fields=["title", "author"],
+            rename_fields={"author": "writer"},
+            nested={"author": DynamicAuthorSerializer(fields=["name"])},
+        )
+        self.assert_same_output(
+            fields=["title", "author"],
+            nested={
+                "author": {"serializer": DynamicAuthorSerializer, "fields": ["bio"]}
+            },
+        )
+
+    def test_aggregates(self):
+        compiled = CompiledAuthorSerializer(
+            list(Author.objects.all()),
+            many=True,
+            aggregates={"book_count": Count("book")},
+        )
+
+        self.assertEqual(compiled.data[0]["book_count"], 3)
+
+    def test_renderer_code_is_shared_between_instances(self):
+        codegen._build_binder.cache_clear()
+        for _ in range(3):
+            CompiledBookSerializer(
+                list(Book.objects.all()), many=True, fields=["id", "title"]
+            ).data
+
+        self.assertEqual(codegen._build_binder.cache_info().misses, 1)
+
+    def test_condition_errors_are_wrapped(self):
+        def failing(instance, context):
+            raise ValueError("boom")
+
+        serializer = CompiledBookSerializer(
+            list(Book.objects.all()), many=True, conditional_fields={"title": failing}
+        )
+
+        with self.assertRaisesMessage(
+            DynamicSerializerConfigError,
+            "Error evaluating condition for field 'title': boom",
+        ):
+            serializer.data
+
+    def test_unsupported_shapes_fall_back(self):
+        class CustomSerializer(CompiledBookSerializer):
+            def to_representation(self, instance):
+                return {"custom": True}
+
+        custom = CustomSerializer()
+        colliding = CompiledBookSerializer(rename_fields={"title": "price"})
+
+        self.assertEqual(custom.get_renderer(), custom.to_representation)
+        self.assertEqual(colliding.get_renderer(), colliding.to_representation)
+
+    def test_generated_source_quotes_names(self):
+        source = codegen.generate_source(
+            ((codegen.FIELD, "a'\nb", "c", codegen.INSTANCE_CONDITION, False),), False
+        )
+
+        compile(source, "<test>", "exec")
+        self.assertIn(repr("a'\nb"), source)
+
+    def test_renderer_is_rebuilt_when_the_shape_changes(self):
+        serializer = CompiledBookSerializer(fields=["id", "title"])
+        renderer = serializer.get_renderer()
+
+        with mock.patch.object(serializer, "_rename_fields", {"title": "name"}):
+            self.assertIsNot(serializer.get_renderer(), renderer)
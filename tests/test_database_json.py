@@ -0,0 +1,237 @@
+from unittest import mock
+
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+from rest_framework import serializers
+
+from shapeless_serializers import database_json
+from shapeless_serializers.database_json import JSONShape
+from shapeless_serializers.serializers import ShapelessModelSerializer
+from test_app.models import AuthorProfile, BlogPost, Comment, User
+
+
+class DatabaseJSONUserSerializer(ShapelessModelSerializer):
+    DATABASE_JSON = True
+
+    class Meta:
+        model = User
+        fields = ["id", "username", "email", "is_staff"]
+
+
+class DatabaseJSONAuthorProfileSerializer(ShapelessModelSerializer):
+    DATABASE_JSON = True
+
+    class Meta:
+        model = AuthorProfile
+        fields = ["id", "bio", "website", "is_verified", "user"]
+
+
+class DatabaseJSONBlogPostSerializer(ShapelessModelSerializer):
+    DATABASE_JSON = True
+
+    class Meta:
+        model = BlogPost
+        fields = ["id", "title", "status", "view_count", "author", "publish_date"]
+
+
+class DatabaseJSONCommentSerializer(ShapelessModelSerializer):
+    DATABASE_JSON = True
+
+    class Meta:
+        model = Comment
+        fields = ["id", "content", "parent"]
+
+
+class DatabaseJSONMethodSerializer(DatabaseJSONUserSerializer):
+    display_name = serializers.SerializerMethodField()
+
+    class Meta(DatabaseJSONUserSerializer.Meta):
+        fields = ["id", "username", "display_name"]
+
+    def get_display_name(self, obj):
+        return obj.username.upper()
+
+
+class DatabaseJSONBatchSerializer(DatabaseJSONUserSerializer):
+    def prepare_batch(self, instances):
+        super().prepare_batch(instances)
+        for instance in instances:
+            instance.prepared = True
+
+
+class DatabaseJSONEngineTests(TestCase):
+    def setUp(self):
+        # The backend probes its JSON support with a query on first use.
+        connection.features.has_json_object_function
+
+        for index in range(3):
+            user = User.objects.create(
+                username=f"user{index}",
+                email=f"user{index}@example.com",
+                is_staff=index == 0,
+            )
+            profile = AuthorProfile.objects.create(
+                user=user, bio=f"Bio {index}", is_verified=index % 2 == 0
+            )
+            post = BlogPost.objects.create(
+                title=f"Post {index}",
+                slug=f"post-{index}",
+                author=profile,
+                content="Content",
+                view_count=index * 10,
+            )
+            comment = Comment.objects.create(post=post, user=user, content="Root")
+            Comment.objects.create(
+                post=post, user=user, content="Reply", parent=comment
+            )
+
+    def assertMatchesRegularPath(self, serializer_class, queryset, **kwargs):
+        with self.assertNumQueries(1):
+            data = serializer_class(queryset, many=True, **kwargs).data
+
+        serializer_class.DATABASE_JSON = False
+        try:
+            expected = serializer_class(queryset, many=True, **kwargs).data
+        finally:
+            serializer_class.DATABASE_JSON = True
+
+        self.assertEqual(
+            [list(item.items()) for item in data],
+            [list(item.items()) for item in expected],
+        )
+        return data
+
+    def test_flat_shape(self):
+        data = self.assertMatchesRegularPath(
+            DatabaseJSONUserSerializer, User.objects.order_by("id")
+        )
+
+        self.assertEqual(
+            data[0],
+            {
+                "id": data[0]["id"],
+                "username": "user0",
+                "email": "user0@example.com",
+                "is_staff": True,
+            },
+        )
+        self.assertIs(data[1]["is_staff"], False)
+
+    def test_fields_and_rename_fields(self):
+        data = self.assertMatchesRegularPath(
+            DatabaseJSONBlogPostSerializer,
+            BlogPost.objects.order_by("slug"),
+            fields=["title", "status", "view_count", "author"],
+            rename_fields={"title": "headline", "author": "author_id"},
+        )
+
+        self.assertEqual(data[2]["headline"], "Post 2")
+
+    def test_forward_foreign_keys_are_built_by_the_database(self):
+        data = self.assertMatchesRegularPath(
+            DatabaseJSONBlogPostSerializer,
+            BlogPost.objects.order_by("slug"),
+            fields=["title", "author"],
+            nested={
+                "author": DatabaseJSONAuthorProfileSerializer(
+                    fields=["bio", "is_verified", "user"],
+                    rename_fields={"is_verified": "verified"},
+                    nested={
+                        "user": DatabaseJSONUserSerializer(
+                            fields=["username", "is_staff"]
+                        )
+                    },
+                )
+            },
+        )
+
+        self.assertEqual(
+            data[0]["author"],
+            {
+                "bio": "Bio 0",
+                "user": {"username": "user0", "is_staff": True},
+                "verified": True,
+            },
+        )
+
+    def test_key_order_is_rebuilt_from_the_shape(self):
+        serializer = DatabaseJSONBlogPostSerializer(
+            fields=["title", "author"],
+            rename_fields={"title": "headline"},
+            nested={
+                "author": DatabaseJSONAuthorProfileSerializer(
+                    fields=["bio", "user"],
+                    nested={"user": DatabaseJSONUserSerializer(fields=["username"])},
+                )
+            },
+        )
+        # PostgreSQL and MySQL may return the keys in another order.
+        row = {
+            "headline": "Post",
+            "author": {"user": {"username": "user0"}, "bio": "Bio"},
+        }
+
+        data = JSONShape._reorder(row, serializer.get_json_shape().layout)
+
+        self.assertEqual(list(data), ["author", "headline"])
+        self.assertEqual(list(data["author"]), ["bio", "user"])
+        self.assertEqual(data["author"]["user"], {"username": "user0"})
+
+    def test_key_order_is_kept_on_backends_that_sort_keys(self):
+        vendors = {connection.vendor}
+        with mock.patch.object(database_json, "KEY_SORTING_VENDORS", vendors):
+            data = self.assertMatchesRegularPath(
+                DatabaseJSONCommentSerializer,
+                Comment.objects.order_by("id"),
+                fields=["id", "content", "parent"],
+                rename_fields={"id": "key"},
+                nested={"parent": DatabaseJSONCommentSerializer(fields=["content"])},
+            )
+
+        self.assertEqual(list(data[1]), ["content", "parent", "key"])
+
+    def test_nullable_foreign_keys(self):
+        data = self.assertMatchesRegularPath(
+            DatabaseJSONCommentSerializer,
+            Comment.objects.order_by("id"),
+            fields=["content", "parent"],
+            nested={"parent": DatabaseJSONCommentSerializer(fields=["id", "content"])},
+        )
+
+        self.assertIsNone(data[0]["parent"])
+        self.assertEqual(data[1]["parent"]["content"], "Root")
+
+    def test_unsupported_shapes_fall_back_to_the_regular_path(self):
+        unsupported = [
+            DatabaseJSONBlogPostSerializer(),
+            DatabaseJSONMethodSerializer(),
+            DatabaseJSONUserSerializer(
+                conditional_fields={"email": lambda instance, ctx: False}
+            ),
+            DatabaseJSONUserSerializer(
+                fields=["username", "posts"],
+                aggregates={"posts": Count("author_profile__blog_posts")},
+            ),
+            DatabaseJSONAuthorProfileSerializer(
+                fields=["bio", "blog_posts"],
+                nested={"blog_posts": DatabaseJSONBlogPostSerializer(fields=["id"])},
+            ),
+            DatabaseJSONBatchSerializer(),
+        ]
+        for serializer in unsupported:
+            with self.subTest(serializer=serializer):
+                self.assertIsNone(serializer.get_json_shape())
+
+        data = DatabaseJSONMethodSerializer(User.objects.order_by("id"), many=True).data
+
+        self.assertEqual(data[0]["display_name"], "USER0")
+
+    def test_disabled_by_default(self):
+        serializer = DatabaseJSONUserSerializer(User.objects.all(), many=True)
+        serializer.child.DATABASE_JSON = False
+
+        with self.assertNumQueries(1):
+            data = serializer.data
+
+        self.assertEqual(len(data), 3)
@@ -0,0 +1,193 @@
+import datetime
+
+from django.db.models import Count, Exists, Max, OuterRef
+from django.test import TestCase
+from django.utils import timezone
+
+from shapeless_serializers.exceptions import DynamicSerializerConfigError
+from test_app.models import AuthorProfile, BlogPost, Comment, PostLike, User
+from test_app.serializers import (
+    DynamicAuthorProfileSerializer,
+    DynamicBlogPostSerializer,
+    DynamicCommentSerializer,
+)
+
+
+class DynamicAggregateFieldsMixinTests(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create(username=f"user{index}") for index in range(3)
+        ]
+        self.profile = AuthorProfile.objects.create(user=self.users[0], bio="Bio")
+        self.posts = []
+        for index in range(3):
+            post = BlogPost.objects.create(
+                title=f"Post {index}",
+                slug=f"post-{index}",
+                author=self.profile,
+                content="Content",
+                publish_date=timezone.now() + datetime.timedelta(days=index),
+            )
+            for user in self.users[:index]:
+                PostLike.objects.create(post=post, user=user)
+            for position in range(index + 1):
+                Comment.objects.create(
+                    post=post, user=self.users[0], content=f"Comment {position}"
+                )
+            self.posts.append(post)
+
+    def get_serializer(self, instance, **kwargs):
+        kwargs.setdefault("fields", ["title", "likes_count", "last_like"])
+        return DynamicBlogPostSerializer(
+            instance,
+            aggregates={
+                "likes_count": Count("likes", distinct=True),
+                "last_like": Max("likes__user__username"),
+            },
+            **kwargs,
+        )
+
+    def test_aggregates_are_computed_with_one_separate_query(self):
+        serializer = self.get_serializer(BlogPost.objects.order_by("slug"), many=True)
+
+        # posts, then the aggregates of every post grouped by primary key
+        with self.assertNumQueries(2):
+            data = serializer.data
+
+        self.assertEqual(
+            [dict(item) for item in data],
+            [
+                {"title": "Post 0", "likes_count": 0, "last_like": None},
+                {"title": "Post 1", "likes_count": 1, "last_like": "user0"},
+                {"title": "Post 2", "likes_count": 2, "last_like": "user1"},
+            ],
+        )
+
+    def test_aggregates_respect_fields_and_rename_fields(self):
+        serializer = self.get_serializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "likes_count"],
+            rename_fields={"likes_count": "likes"},
+        )
+
+        self.assertEqual(
+            serializer.child._get_active_aggregates().keys(), {"likes_count"}
+        )
+        self.assertEqual(serializer.data[2], {"title": "Post 2", "likes": 2})
+
+    def test_queryset_ordering_and_slicing_are_kept(self):
+        queryset = BlogPost.objects.all()[:2]
+
+        data = self.get_serializer(queryset, many=True).data
+
+        self.assertEqual(
+            [(item["title"], item["likes_count"]) for item in data],
+            [("Post 2", 2), ("Post 1", 1)],
+        )
+
+    def test_join_filtered_queryset_is_not_regrouped(self):
+        queryset = BlogPost.objects.filter(comments__content__startswith="Comment")
+
+        data = DynamicBlogPostSerializer(
+            queryset,
+            many=True,
+            fields=["title", "likes_count"],
+            aggregates={"likes_count": Count("likes")},
+        ).data
+
+        # One row per matching comment, each with the post's own like count.
+        self.assertEqual(
+            [(item["title"], item["likes_count"]) for item in data],
+            [("Post 2", 2)] * 3 + [("Post 1", 1)] * 2 + [("Post 0", 0)],
+        )
+
+    def test_exists_aggregate(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "has_likes"],
+            aggregates={
+                "has_likes": Exists(PostLike.objects.filter(post=OuterRef("pk")))
+            },
+        )
+
+        self.assertEqual(
+            [item["has_likes"] for item in serializer.data], [False, True, True]
+        )
+
+    def test_aggregates_do_not_disable_column_pruning(self):
+        serializer = self.get_serializer(BlogPost.objects.all(), many=True)
+
+        plan = serializer.child.get_query_plan()
+
+        self.assertTrue(plan.prune_columns)
+        self.assertEqual(set(plan.only), {"id", "title"})
+
+    def test_single_instance_is_computed_with_one_query(self):
+        serializer = self.get_serializer(self.posts[2])
+
+        with self.assertNumQueries(1):
+            data = serializer.data
+
+        self.assertEqual(data["likes_count"], 2)
+
+    def test_instance_lists_are_computed_with_one_query(self):
+        posts = list(BlogPost.objects.order_by("slug"))
+        serializer = self.get_serializer(posts, many=True)
+
+        with self.assertNumQueries(1):
+            data = serializer.data
+
+        self.assertEqual([item["likes_count"] for item in data], [0, 1, 2])
+
+    def test_nested_collection_aggregates_are_computed_per_level(self):
+        serializer = DynamicAuthorProfileSerializer(
+            AuthorProfile.objects.all(),
+            many=True,
+            fields=["bio", "blog_posts"],
+            nested={
+                "blog_posts": DynamicBlogPostSerializer(
+                    fields=["title", "comments_count"],
+                    aggregates={"comments_count": Count("comments")},
+                    order_by=["slug"],
+                )
+            },
+        )
+
+        # profiles, posts prefetch, aggregates of every prefetched post
+        with self.assertNumQueries(3):
+            data = serializer.data
+
+        self.assertEqual(
+            [post["comments_count"] for post in data[0]["blog_posts"]], [1, 2, 3]
+        )
+
+    def test_forward_nested_aggregates_are_batched(self):
+        serializer = DynamicCommentSerializer(
+            Comment.objects.all(),
+            many=True,
+            fields=["content", "post"],
+            nested={
+                "post": DynamicBlogPostSerializer(
+                    fields=["title", "likes_count"],
+                    aggregates={"likes_count": Count("likes")},
+                )
+            },
+        )
+
+        # comments joined with posts, one aggregate query for every post
+        with self.assertNumQueries(2):
+            data = serializer.data
+
+        self.assertEqual(data[-1]["post"], {"title": "Post 2", "likes_count": 2})
+
+    def test_invalid_aggregates_raise_config_error(self):
+        with self.assertRaises(DynamicSerializerConfigError):
+            DynamicBlogPostSerializer(aggregates=["likes"])
+
+        with self.assertRaises(DynamicSerializerConfigError):
+            DynamicBlogPostSerializer(aggregates={"likes_count": "likes"})
+
+        with self.assertRaises(DynamicSerializerConfigError):
+            DynamicBlogPostSerializer(aggregates={"title": Count("likes")})
@@ -1,14 +1,26 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
 from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef, Q
 from django.test import TestCase
 from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.test import APIRequestFactory
 
 from test_app.models import AuthorProfile, BlogPost, Category, Comment
+from shapeless_serializers.conditions import batch_condition, context_only
 from shapeless_serializers.mixins.serializers import (
     DynamicConditionalFieldsMixin,
     DynamicSerializerConfigError,
 )
+from shapeless_serializers.serializers import ShapelessSerializer
+from test_app.serializers import CategorySerializer as DynamicCategorySerializer
+from test_app.serializers import (
+    DynamicAuthorProfileSerializer,
+    DynamicBlogPostSerializer,
+    DynamicCommentSerializer,
+)
 
 User = get_user_model()
 
@@ -342,3 +354,302 @@ class DynamicConditionalFieldsMixinTests(TestCase):
         )
         data2 = serializer2.data
         self.assertNotIn("content", data2)
+
+    def test_excluded_fields_are_not_computed(self):
+        """Test that a field hidden by its condition is never evaluated"""
+        calls = []
+
+        class ExpensiveSerializer(
+            DynamicConditionalFieldsMixin, serializers.ModelSerializer
+        ):
+            expensive = serializers.SerializerMethodField()
+
+            class Meta:
+                model = BlogPost
+                fields = ["id", "title", "expensive"]
+
+            def get_expensive(self, obj):
+                calls.append(obj)
+                return "expensive"
+
+        serializer = ExpensiveSerializer(
+            instance=self.blog_post,
+            context={"request": self.request},
+            conditional_fields={
+                "expensive": lambda instance, ctx: ctx["request"].user.is_staff
+            },
+        )
+
+        self.assertNotIn("expensive", serializer.data)
+        self.assertEqual(calls, [])
+
+    def test_excluded_nested_branches_are_not_serialized(self):
+        """Test that a condition also gates the nested branch of a field"""
+        serializer = DynamicBlogPostSerializer(
+            instance=self.blog_post,
+            fields=["id", "title", "categories"],
+            nested={"categories": DynamicCategorySerializer(many=True)},
+            conditional_fields={"categories": lambda instance, ctx: False},
+        )
+
+        with self.assertNumQueries(0):
+            data = serializer.to_representation(self.blog_post)
+
+        self.assertEqual(list(data), ["id", "title"])
+
+    def test_context_only_condition_runs_once_per_call(self):
+        """Test that a context-only condition is shared by every row and level"""
+        for index in range(3):
+            BlogPost.objects.create(
+                title=f"Post {index}",
+                author=self.author,
+                content="Content",
+                slug=f"post-{index}",
+            )
+        calls = []
+
+        @context_only
+        def is_staff(instance, ctx):
+            calls.append(instance)
+            return ctx["request"].user.is_staff
+
+        def serialize(serializer_class):
+            return serializer_class(
+                BlogPost.objects.order_by("pk"),
+                many=True,
+                context={"request": self.request},
+                fields=["title", "view_count", "author"],
+                conditional_fields={"view_count": is_staff},
+                nested={
+                    "author": {
+                        "serializer": DynamicAuthorProfileSerializer,
+                        "fields": ["bio", "website"],
+                        "conditional_fields": {"website": is_staff},
+                    }
+                },
+            ).data
+
+        class CompiledBlogPostSerializer(DynamicBlogPostSerializer):
+            COMPILED_REPRESENTATION = True
+
+        for serializer_class in (DynamicBlogPostSerializer, CompiledBlogPostSerializer):
+            calls.clear()
+            data = serialize(serializer_class)
+
+            self.assertEqual(calls, [None])
+            self.assertEqual(len(data), 4)
+            self.assertNotIn("view_count", data[0])
+            self.assertEqual(data[0]["author"], {"bio": "Experienced developer"})
+
+    def test_context_only_accepts_bound_methods(self):
+        class Permissions:
+            def is_staff(self, instance, ctx):
+                return ctx["request"].user.is_staff
+
+        condition = context_only(Permissions().is_staff)
+        serializer = DynamicBlogPostSerializer(
+            self.blog_post,
+            context={"request": self.request},
+            fields=["title", "view_count"],
+            conditional_fields={"view_count": condition},
+        )
+
+        self.assertEqual(serializer.data, {"title": self.blog_post.title})
+        self.assertFalse(condition(None, {"request": self.request}))
+
+    def test_batch_condition_runs_once_per_level(self):
+        """Test that a batch condition decides for every row with one call"""
+        posts = [self.blog_post] + [
+            BlogPost.objects.create(
+                title=f"Post {index}",
+                author=self.author,
+                content="Content",
+                slug=f"post-{index}",
+            )
+            for index in range(3)
+        ]
+        calls = []
+
+        @batch_condition
+        def by_pk(instances, ctx):
+            calls.append(len(instances))
+            return {post.pk for post in instances if post.slug != "post-1"}
+
+        @batch_condition
+        def by_instance(instances, ctx):
+            return [post for post in instances if post.slug == "post-1"]
+
+        class CompiledBlogPostSerializer(DynamicBlogPostSerializer):
+            COMPILED_REPRESENTATION = True
+
+        for serializer_class in (DynamicBlogPostSerializer, CompiledBlogPostSerializer):
+            calls.clear()
+            data = serializer_class(
+                BlogPost.objects.order_by("pk"),
+                many=True,
+                fields=["slug", "view_count", "content"],
+                conditional_fields={"view_count": by_pk, "content": by_instance},
+            ).data
+
+            self.assertEqual(calls, [len(posts)])
+            self.assertEqual(
+                [("view_count" in item, "content" in item) for item in data],
+                [(item["slug"] != "post-1", item["slug"] == "post-1") for item in data],
+            )
+
+    def test_batch_condition_runs_once_per_nested_level(self):
+        """Test that a nested batch condition is not repeated for every parent"""
+        for index in range(3):
+            post = BlogPost.objects.create(
+                title=f"Post {index}",
+                author=self.author,
+                content="Content",
+                slug=f"post-{index}",
+            )
+            for position in range(2):
+                Comment.objects.create(
+                    post=post, user=self.user, content=f"Comment {position}"
+                )
+        calls = []
+
+        @batch_condition
+        def approved(instances, ctx):
+            calls.append(len(instances))
+            return [comment for comment in instances if comment.is_approved]
+
+        data = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("pk"),
+            many=True,
+            fields=["slug", "comments"],
+            nested={
+                "comments": DynamicCommentSerializer(
+                    many=True,
+                    fields=["id", "content"],
+                    conditional_fields={"content": approved},
+                )
+            },
+        ).data
+
+        self.assertEqual(calls, [Comment.objects.count()])
+        self.assertEqual(
+            ["content" in comment for comment in data[0]["comments"]],
+            [comment.is_approved for comment in self.blog_post.comments.order_by("pk")],
+        )
+
+    def test_batch_condition_on_single_instance(self):
+        """Test that a batch condition also works without a list"""
+        serializer = DynamicBlogPostSerializer(
+            self.blog_post,
+            fields=["title", "view_count"],
+            conditional_fields={"view_count": batch_condition(lambda posts, ctx: [])},
+        )
+
+        self.assertEqual(serializer.data, {"title": self.blog_post.title})
+
+    def test_expression_conditions_are_evaluated_in_the_database(self):
+        """Test that Q and boolean expressions decide fields from annotations"""
+        for index, status in enumerate(["published", "draft"]):
+            BlogPost.objects.create(
+                title=f"Post {index}",
+                author=self.author,
+                content=f"Content {index}",
+                slug=f"post-{index}",
+                status=status,
+            )
+
+        class CompiledBlogPostSerializer(DynamicBlogPostSerializer):
+            COMPILED_REPRESENTATION = True
+
+        for serializer_class in (DynamicBlogPostSerializer, CompiledBlogPostSerializer):
+            serializer = serializer_class(
+                BlogPost.objects.order_by("pk"),
+                many=True,
+                fields=["slug", "content", "excerpt"],
+                conditional_fields={
+                    "content": Q(status="published"),
+                    "excerpt": Exists(Comment.objects.filter(post=OuterRef("pk"))),
+                },
+            )
+            # posts without the gated column, then conditions and gated values
+            with self.assertNumQueries(2):
+                data = serializer.data
+
+            self.assertNotIn("content", serializer.child.get_query_plan().only)
+            self.assertEqual(
+                [sorted(item) for item in data],
+                [
+                    ["content", "excerpt", "slug"],
+                    ["content", "slug"],
+                    ["slug"],
+                ],
+            )
+            self.assertEqual(data[1]["content"], "Content 0")
+
+    def test_expression_conditions_keep_the_queryset_as_given(self):
+        """Test that expression conditions do not annotate the caller's queryset"""
+        for index in range(2):
+            post = BlogPost.objects.create(
+                title=f"Post {index}",
+                author=self.author,
+                content=f"Content {index}",
+                slug=f"post-{index}",
+                status="published",
+                publish_date=timezone.now() + timezone.timedelta(days=index + 1),
+            )
+            Comment.objects.create(post=post, user=self.user, content="Comment")
+
+        queryset = BlogPost.objects.filter(comments__content="Comment")[:2]
+        data = DynamicBlogPostSerializer(
+            queryset,
+            many=True,
+            fields=["slug", "content"],
+            conditional_fields={"content": Q(status="published")},
+        ).data
+
+        self.assertEqual(
+            [(item["slug"], item["content"]) for item in data],
+            [("post-1", "Content 1"), ("post-0", "Content 0")],
+        )
+
+    def test_expression_condition_on_single_instance(self):
+        """Test that an expression condition is evaluated for a single object"""
+        serializer = DynamicBlogPostSerializer(
+            self.blog_post,
+            fields=["title", "content"],
+            conditional_fields={"content": Q(status="archived")},
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(serializer.data, {"title": self.blog_post.title})
+
+    def test_shared_nested_serializer_keeps_exclusions_per_thread(self):
+        class ProfileSerializer(ShapelessSerializer):
+            name = serializers.CharField()
+            bio = serializers.CharField()
+
+        class PostSerializer(ShapelessSerializer):
+            title = serializers.CharField()
+
+        profile = ProfileSerializer(
+            conditional_fields={
+                "bio": lambda instance, ctx: instance["bio"] == "public"
+            }
+        )
+
+        def serialize(index):
+            bio = "public" if index % 2 else "secret"
+            rows = [
+                {"title": f"Post {row}", "author": {"name": "Jane", "bio": bio}}
+                for row in range(20)
+            ]
+            return bio, PostSerializer(rows, many=True, nested={"author": profile}).data
+
+        interval = sys.getswitchinterval()
+        self.addCleanup(sys.setswitchinterval, interval)
+        sys.setswitchinterval(1e-6)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(serialize, range(200)))
+
+        for bio, data in results:
+            for row in data:
+                self.assertEqual("bio" in row["author"], bio == "public")
@@ -1,3 +1,5 @@
+from unittest import mock
+
 from django.test import TestCase
 from rest_framework import serializers
 
@@ -95,3 +97,20 @@ class DynamicFieldsMixinTests(TestCase):
         )
         self.assertIn("title", serializer.data)
         self.assertNotIn("secret_note", serializer.data)
+
+    def test_unrequested_model_fields_are_not_built(self):
+        build_field = serializers.ModelSerializer.build_field
+        with mock.patch.object(
+            serializers.ModelSerializer,
+            "build_field",
+            autospec=True,
+            side_effect=build_field,
+        ) as mocked:
+            serializer = BlogPostSerializer(
+                instance=self.blog_post, fields=["id", "title"]
+            )
+
+        self.assertEqual(list(serializer.fields), ["id", "title"])
+        self.assertEqual(
+            [call.args[1] for call in mocked.call_args_list], ["id", "title"]
+        )
@@ -1,6 +1,16 @@
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.db.models import Q
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
 
 from shapeless_serializers.exceptions import DynamicSerializerConfigError
+from shapeless_serializers.loaders import batch_loader
+from shapeless_serializers.serializers import ShapelessSerializer
 from test_app.models import (
     AuthorProfile,
     BlogPost,
@@ -11,6 +21,7 @@ from test_app.models import (
     User,
 )
 from test_app.serializers import (
+    CategorySerializer,
     DynamicAuthorProfileSerializer,
     DynamicBlogPostSerializer,
     DynamicCommentSerializer,
@@ -295,3 +306,728 @@ class ComprehensiveNestedSerializerTests(TestCase):
                 nested={"author": "Not a serializer or dict"},
             ).data
         self.assertIn("must be a dictionary or Serializer instance", str(cm.exception))
+
+
+class BatchLoaderNestedSerializerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="reader", email="r@example.com")
+        self.profile = AuthorProfile.objects.create(user=self.user, bio="Bio")
+        self.posts = []
+        for index in range(3):
+            post = BlogPost.objects.create(
+                title=f"Post {index}",
+                slug=f"post-{index}",
+                author=self.profile,
+                content="Content",
+            )
+            self.posts.append(post)
+            for approved in (True, False):
+                comment = Comment.objects.create(
+                    post=post,
+                    user=self.user,
+                    content=f"Comment {index} {approved}",
+                    is_approved=approved,
+                )
+                Comment.objects.create(
+                    post=post,
+                    user=self.user,
+                    parent=comment,
+                    content=f"Reply {index} {approved}",
+                    is_approved=True,
+                )
+        self.calls = []
+
+    def approved_comments(self, posts, ctx):
+        self.calls.append(len(posts))
+        grouped = defaultdict(list)
+        for comment in Comment.objects.filter(
+            post__in=posts, parent__isnull=True, is_approved=True
+        ):
+            grouped[comment.post_id].append(comment)
+        return grouped
+
+    def approved_replies(self, comments, ctx):
+        self.calls.append(len(comments))
+        grouped = defaultdict(list)
+        for reply in Comment.objects.filter(parent__in=comments, is_approved=True):
+            grouped[reply.parent_id].append(reply)
+        return grouped
+
+    def test_batch_loader_is_called_once_for_many_root(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "comments"],
+            nested={
+                "comments": DynamicCommentSerializer(
+                    fields=["content"],
+                    instance=batch_loader(self.approved_comments),
+                )
+            },
+        )
+
+        with self.assertNumQueries(2):
+            data = serializer.data
+
+        self.assertEqual(self.calls, [3])
+        self.assertEqual(data[0]["comments"], [{"content": "Comment 0 True"}])
+        self.assertEqual(data[2]["comments"], [{"content": "Comment 2 True"}])
+
+    def test_shared_nested_serializer_keeps_no_data_between_calls(self):
+        posts = DynamicBlogPostSerializer(
+            many=True,
+            fields=["title", "comments"],
+            nested={
+                "comments": DynamicCommentSerializer(
+                    fields=["content"], instance=batch_loader(self.approved_comments)
+                )
+            },
+        )
+
+        for _ in range(2):
+            data = DynamicAuthorProfileSerializer(
+                self.profile, fields=["bio", "blog_posts"], nested={"blog_posts": posts}
+            ).data
+
+        self.assertEqual(self.calls, [3, 3])
+        self.assertEqual(len(data["blog_posts"]), 3)
+        self.assertIsNone(posts.child._call_state)
+
+    def test_batch_loaders_are_resolved_for_deeper_levels(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "comments"],
+            nested={
+                "comments": DynamicCommentSerializer(
+                    fields=["content", "replies"],
+                    instance=batch_loader(self.approved_comments),
+                    nested={
+                        "replies": DynamicCommentSerializer(
+                            fields=["content"],
+                            instance=batch_loader(self.approved_replies),
+                        )
+                    },
+                )
+            },
+        )
+
+        with self.assertNumQueries(3):
+            data = serializer.data
+
+        self.assertEqual(self.calls, [3, 3])
+        self.assertEqual(
+            data[1]["comments"][0]["replies"], [{"content": "Reply 1 True"}]
+        )
+
+    def test_batch_loaders_below_prefetched_relations(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "comments"],
+            nested={
+                "comments": DynamicCommentSerializer(
+                    fields=["content", "replies"],
+                    nested={
+                        "replies": DynamicCommentSerializer(
+                            fields=["content"],
+                            instance=batch_loader(self.approved_replies),
+                        )
+                    },
+                )
+            },
+        )
+
+        # posts, prefetched comments, one batch for all replies
+        with self.assertNumQueries(3):
+            data = serializer.data
+
+        self.assertEqual(self.calls, [12])
+        self.assertEqual(len(data[0]["comments"]), 4)
+
+    def test_parents_missing_from_mapping_get_empty_collections(self):
+        serializer = DynamicBlogPostSerializer(
+            self.posts[0],
+            fields=["title", "comments"],
+            nested={
+                "comments": DynamicCommentSerializer(
+                    instance=batch_loader(lambda posts, ctx: {}),
+                )
+            },
+        )
+
+        self.assertEqual(serializer.data["comments"], [])
+
+    def test_mapping_keyed_by_instances(self):
+        serializer = DynamicBlogPostSerializer(
+            self.posts[:2],
+            many=True,
+            fields=["title", "author"],
+            nested={
+                "author": DynamicAuthorProfileSerializer(
+                    fields=["bio"],
+                    instance=batch_loader(
+                        lambda posts, ctx: {post: self.profile for post in posts}
+                    ),
+                )
+            },
+        )
+
+        data = serializer.data
+        self.assertEqual(data[1]["author"], {"bio": "Bio"})
+
+    def test_batch_loader_in_dict_config(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "comments"],
+            nested={
+                "comments": {
+                    "serializer": DynamicCommentSerializer,
+                    "fields": ["content"],
+                    "instance": batch_loader(self.approved_comments),
+                }
+            },
+        )
+
+        data = serializer.data
+        self.assertEqual(self.calls, [3])
+        self.assertEqual(data[1]["comments"], [{"content": "Comment 1 True"}])
+
+    def test_batch_loader_errors_are_wrapped(self):
+        def broken(posts, ctx):
+            raise ValueError("boom")
+
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.all(),
+            many=True,
+            nested={
+                "comments": DynamicCommentSerializer(instance=batch_loader(broken))
+            },
+        )
+
+        with self.assertRaises(DynamicSerializerConfigError) as cm:
+            serializer.data
+        self.assertIn(
+            "Error evaluating batch instance for 'comments'", str(cm.exception)
+        )
+
+
+class TreeNestedSerializerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="reader", email="r@example.com")
+        profile = AuthorProfile.objects.create(user=self.user, bio="Bio")
+        self.post = BlogPost.objects.create(
+            title="Thread", slug="thread", author=profile, content="Content"
+        )
+
+        self.first = self.comment("1")
+        self.first_a = self.comment("1.a", parent=self.first)
+        self.comment("1.a.i", parent=self.first_a)
+        self.comment("1.b", parent=self.first, is_approved=False)
+        self.second = self.comment("2")
+        self.comment("2.a", parent=self.second)
+
+    def comment(self, content, parent=None, is_approved=True):
+        return Comment.objects.create(
+            post=self.post,
+            user=self.user,
+            parent=parent,
+            content=content,
+            is_approved=is_approved,
+        )
+
+    def contents(self, nodes):
+        return [(node["content"], self.contents(node["replies"])) for node in nodes]
+
+    def test_whole_tree_is_loaded_with_one_query(self):
+        serializer = DynamicCommentSerializer(
+            Comment.objects.filter(parent__isnull=True).order_by("id"),
+            many=True,
+            fields=["content", "replies"],
+            nested={
+                "replies": DynamicCommentSerializer(
+                    fields=["content", "user"],
+                    tree=True,
+                    nested={"user": UserSerializer(fields=["username"])},
+                )
+            },
+        )
+
+        # root comments, the recursive subtree joined with its users
+        with self.assertNumQueries(2):
+            data = serializer.data
+
+        self.assertEqual(
+            self.contents(data),
+            [
+                ("1", [("1.a", [("1.a.i", [])]), ("1.b", [])]),
+                ("2", [("2.a", [])]),
+            ],
+        )
+        self.assertEqual(data[0]["replies"][0]["user"], {"username": "reader"})
+
+    def test_tree_below_prefetched_collection(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.all(),
+            many=True,
+            fields=["title", "comments"],
+            nested={
+                "comments": DynamicCommentSerializer(
+                    fields=["content", "replies"],
+                    filter=Q(parent__isnull=True),
+                    nested={
+                        "replies": DynamicCommentSerializer(
+                            fields=["content"],
+                            filter=Q(is_approved=True),
+                            tree=True,
+                        )
+                    },
+                )
+            },
+        )
+
+        with self.assertNumQueries(3):
+            data = serializer.data
+
+        self.assertEqual(
+            self.contents(data[0]["comments"]),
+            [("1", [("1.a", [("1.a.i", [])])]), ("2", [("2.a", [])])],
+        )
+
+    def test_shared_tree_serializer_is_reloaded_per_call(self):
+        comments = DynamicCommentSerializer(
+            many=True,
+            fields=["content", "replies"],
+            filter=Q(parent__isnull=True),
+            nested={"replies": DynamicCommentSerializer(fields=["content"], tree=True)},
+        )
+
+        def serialize():
+            return DynamicBlogPostSerializer(
+                self.post, fields=["comments"], nested={"comments": comments}
+            ).data
+
+        serialize()
+        self.comment("2.b", parent=self.second)
+        data = serialize()
+
+        self.assertEqual(
+            self.contents(data["comments"])[1], ("2", [("2.a", []), ("2.b", [])])
+        )
+        self.assertIsNone(comments.child._call_state)
+
+    def test_deep_thread_is_serialized_without_recursion(self):
+        node = self.second
+        for depth in range(60):
+            node = self.comment(f"deep {depth}", parent=node)
+
+        serializer = DynamicCommentSerializer(
+            self.second,
+            fields=["content", "replies"],
+            nested={"replies": DynamicCommentSerializer(fields=["content"], tree=True)},
+        )
+
+        data = serializer.data
+        depth = 0
+        replies = data["replies"]
+        while replies:
+            depth += 1
+            replies = replies[-1]["replies"]
+        self.assertEqual(depth, 60)
+
+    def test_tree_requires_self_referential_relation(self):
+        serializer = DynamicBlogPostSerializer(
+            self.post,
+            fields=["title", "comments"],
+            nested={"comments": DynamicCommentSerializer(tree=True)},
+        )
+
+        with self.assertRaises(DynamicSerializerConfigError) as cm:
+            serializer.data
+        self.assertIn("requires a self-referential relation", str(cm.exception))
+
+
+class ForwardRelationLoaderTests(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create(username=f"user{index}") for index in range(2)
+        ]
+        profile = AuthorProfile.objects.create(user=self.users[0], bio="Bio")
+        for index in range(3):
+            post = BlogPost.objects.create(
+                title=f"Post {index}",
+                slug=f"post-{index}",
+                author=profile,
+                content="Content",
+            )
+            for position in range(4):
+                Comment.objects.create(
+                    post=post,
+                    user=self.users[position % 2],
+                    content=f"Comment {index}.{position}",
+                )
+
+    def test_forward_relations_are_loaded_with_one_query_per_model(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "comments"],
+            nested={
+                "comments": DynamicCommentSerializer(
+                    fields=["content", "user"],
+                    instance=batch_loader(
+                        lambda posts, ctx: {
+                            post.pk: list(Comment.objects.filter(post=post))
+                            for post in posts
+                        }
+                    ),
+                    nested={"user": UserSerializer(fields=["username"])},
+                )
+            },
+        )
+
+        # posts, one comments query per post inside the loader, one users query
+        with CaptureQueriesContext(connection) as queries:
+            data = serializer.data
+
+        user_queries = [
+            query["sql"] for query in queries if 'FROM "auth_user"' in query["sql"]
+        ]
+        self.assertEqual(len(user_queries), 1)
+        self.assertEqual(data[2]["comments"][3]["user"], {"username": "user1"})
+
+    def test_sibling_instances_share_related_objects(self):
+        comments = list(Comment.objects.order_by("id"))
+        serializer = DynamicCommentSerializer(
+            fields=["content", "user"],
+            nested={"user": UserSerializer(fields=["username"])},
+        )
+
+        with self.assertNumQueries(1):
+            serializer.prepare_batch(comments)
+
+        with self.assertNumQueries(0):
+            data = [serializer.to_representation(comment) for comment in comments]
+
+        self.assertEqual(data[1]["user"], {"username": "user1"})
+        self.assertIs(comments[0].user, comments[2].user)
+
+    def test_cached_relations_are_not_reloaded(self):
+        comments = list(Comment.objects.select_related("user"))
+        serializer = DynamicCommentSerializer(
+            fields=["content", "user"],
+            nested={"user": UserSerializer(fields=["username"])},
+        )
+
+        with self.assertNumQueries(0):
+            serializer.prepare_batch(comments)
+
+
+class IdentityMapTests(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create(username=f"user{index}") for index in range(2)
+        ]
+        profile = AuthorProfile.objects.create(user=self.users[0], bio="Bio")
+        self.post = BlogPost.objects.create(
+            title="Post", slug="post", author=profile, content="Content"
+        )
+        self.tag = Tag.objects.create(name="Django", slug="django")
+        self.post.tags.add(self.tag)
+        for index in range(4):
+            Comment.objects.create(
+                post=self.post, user=self.users[index % 2], content=f"Comment {index}"
+            )
+
+    def get_serializer(self, serializer_class, **kwargs):
+        return serializer_class(
+            Comment.objects.order_by("id"),
+            many=True,
+            fields=["content", "user", "post"],
+            nested={
+                "user": UserSerializer(fields=["username"]),
+                "post": DynamicBlogPostSerializer(
+                    fields=["title", "author", "tags"],
+                    nested={
+                        "author": DynamicAuthorProfileSerializer(
+                            fields=["user"],
+                            nested={"user": UserSerializer(fields=["id", "username"])},
+                        ),
+                        "tags": TagSerializer(fields=["name"]),
+                    },
+                ),
+            },
+            **kwargs,
+        )
+
+    def test_repeated_objects_are_serialized_once(self):
+        class IdentityMapCommentSerializer(DynamicCommentSerializer):
+            IDENTITY_MAP = True
+
+        serializer = self.get_serializer(IdentityMapCommentSerializer)
+        data = serializer.data
+
+        self.assertEqual(data[2]["user"], {"username": "user0"})
+        self.assertIs(data[0]["user"], data[2]["user"])
+        self.assertIs(data[0]["post"], data[3]["post"])
+        self.assertIsNone(serializer.child._identity_map)
+
+    def test_objects_are_keyed_by_shape(self):
+        class IdentityMapCommentSerializer(DynamicCommentSerializer):
+            IDENTITY_MAP = True
+
+        data = self.get_serializer(IdentityMapCommentSerializer).data
+
+        self.assertEqual(
+            data[0]["post"]["author"]["user"],
+            {"id": self.users[0].pk, "username": "user0"},
+        )
+        self.assertEqual(data[0]["user"], {"username": "user0"})
+
+    def test_dictionary_configurations_share_their_entries(self):
+        class IdentityMapCommentSerializer(DynamicCommentSerializer):
+            IDENTITY_MAP = True
+
+        class CountingUserSerializer(UserSerializer):
+            calls = 0
+
+            def to_representation(self, instance):
+                CountingUserSerializer.calls += 1
+                return super().to_representation(instance)
+
+        data = IdentityMapCommentSerializer(
+            Comment.objects.order_by("id"),
+            many=True,
+            fields=["content", "user"],
+            nested={
+                "user": {"serializer": CountingUserSerializer, "fields": ["username"]}
+            },
+        ).data
+
+        self.assertEqual(CountingUserSerializer.calls, 2)
+        self.assertEqual(data[2]["user"], {"username": "user0"})
+        self.assertIs(data[0]["user"], data[2]["user"])
+
+    def test_identity_map_is_disabled_by_default(self):
+        data = self.get_serializer(DynamicCommentSerializer).data
+
+        self.assertEqual(data[0]["user"], data[2]["user"])
+        self.assertIsNot(data[0]["user"], data[2]["user"])
+
+
+class SideLoadingTests(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create(username=f"user{index}") for index in range(2)
+        ]
+        profile = AuthorProfile.objects.create(user=self.users[0], bio="Bio")
+        self.tags = [
+            Tag.objects.create(name=name, slug=name.lower())
+            for name in ("Django", "Python")
+        ]
+        self.posts = []
+        for index in range(2):
+            post = BlogPost.objects.create(
+                title=f"Post {index}",
+                slug=f"post-{index}",
+                author=profile,
+                content="Content",
+            )
+            post.tags.add(*self.tags[: index + 1])
+            for position in range(2):
+                Comment.objects.create(
+                    post=post, user=self.users[position], content="Comment"
+                )
+            self.posts.append(post)
+
+    def test_related_objects_are_included_once(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "tags", "comments"],
+            nested={
+                "tags": TagSerializer(fields=["name"], side_load=True),
+                "comments": DynamicCommentSerializer(
+                    fields=["content", "user"],
+                    nested={
+                        "user": UserSerializer(fields=["username"], side_load="users")
+                    },
+                ),
+            },
+        )
+
+        # posts, tags, comments
+        with self.assertNumQueries(3):
+            data = serializer.data
+
+        django, python = self.tags
+        self.assertEqual(data["data"][0]["tags"], [django.pk])
+        self.assertEqual(data["data"][1]["tags"], [django.pk, python.pk])
+        self.assertEqual(
+            data["data"][1]["comments"][1],
+            {"content": "Comment", "user": self.users[1].pk},
+        )
+        self.assertEqual(
+            data["included"],
+            {
+                "tag": {django.pk: {"name": "Django"}, python.pk: {"name": "Python"}},
+                "users": {
+                    self.users[0].pk: {"username": "user0"},
+                    self.users[1].pk: {"username": "user1"},
+                },
+            },
+        )
+
+    def test_shapes_of_the_same_object_are_merged(self):
+        serializer = DynamicCommentSerializer(
+            Comment.objects.order_by("id"),
+            many=True,
+            fields=["user", "post"],
+            nested={
+                "user": UserSerializer(fields=["username"], side_load=True),
+                "post": DynamicBlogPostSerializer(
+                    fields=["author"],
+                    nested={
+                        "author": DynamicAuthorProfileSerializer(
+                            fields=["user"],
+                            nested={
+                                "user": UserSerializer(
+                                    fields=["id", "is_staff"], side_load=True
+                                )
+                            },
+                        )
+                    },
+                ),
+            },
+        )
+
+        data = serializer.data
+
+        self.assertEqual(data["data"][0]["post"]["author"]["user"], self.users[0].pk)
+        self.assertEqual(
+            data["included"]["user"][self.users[0].pk],
+            {"username": "user0", "id": self.users[0].pk, "is_staff": False},
+        )
+
+    def test_single_instance_and_dictionary_configuration(self):
+        serializer = DynamicBlogPostSerializer(
+            self.posts[1],
+            fields=["title", "tags"],
+            nested={
+                "tags": {
+                    "serializer": TagSerializer,
+                    "fields": ["slug"],
+                    "side_load": True,
+                }
+            },
+        )
+
+        data = serializer.data
+
+        self.assertEqual(data["data"]["title"], "Post 1")
+        self.assertEqual(len(data["data"]["tags"]), 2)
+        self.assertEqual(data["included"]["tag"][self.tags[1].pk], {"slug": "python"})
+        self.assertEqual(serializer.data["included"], data["included"])
+
+    def test_output_is_unchanged_without_side_loading(self):
+        serializer = DynamicBlogPostSerializer(
+            self.posts[0],
+            fields=["title", "tags"],
+            nested={"tags": TagSerializer(fields=["name"])},
+        )
+
+        self.assertEqual(
+            serializer.data, {"title": "Post 0", "tags": [{"name": "Django"}]}
+        )
+
+    def test_invalid_side_load_raises_config_error(self):
+        with self.assertRaises(DynamicSerializerConfigError):
+            TagSerializer(side_load=["tags"])
+
+    def test_shared_nested_serializer_keeps_included_per_thread(self):
+        class RowSerializer(ShapelessSerializer):
+            name = serializers.CharField()
+
+        owner = RowSerializer(
+            nested={"user": UserSerializer(fields=["username"], side_load="users")}
+        )
+
+        def serialize(index):
+            users = [
+                User(pk=index * 100 + row, username=f"user{row}") for row in range(10)
+            ]
+            rows = [
+                {"name": "Row", "owner": {"name": "Owner", "user": user}}
+                for user in users
+            ]
+            data = RowSerializer(rows, many=True, nested={"owner": owner}).data
+            return {user.pk for user in users}, data
+
+        interval = sys.getswitchinterval()
+        self.addCleanup(sys.setswitchinterval, interval)
+        sys.setswitchinterval(1e-6)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(serialize, range(1, 201)))
+
+        for pks, data in results:
+            self.assertEqual(set(data["included"]["users"]), pks)
+
+
+class NestedBaseFieldTests(TestCase):
+    def setUp(self):
+        user = User.objects.create(username="writer")
+        profile = AuthorProfile.objects.create(user=user, bio="Bio")
+        self.post = BlogPost.objects.create(
+            title="Post", slug="post", author=profile, content="Content"
+        )
+        category = Category.objects.create(name="Category", slug="category")
+        self.post.categories.add(category)
+        for index in range(2):
+            self.post.tags.add(
+                Tag.objects.create(name=f"Tag {index}", slug=f"t{index}")
+            )
+
+    def test_fields_overwritten_by_nested_are_not_computed(self):
+        serializer = DynamicBlogPostSerializer(
+            fields=["title", "tags", "categories", "author"],
+            nested={
+                "tags": TagSerializer(fields=["name"], many=True),
+                "categories": CategorySerializer(fields=["name"], many=True),
+                "author": DynamicAuthorProfileSerializer(fields=["bio"]),
+            },
+        )
+        post = BlogPost.objects.get(pk=self.post.pk)
+
+        # One query per nested collection and one for the author, no id lists.
+        with self.assertNumQueries(3):
+            data = serializer.to_representation(post)
+
+        self.assertEqual(list(data), ["title", "author", "categories", "tags"])
+        self.assertEqual(data["tags"], [{"name": "Tag 0"}, {"name": "Tag 1"}])
+        self.assertEqual(data["author"], {"bio": "Bio"})
+
+    def test_base_value_is_kept_when_the_branch_writes_nothing(self):
+        class ArticleSerializer(ShapelessSerializer):
+            title = serializers.CharField()
+            author = serializers.CharField()
+
+        class CompiledArticleSerializer(ArticleSerializer):
+            COMPILED_REPRESENTATION = True
+
+        articles = [{"title": "Title", "author": "Jane"}]
+        nested = {"author": {"serializer": DynamicAuthorProfileSerializer}}
+        for serializer_class in (ArticleSerializer, CompiledArticleSerializer):
+            self.assertEqual(
+                serializer_class(articles, many=True, nested=nested).data,
+                [{"title": "Title", "author": "Jane"}],
+            )
+            self.assertEqual(
+                serializer_class(
+                    articles,
+                    many=True,
+                    nested=nested,
+                    rename_fields={"author": "writer"},
+                ).data,
+                [{"title": "Title", "writer": "Jane"}],
+            )
@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 
@@ -159,6 +161,44 @@ class InlineShapelessModelSerializerTests(TestCase):
         self.assertNotIn("bio", data)
         self.assertEqual(data["name"], "Test Author")
 
+    def test_generated_classes_are_shared_per_model(self):
+        """Test that each model gets one cached subclass and Meta is not mutated."""
+
+        class AuthorInlineSerializer(InlineShapelessModelSerializer):
+            class Meta:
+                model = Author
+                fields = ["name"]
+
+        first = InlineShapelessModelSerializer(self.author1, model=Author)
+        second = InlineShapelessModelSerializer(
+            [self.book1], model=Book, many=True, fields=["title"]
+        )
+        third = AuthorInlineSerializer(self.book1, model=Book)
+
+        self.assertIs(type(first), type(InlineShapelessModelSerializer(model=Author)))
+        self.assertIs(
+            type(second.child), type(InlineShapelessModelSerializer(model=Book))
+        )
+        self.assertIsInstance(third, AuthorInlineSerializer)
+        self.assertEqual(third.data["title"], "Test Book")
+        self.assertEqual(AuthorInlineSerializer.Meta.model, Author)
+        self.assertEqual(AuthorInlineSerializer.Meta.fields, ["name"])
+        self.assertFalse(hasattr(InlineShapelessModelSerializer, "Meta"))
+
+    def test_inline_serializers_in_threads(self):
+        """Test that concurrent inline serializers of different models do not mix."""
+
+        def serialize(index):
+            if index % 2:
+                return InlineShapelessModelSerializer(self.book1, model=Book).data
+            return InlineShapelessModelSerializer(self.author1, model=Author).data
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(serialize, range(40)))
+
+        for index, data in enumerate(results):
+            self.assertIn("title" if index % 2 else "name", data)
+
     def test_inline_serializer_many_true(self):
         """Test that InlineShapelessModelSerializer works with many=True."""
         # Create multiple authors
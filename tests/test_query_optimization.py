@@ -0,0 +1,485 @@
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from shapeless_serializers.exceptions import DynamicSerializerConfigError
+from test_app.models import AuthorProfile, BlogPost, Comment, PostLike, Tag, User
+from test_app.serializers import (
+    DynamicAuthorProfileSerializer,
+    DynamicBlogPostSerializer,
+    DynamicCommentSerializer,
+    DynamicLikeSerializer,
+    TagSerializer,
+    UserSerializer,
+)
+
+
+class QueryPlannerTests(TestCase):
+    def setUp(self):
+        self.tag1 = Tag.objects.create(name="Django", slug="django")
+        self.tag2 = Tag.objects.create(name="Python", slug="python")
+
+        for index in range(3):
+            user = User.objects.create(
+                username=f"user{index}", email=f"user{index}@example.com"
+            )
+            profile = AuthorProfile.objects.create(user=user, bio=f"Bio {index}")
+            post = BlogPost.objects.create(
+                title=f"Post {index}",
+                slug=f"post-{index}",
+                author=profile,
+                content="Content",
+            )
+            post.tags.add(self.tag1, self.tag2)
+            Comment.objects.create(post=post, user=user, content="First")
+            Comment.objects.create(post=post, user=user, content="Second")
+
+    def get_serializer(self, instance, **kwargs):
+        return DynamicBlogPostSerializer(
+            instance,
+            fields=["id", "title", "author", "tags", "comments"],
+            nested={
+                "author": DynamicAuthorProfileSerializer(
+                    fields=["bio", "user"],
+                    nested={"user": UserSerializer(fields=["username"])},
+                ),
+                "tags": TagSerializer(fields=["name"]),
+                "comments": DynamicCommentSerializer(
+                    fields=["content", "user"],
+                    nested={"user": UserSerializer(fields=["username"])},
+                ),
+            },
+            **kwargs,
+        )
+
+    def test_queryset_is_planned_before_iteration(self):
+        serializer = self.get_serializer(BlogPost.objects.order_by("slug"), many=True)
+
+        # posts + author/user join, tags prefetch, comments (+ user join)
+        with self.assertNumQueries(3):
+            data = serializer.data
+
+        self.assertEqual(len(data), 3)
+        self.assertEqual(data[0]["author"]["user"]["username"], "user0")
+        self.assertEqual([tag["name"] for tag in data[0]["tags"]], ["Django", "Python"])
+        self.assertEqual(data[0]["comments"][1]["content"], "Second")
+        self.assertEqual(data[0]["comments"][1]["user"]["username"], "user0")
+
+    def test_query_plan_classifies_relations(self):
+        serializer = self.get_serializer(BlogPost.objects.order_by("slug"), many=True)
+        plan = serializer.child.get_query_plan()
+
+        self.assertEqual(plan.select_related, ["author", "author__user"])
+        self.assertEqual(
+            [prefetch.prefetch_to for prefetch in plan.prefetch_related],
+            ["tags", "comments"],
+        )
+
+    def test_query_count_does_not_grow_with_rows(self):
+        for index in range(3, 6):
+            post = BlogPost.objects.create(
+                title=f"Post {index}",
+                slug=f"post-{index}",
+                author=AuthorProfile.objects.first(),
+                content="Content",
+            )
+            post.tags.add(self.tag1)
+
+        with self.assertNumQueries(3):
+            self.get_serializer(BlogPost.objects.order_by("slug"), many=True).data
+
+    def test_dict_nested_config_is_planned(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "comments"],
+            nested={
+                "comments": {
+                    "serializer": DynamicCommentSerializer,
+                    "fields": ["content", "user"],
+                    "nested": {
+                        "user": {
+                            "serializer": UserSerializer,
+                            "fields": ["username"],
+                        }
+                    },
+                }
+            },
+        )
+
+        with self.assertNumQueries(2):
+            data = serializer.data
+        self.assertEqual(data[0]["comments"][0]["user"]["username"], "user0")
+
+    def test_branches_excluded_by_fields_are_not_planned(self):
+        serializer = self.get_serializer(BlogPost.objects.order_by("slug"), many=True)
+        serializer.child._fields = ["id", "title"]
+
+        plan = serializer.child.get_query_plan()
+        self.assertEqual(plan.select_related, [])
+        self.assertEqual(plan.prefetch_related, [])
+
+    def test_explicit_instance_branches_are_not_planned(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "comments"],
+            nested={
+                "comments": DynamicCommentSerializer(
+                    fields=["content"],
+                    instance=lambda instance, ctx: instance.comments.filter(
+                        content="First"
+                    ),
+                )
+            },
+        )
+
+        plan = serializer.child.get_query_plan()
+        self.assertEqual(plan.select_related, [])
+        self.assertEqual(plan.prefetch_related, [])
+        data = serializer.data
+        self.assertEqual(data[0]["comments"], [{"content": "First"}])
+
+    def test_existing_prefetch_lookups_are_kept(self):
+        queryset = BlogPost.objects.order_by("slug").prefetch_related("tags")
+        serializer = self.get_serializer(queryset, many=True)
+
+        with self.assertNumQueries(3):
+            data = serializer.data
+        self.assertEqual(len(data[0]["tags"]), 2)
+
+    def test_list_of_instances_is_prefetched(self):
+        posts = list(BlogPost.objects.order_by("slug"))
+        serializer = self.get_serializer(posts, many=True)
+
+        # author, author__user, tags and comments joined with their users
+        with self.assertNumQueries(4):
+            data = serializer.data
+        self.assertEqual(len(data), 3)
+
+    def test_single_instance_is_prefetched(self):
+        post = BlogPost.objects.get(slug="post-0")
+        serializer = self.get_serializer(post)
+
+        with self.assertNumQueries(4):
+            data = serializer.data
+        self.assertEqual(len(data["comments"]), 2)
+
+    def test_combined_queryset_is_loaded_after_iteration(self):
+        queryset = (
+            BlogPost.objects.filter(slug="post-0")
+            .order_by()
+            .union(BlogPost.objects.filter(slug="post-1").order_by())
+        )
+        serializer = self.get_serializer(queryset.order_by("slug"), many=True)
+
+        data = serializer.data
+
+        self.assertEqual([post["title"] for post in data], ["Post 0", "Post 1"])
+        self.assertEqual(data[1]["author"]["user"]["username"], "user1")
+        self.assertEqual(len(data[1]["comments"]), 2)
+
+    def test_optimization_can_be_disabled(self):
+        class UnoptimizedBlogPostSerializer(DynamicBlogPostSerializer):
+            AUTO_OPTIMIZE_QUERYSET = False
+
+        queryset = BlogPost.objects.order_by("slug")
+        serializer = UnoptimizedBlogPostSerializer(
+            queryset,
+            many=True,
+            nested={"tags": TagSerializer(fields=["name"])},
+        )
+
+        self.assertIs(serializer.child.optimize_queryset(queryset), queryset)
+
+
+class ColumnPruningTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="writer", email="w@example.com")
+        self.profile = AuthorProfile.objects.create(user=self.user, bio="Long bio")
+        for index in range(2):
+            post = BlogPost.objects.create(
+                title=f"Post {index}",
+                slug=f"post-{index}",
+                author=self.profile,
+                content="A very long body",
+            )
+            Comment.objects.create(post=post, user=self.user, content="Long comment")
+
+    def capture(self, serializer):
+        with CaptureQueriesContext(connection) as queries:
+            data = serializer.data
+        return data, [query["sql"] for query in queries.captured_queries]
+
+    def test_root_queryset_only_loads_requested_columns(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"), many=True, fields=["id", "title"]
+        )
+
+        data, queries = self.capture(serializer)
+
+        self.assertEqual(data[0], {"id": data[0]["id"], "title": "Post 0"})
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"test_app_blogpost"."title"', queries[0])
+        self.assertNotIn('"test_app_blogpost"."content"', queries[0])
+
+    def test_nested_levels_are_pruned(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "author", "comments"],
+            nested={
+                "author": DynamicAuthorProfileSerializer(
+                    fields=["user"],
+                    nested={"user": UserSerializer(fields=["username"])},
+                ),
+                "comments": DynamicCommentSerializer(fields=["id", "is_approved"]),
+            },
+        )
+
+        data, queries = self.capture(serializer)
+
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(data[0]["author"]["user"]["username"], "writer")
+        self.assertEqual(len(data[1]["comments"]), 1)
+        self.assertNotIn('"test_app_authorprofile"."bio"', queries[0])
+        self.assertNotIn('"auth_user"."password"', queries[0])
+        self.assertNotIn('"test_app_comment"."content"', queries[1])
+        self.assertIn('"test_app_comment"."post_id"', queries[1])
+
+    def test_method_fields_disable_pruning_for_their_level(self):
+        class SummarySerializer(DynamicBlogPostSerializer):
+            summary = serializers.SerializerMethodField()
+
+            def get_summary(self, obj):
+                return obj.content[:6]
+
+        serializer = SummarySerializer(
+            BlogPost.objects.order_by("slug"), many=True, fields=["id", "summary"]
+        )
+
+        with self.assertNumQueries(1):
+            data = serializer.data
+        self.assertEqual(data[0]["summary"], "A very")
+
+    def test_relations_joined_by_the_caller_disable_pruning(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.select_related("author").order_by("slug"),
+            many=True,
+            fields=["id", "title", "tags"],
+        )
+
+        data, queries = self.capture(serializer)
+
+        self.assertEqual([item["title"] for item in data], ["Post 0", "Post 1"])
+        self.assertIn('"test_app_blogpost"."content"', queries[0])
+
+    def test_callables_disable_pruning_for_their_level(self):
+        for index in range(3):
+            BlogPost.objects.create(
+                title=f"Extra {index}", slug=f"extra-{index}", author=self.profile
+            )
+
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["id", "title"],
+            conditional_fields={"title": lambda post, ctx: post.status == "draft"},
+        )
+
+        with self.assertNumQueries(1):
+            data = serializer.data
+        self.assertEqual(len(data), 5)
+
+    def test_existing_deferred_loading_is_kept(self):
+        queryset = BlogPost.objects.order_by("slug").defer("excerpt")
+        serializer = DynamicBlogPostSerializer(fields=["title"])
+
+        sql = str(serializer.optimize_queryset(queryset).query)
+        self.assertIn('"test_app_blogpost"."content"', sql)
+
+
+class DeclarativeNestedCollectionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="writer", email="w@example.com")
+        profile = AuthorProfile.objects.create(user=self.user, bio="Bio")
+        for index in range(3):
+            post = BlogPost.objects.create(
+                title=f"Post {index}",
+                slug=f"post-{index}",
+                author=profile,
+                content="Content",
+            )
+            for position in range(3):
+                comment = Comment.objects.create(
+                    post=post,
+                    user=self.user,
+                    content=f"Comment {index}.{position}",
+                    is_approved=position != 1,
+                )
+                Comment.objects.create(
+                    post=post,
+                    user=self.user,
+                    parent=comment,
+                    content=f"Reply {index}.{position}",
+                    is_approved=True,
+                )
+
+    def get_serializer(self, instance, **comment_kwargs):
+        return DynamicBlogPostSerializer(
+            instance,
+            many=not isinstance(instance, BlogPost),
+            fields=["title", "comments"],
+            nested={
+                "comments": DynamicCommentSerializer(
+                    fields=["content"],
+                    filter=Q(is_approved=True, parent__isnull=True),
+                    **comment_kwargs,
+                )
+            },
+        )
+
+    def test_filtered_collection_is_prefetched_once(self):
+        serializer = self.get_serializer(
+            BlogPost.objects.order_by("slug"), order_by=["-id"]
+        )
+
+        plan = serializer.child.get_query_plan()
+        self.assertEqual(plan.prefetch_related[0].to_attr, "_shapeless_comments")
+
+        with self.assertNumQueries(2):
+            data = serializer.data
+
+        self.assertEqual(
+            data[0]["comments"],
+            [{"content": "Comment 0.2"}, {"content": "Comment 0.0"}],
+        )
+
+    def test_limit_is_applied_per_parent(self):
+        serializer = self.get_serializer(
+            BlogPost.objects.order_by("slug"), order_by=["id"], limit=1
+        )
+
+        data = serializer.data
+        self.assertEqual(data[1]["comments"], [{"content": "Comment 1.0"}])
+
+    def test_single_instance_uses_prefetch(self):
+        post = BlogPost.objects.get(slug="post-2")
+        serializer = self.get_serializer(post, order_by=["id"])
+
+        with self.assertNumQueries(1):
+            data = serializer.data
+        self.assertEqual(len(data["comments"]), 2)
+
+    def test_spec_is_applied_without_prefetch(self):
+        post = BlogPost.objects.get(slug="post-1")
+        serializer = self.get_serializer(post, order_by=["-id"], limit=1)
+
+        data = serializer.to_representation(post)
+        self.assertEqual(data["comments"], [{"content": "Comment 1.2"}])
+
+    def test_dict_config_spec(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "comments"],
+            nested={
+                "comments": {
+                    "serializer": DynamicCommentSerializer,
+                    "fields": ["content"],
+                    "filter": Q(is_approved=False),
+                }
+            },
+        )
+
+        with self.assertNumQueries(2):
+            data = serializer.data
+        self.assertEqual(data[2]["comments"], [{"content": "Comment 2.1"}])
+
+    def test_invalid_spec(self):
+        with self.assertRaises(DynamicSerializerConfigError):
+            DynamicCommentSerializer(filter={"is_approved": True})
+        with self.assertRaises(DynamicSerializerConfigError):
+            DynamicCommentSerializer(order_by="created_at")
+        with self.assertRaises(DynamicSerializerConfigError):
+            DynamicCommentSerializer(limit=-1)
+        with self.assertRaises(DynamicSerializerConfigError):
+            DynamicCommentSerializer(limit=0)
+
+
+class TopNPerParentTests(TestCase):
+    def setUp(self):
+        profile = AuthorProfile.objects.create(
+            user=User.objects.create(username="writer"), bio="Bio"
+        )
+        self.tags = [
+            Tag.objects.create(name=f"Tag {index}", slug=f"tag-{index}")
+            for index in range(4)
+        ]
+        for index in range(2):
+            post = BlogPost.objects.create(
+                title=f"Post {index}",
+                slug=f"post-{index}",
+                author=profile,
+                content="Content",
+            )
+            post.tags.add(*self.tags)
+            for position in range(5):
+                user = User.objects.create(username=f"fan-{index}-{position}")
+                Comment.objects.create(
+                    post=post, user=user, content=f"Comment {index}.{position}"
+                )
+                PostLike.objects.create(post=post, user=user)
+
+    def test_latest_comments_per_post_are_fetched_in_one_query(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "comments"],
+            nested={
+                "comments": DynamicCommentSerializer(
+                    fields=["content"], order_by=["-id"], limit=3
+                )
+            },
+        )
+
+        queryset = serializer.child.optimize_queryset(BlogPost.objects.order_by("slug"))
+        with CaptureQueriesContext(connection) as queries:
+            posts = list(queryset)
+
+        self.assertEqual(len(queries), 2)
+        self.assertIn("ROW_NUMBER", queries[1]["sql"])
+        self.assertEqual([len(post._shapeless_comments) for post in posts], [3, 3])
+
+        data = serializer.data
+        self.assertEqual(
+            [comment["content"] for comment in data[1]["comments"]],
+            ["Comment 1.4", "Comment 1.3", "Comment 1.2"],
+        )
+
+    def test_limit_uses_model_ordering_by_default(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "likes"],
+            nested={"likes": DynamicLikeSerializer(fields=["id"], limit=2)},
+        )
+
+        with self.assertNumQueries(2):
+            data = serializer.data
+        self.assertEqual([len(post["likes"]) for post in data], [2, 2])
+
+    def test_limit_on_many_to_many(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.order_by("slug"),
+            many=True,
+            fields=["title", "tags"],
+            nested={"tags": TagSerializer(fields=["name"], limit=2)},
+        )
+
+        with self.assertNumQueries(2):
+            data = serializer.data
+        self.assertEqual(data[0]["tags"], [{"name": "Tag 0"}, {"name": "Tag 1"}])
+        self.assertEqual(len(data[1]["tags"]), 2)
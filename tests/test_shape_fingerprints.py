@@ -0,0 +1,152 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.test import SimpleTestCase
+
+from shapeless_serializers.exceptions import DynamicSerializerConfigError
+from shapeless_serializers.fingerprints import (
+    get_canonical_shape,
+    get_shape_fingerprint,
+    shape_key,
+)
+from shapeless_serializers.loaders import batch_loader
+from test_app.serializers import (
+    DynamicAuthorSerializer,
+    DynamicBlogPostSerializer,
+    DynamicBookSerializer,
+    DynamicCommentSerializer,
+)
+
+
+def is_available(instance, context):
+    return True
+
+
+class ShapeFingerprintTests(SimpleTestCase):
+    def test_equal_shapes_have_equal_fingerprints(self):
+        first = DynamicBookSerializer(
+            fields=["id", "title", "author"],
+            rename_fields={"title": "name", "id": "book_id"},
+            nested={"author": DynamicAuthorSerializer(fields=["name", "bio"])},
+        )
+        second = DynamicBookSerializer(
+            fields=["author", "title", "id"],
+            rename_fields={"id": "book_id", "title": "name"},
+            nested={"author": DynamicAuthorSerializer(fields=["bio", "name"])},
+        )
+
+        self.assertEqual(first.get_shape_fingerprint(), second.get_shape_fingerprint())
+        self.assertRegex(first.get_shape_fingerprint(), r"^[0-9a-f]{64}$")
+
+    def test_different_shapes_have_different_fingerprints(self):
+        base = DynamicBookSerializer(fields=["id", "title"])
+        fingerprints = {
+            get_shape_fingerprint(serializer)
+            for serializer in (
+                base,
+                DynamicBookSerializer(fields=["id"]),
+                DynamicBookSerializer(fields=["id", "title"], many=True),
+                DynamicBookSerializer(
+                    fields=["id", "title"], rename_fields={"title": "name"}
+                ),
+                DynamicAuthorSerializer(fields=["id", "title"]),
+                DynamicBookSerializer(
+                    fields=["id", "title"], conditional_fields={"id": is_available}
+                ),
+            )
+        }
+
+        self.assertEqual(len(fingerprints), 6)
+
+    def test_dict_and_instance_nested_configs(self):
+        def build(**author_config):
+            return DynamicBlogPostSerializer(
+                nested={
+                    "comments": {
+                        "serializer": DynamicCommentSerializer,
+                        "filter": Q(is_approved=True),
+                        "order_by": ["-created_at"],
+                        "limit": 3,
+                        "fields": ["id", "content"],
+                    },
+                    "author": DynamicAuthorSerializer(**author_config),
+                },
+                aggregates={"comment_count": Count("comments")},
+            )
+
+        self.assertEqual(
+            get_shape_fingerprint(build(fields=["name"])),
+            get_shape_fingerprint(build(fields=["name"])),
+        )
+        self.assertNotEqual(
+            get_shape_fingerprint(build(fields=["name"])),
+            get_shape_fingerprint(build(fields=["bio"])),
+        )
+
+    def test_callables_are_identified_by_name_or_key(self):
+        def build(condition):
+            return DynamicBookSerializer(conditional_fields={"price": condition})
+
+        first = lambda instance, context: True
+        second = lambda instance, context: False
+
+        self.assertEqual(
+            get_shape_fingerprint(build(is_available)),
+            get_shape_fingerprint(build(is_available)),
+        )
+        self.assertNotEqual(
+            get_shape_fingerprint(build(first)), get_shape_fingerprint(build(second))
+        )
+        self.assertEqual(
+            get_shape_fingerprint(build(shape_key("staff")(lambda i, c: True))),
+            get_shape_fingerprint(build(shape_key("staff")(lambda i, c: False))),
+        )
+
+    def test_batch_loaders_are_identified_by_function(self):
+        @batch_loader
+        def load_books(authors, context):
+            return {}
+
+        serializer = DynamicAuthorSerializer(
+            nested={"books": DynamicBookSerializer(instance=load_books, many=True)}
+        )
+
+        self.assertIn("load_books", str(get_canonical_shape(serializer)))
+
+    def test_unidentifiable_values_are_rejected(self):
+        serializer = DynamicBookSerializer(
+            conditional_fields={"price": object()},
+        )
+
+        with self.assertRaises(DynamicSerializerConfigError):
+            get_shape_fingerprint(serializer)
+
+    def test_fingerprint_is_stable_across_processes(self):
+        script = (
+            "import django, os;"
+            "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings');"
+            "django.setup();"
+            "from test_app.serializers import DynamicBookSerializer as S;"
+            "print(S(fields={'id', 'title', 'author', 'price'},"
+            " rename_fields={'title': 'name', 'price': 'cost'}).get_shape_fingerprint())"
+        )
+        outputs = {
+            subprocess.run(
+                [sys.executable, "-c", script],
+                capture_output=True,
+                check=True,
+                text=True,
+                cwd=settings.BASE_DIR,
+                env={**os.environ, "PYTHONHASHSEED": seed},
+            ).stdout.strip()
+            for seed in ("1", "2")
+        }
+
+        expected = DynamicBookSerializer(
+            fields=["price", "author", "title", "id"],
+            rename_fields={"price": "cost", "title": "name"},
+        ).get_shape_fingerprint()
+        self.assertEqual(outputs, {expected})
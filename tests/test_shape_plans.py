@@ -0,0 +1,157 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+
+from shapeless_serializers.exceptions import DynamicSerializerConfigError
+from shapeless_serializers.shapes import (
+    ShapePlanCache,
+    compile_shape_plan,
+    compile_shape_structure,
+    get_cached_shape_plan,
+    get_fingerprint,
+    shape_plan_cache,
+)
+from test_app.models import Author, Book
+from test_app.serializers import DynamicAuthorSerializer, DynamicBookSerializer
+
+
+class ShapePlanTests(TestCase):
+    def setUp(self):
+        shape_plan_cache.clear()
+        self.author = Author.objects.create(name="Author", bio="Bio")
+        Book.objects.create(
+            title="Book",
+            author=self.author,
+            price="10.00",
+            publication_date=datetime.date(2024, 1, 1),
+        )
+
+    def test_compiled_plan_is_precomputed(self):
+        condition = lambda instance, ctx: True
+        plan = compile_shape_plan(
+            fields=["id", "title", "author", "hidden"],
+            rename_fields={"title": "name"},
+            conditional_fields={"id": condition},
+            nested={
+                "author": {"serializer": DynamicAuthorSerializer, "fields": ["name"]},
+                "hidden": {"serializer": DynamicAuthorSerializer, "write_only": True},
+                "other": {"serializer": DynamicAuthorSerializer},
+            },
+        )
+
+        self.assertEqual(plan.fields, frozenset(["id", "title", "author", "hidden"]))
+        self.assertEqual(plan.renames, (("title", "name"),))
+        self.assertEqual(plan.conditions, (("id", condition),))
+        self.assertEqual([name for name, _ in plan.nested], ["author"])
+        self.assertEqual(plan.write_only_nested, ("hidden",))
+        self.assertEqual(plan.nested_plans["author"].fields, frozenset(["name"]))
+        self.assertTrue(plan.includes("title"))
+        self.assertFalse(plan.includes("price"))
+
+    def test_plan_is_immutable(self):
+        plan = compile_shape_plan(fields=["id"])
+        with self.assertRaises(AttributeError):
+            plan.fields = None
+        with self.assertRaises(TypeError):
+            plan.nested_plans["author"] = plan
+
+    def test_equal_configurations_share_a_plan(self):
+        first = DynamicBookSerializer(
+            fields=["id", "title"], rename_fields={"title": "name"}
+        )
+        second = DynamicBookSerializer(
+            fields=["id", "title"], rename_fields={"title": "name"}
+        )
+
+        self.assertIs(first.get_shape_plan(), second.get_shape_plan())
+        self.assertEqual(len(shape_plan_cache), 1)
+
+    def test_plan_is_compiled_once_per_shape(self):
+        books = Book.objects.all()
+        config = {
+            "fields": ["title", "author"],
+            "nested": {"author": {"serializer": DynamicAuthorSerializer}},
+        }
+        with mock.patch(
+            "shapeless_serializers.shapes.compile_shape_structure",
+            wraps=compile_shape_structure,
+        ) as compile_mock:
+            for _ in range(3):
+                DynamicBookSerializer(books, many=True, **config).data
+
+        # One structure for the book level and one for the author level.
+        self.assertEqual(compile_mock.call_count, 2)
+
+    def test_replaced_configuration_is_recompiled(self):
+        serializer = DynamicBookSerializer(fields=["id", "title"])
+        plan = serializer.get_shape_plan()
+
+        serializer._fields = ["id"]
+
+        self.assertIsNot(serializer.get_shape_plan(), plan)
+        self.assertEqual(serializer.get_shape_plan().fields, frozenset(["id"]))
+
+    def test_cache_is_bounded(self):
+        cache = ShapePlanCache(maxsize=2)
+        plans = [compile_shape_plan(fields=[str(index)]) for index in range(3)]
+        cache.set("a", plans[0])
+        cache.set("b", plans[1])
+        cache.get("a")
+        cache.set("c", plans[2])
+
+        self.assertEqual(len(cache), 2)
+        self.assertIs(cache.get("a"), plans[0])
+        self.assertIsNone(cache.get("b"))
+
+    def test_fingerprint_is_canonical(self):
+        self.assertEqual(
+            get_fingerprint({"a": ["x", "y"], "b": {"c": 1}}),
+            get_fingerprint({"a": ["x", "y"], "b": {"c": 1}}),
+        )
+        self.assertEqual(get_fingerprint({"x", "y"}), get_fingerprint({"y", "x"}))
+        self.assertNotEqual(
+            get_fingerprint({"a": 1, "b": 2}), get_fingerprint({"b": 2, "a": 1})
+        )
+        self.assertNotEqual(get_fingerprint({"a": 1}), get_fingerprint({"a": True}))
+        self.assertNotEqual(get_fingerprint(["a"]), get_fingerprint(("a",)))
+
+    def test_unhashable_configuration_is_not_cached(self):
+        plan = get_cached_shape_plan(rename_fields={"id": bytearray(b"key")})
+
+        self.assertEqual(len(shape_plan_cache), 0)
+        self.assertEqual(plan.renames[0][0], "id")
+
+    def test_configuration_with_identity_values_shares_the_structure(self):
+        for _ in range(3):
+            condition = lambda instance, ctx: True
+            author = DynamicAuthorSerializer(fields=["name"])
+            serializer = DynamicBookSerializer(
+                fields=["title", "author"],
+                conditional_fields={"title": condition},
+                nested={"author": author},
+            )
+            plan = serializer.get_shape_plan()
+
+            self.assertEqual(plan.conditions, (("title", condition),))
+            self.assertEqual(plan.nested, (("author", author),))
+
+        self.assertEqual(len(shape_plan_cache), 1)
+
+    def test_rename_order_does_not_depend_on_the_cached_configuration(self):
+        book = Book.objects.get()
+        first = DynamicBookSerializer(
+            book, fields=["id", "title"], rename_fields={"id": "key", "title": "name"}
+        )
+        second = DynamicBookSerializer(
+            book, fields=["id", "title"], rename_fields={"title": "name", "id": "key"}
+        )
+
+        self.assertEqual(list(first.data), ["key", "name"])
+        self.assertEqual(list(second.data), ["name", "key"])
+
+    def test_invalid_configuration_is_rejected(self):
+        with self.assertRaises(DynamicSerializerConfigError):
+            compile_shape_plan(rename_fields=["title"])
+        with self.assertRaises(DynamicSerializerConfigError):
+            compile_shape_plan(nested={"author": "invalid"})
@@ -1,13 +1,19 @@
 import datetime
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.db.models import Count
 from django.test import TestCase
 from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.test import APIRequestFactory
 
 from shapeless_serializers.exceptions import DynamicSerializerConfigError
-from shapeless_serializers.serializers import ShapelessModelSerializer
+from shapeless_serializers.mixins.serializers import FieldCache
+from shapeless_serializers.serializers import (
+    ShapelessModelSerializer,
+    clear_field_cache,
+)
 from test_app.models import AuthorProfile, BlogPost, Category, Comment, PostLike, Tag
 from test_app.serializers import (
     DynamicAuthorProfileSerializer,
@@ -655,3 +661,227 @@ class TestShaplessModelSerializer(TestCase):
         self.assertIn("replier_name", reply_user_data)
         self.assertNotIn("username", reply_user_data)
         self.assertEqual(reply_user_data["replier_name"], "user2")
+
+
+class FieldCacheTests(TestCase):
+    def setUp(self):
+        clear_field_cache()
+        self.addCleanup(clear_field_cache)
+
+    def count_build_field(self, factory):
+        build_field = serializers.ModelSerializer.build_field
+        with mock.patch.object(
+            serializers.ModelSerializer,
+            "build_field",
+            autospec=True,
+            side_effect=build_field,
+        ) as mocked:
+            factory().fields
+        return mocked.call_count
+
+    def test_fields_are_built_once_per_class_and_selection(self):
+        def factory():
+            return DynamicBlogPostSerializer(fields=["id", "title", "tags"])
+
+        self.assertEqual(self.count_build_field(factory), 3)
+        self.assertEqual(self.count_build_field(factory), 0)
+        self.assertEqual(
+            self.count_build_field(lambda: DynamicBlogPostSerializer(fields=["id"])), 1
+        )
+
+    def test_instances_get_their_own_fields(self):
+        first = DynamicBlogPostSerializer(
+            fields=["id", "title", "tags"],
+            field_attributes={"title": {"help_text": "Changed"}},
+        )
+        second = DynamicBlogPostSerializer(fields=["id", "title", "tags"])
+
+        self.assertIsNot(first.fields["title"], second.fields["title"])
+        self.assertIsNot(first.fields["tags"], second.fields["tags"])
+        self.assertIs(first.fields["tags"].parent, first)
+        self.assertIs(
+            second.fields["tags"].child_relation.parent, second.fields["tags"]
+        )
+        self.assertEqual(first.fields["title"].help_text, "Changed")
+        self.assertIsNone(second.fields["title"].help_text)
+
+    def test_clones_do_not_share_mutable_attributes(self):
+        first = DynamicBlogPostSerializer(fields=["id", "title"]).fields["title"]
+        first.validators.append(lambda value: None)
+        first.error_messages["blank"] = "Changed"
+
+        second = DynamicBlogPostSerializer(fields=["id", "title"]).fields["title"]
+
+        self.assertEqual(len(second.validators), len(first.validators) - 1)
+        self.assertNotEqual(second.error_messages["blank"], "Changed")
+
+    def test_unknown_field_names_share_the_cache_entry(self):
+        self.count_build_field(lambda: DynamicBlogPostSerializer(fields=["id"]))
+
+        self.assertEqual(
+            self.count_build_field(
+                lambda: DynamicBlogPostSerializer(fields=["id", "unknown"])
+            ),
+            0,
+        )
+
+    def test_declared_fields_are_kept_after_a_narrower_selection(self):
+        class SummarySerializer(DynamicBlogPostSerializer):
+            summary = serializers.CharField(source="content")
+
+        post = BlogPost(title="Title", content="Content")
+        self.assertEqual(
+            SummarySerializer(post, fields=["title"]).data, {"title": "Title"}
+        )
+
+        self.assertEqual(
+            SummarySerializer(post, fields=["title", "summary"]).data,
+            {"title": "Title", "summary": "Content"},
+        )
+
+    def test_cache_is_bounded(self):
+        cache = FieldCache(maxsize=2)
+        cache.set((DynamicBlogPostSerializer, BlogPost, "a"), {})
+        cache.set((DynamicBlogPostSerializer, BlogPost, "b"), {})
+        cache.get((DynamicBlogPostSerializer, BlogPost, "a"))
+        cache.set((DynamicCommentSerializer, Comment, "c"), {})
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get((DynamicBlogPostSerializer, BlogPost, "a")))
+        self.assertIsNone(cache.get((DynamicBlogPostSerializer, BlogPost, "b")))
+
+        cache.clear(DynamicCommentSerializer)
+        self.assertEqual(len(cache), 1)
+
+    def test_constant_field_attributes_are_applied_once(self):
+        calls = []
+
+        def is_required(instance, context):
+            calls.append(instance)
+            return True
+
+        def factory():
+            return DynamicBlogPostSerializer(
+                fields=["id", "title", "tags"],
+                field_attributes={
+                    "title": {"help_text": "Title", "required": is_required},
+                    "tags": {"help_text": "Tags"},
+                },
+            )
+
+        apply = DynamicBlogPostSerializer._apply_attributes_to_field
+        with mock.patch.object(
+            DynamicBlogPostSerializer,
+            "_apply_attributes_to_field",
+            autospec=True,
+            side_effect=apply,
+        ) as mocked:
+            factory()
+            mocked.reset_mock()
+            serializer = factory()
+
+        self.assertEqual(mocked.call_count, 1)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(serializer.fields["title"].help_text, "Title")
+        self.assertTrue(serializer.fields["title"].required)
+        self.assertEqual(serializer.fields["tags"].help_text, "Tags")
+        self.assertIsNone(
+            DynamicBlogPostSerializer(fields=["id", "title", "tags"])
+            .fields["title"]
+            .help_text
+        )
+
+    def test_clear_field_cache(self):
+        def factory():
+            return DynamicBlogPostSerializer(fields=["id", "title"])
+
+        self.count_build_field(factory)
+        clear_field_cache(DynamicBlogPostSerializer)
+
+        self.assertEqual(self.count_build_field(factory), 2)
+
+    def test_cache_can_be_disabled(self):
+        class UncachedSerializer(DynamicBlogPostSerializer):
+            CACHE_FIELDS = False
+
+        def factory():
+            return UncachedSerializer(fields=["id", "title"])
+
+        self.count_build_field(factory)
+
+        self.assertEqual(self.count_build_field(factory), 2)
+
+
+class BatchRepresentationTests(TestCase):
+    def setUp(self):
+        user = User.objects.create(username="writer")
+        self.profile = AuthorProfile.objects.create(user=user, bio="Bio")
+        for index in range(3):
+            BlogPost.objects.create(
+                title=f"Post {index}",
+                slug=f"post-{index}",
+                author=self.profile,
+                content="Content",
+                publish_date=timezone.now(),
+            )
+
+    def test_list_serializer_represents_the_batch_at_once(self):
+        posts = list(BlogPost.objects.all())
+
+        class BatchSerializer(DynamicBlogPostSerializer):
+            batches = []
+
+            def represent_batch(self, instances):
+                self.batches.append(list(instances))
+                return super().represent_batch(instances)
+
+        data = BatchSerializer(posts, many=True, fields=["id", "title"]).data
+
+        self.assertEqual(BatchSerializer.batches, [posts])
+        self.assertEqual(len(data), 3)
+
+    def test_nested_scope_is_entered_once_per_batch(self):
+        serializer = DynamicBlogPostSerializer(
+            list(BlogPost.objects.all()),
+            many=True,
+            fields=["id", "author"],
+            nested={"author": DynamicAuthorProfileSerializer(fields=["bio"])},
+        )
+
+        with mock.patch.object(
+            DynamicBlogPostSerializer,
+            "_nested_scope",
+            autospec=True,
+            side_effect=DynamicBlogPostSerializer._nested_scope,
+        ) as nested_scope:
+            data = serializer.data
+
+        self.assertEqual(nested_scope.call_count, 2)
+        self.assertEqual(data[0]["author"], {"bio": "Bio"})
+
+    def test_aggregates_are_loaded_once_per_batch(self):
+        serializer = DynamicAuthorProfileSerializer(
+            list(AuthorProfile.objects.all()),
+            many=True,
+            aggregates={"post_count": Count("blog_posts")},
+        )
+
+        with mock.patch.object(
+            DynamicAuthorProfileSerializer,
+            "_load_aggregates",
+            autospec=True,
+            side_effect=DynamicAuthorProfileSerializer._load_aggregates,
+        ) as load_aggregates:
+            data = serializer.data
+
+        self.assertEqual(load_aggregates.call_count, 2)
+        self.assertEqual(data[0]["post_count"], 3)
+
+    def test_shape_is_validated_before_querying(self):
+        serializer = DynamicBlogPostSerializer(
+            BlogPost.objects.all(), many=True, rename_fields=["title"]
+        )
+
+        with self.assertNumQueries(0):
+            with self.assertRaises(DynamicSerializerConfigError):
+                serializer.data
@@ -0,0 +1,124 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import serializers
+
+from test_app.models import Author, AuthorProfile, BlogPost, Book, User
+from test_app.serializers import (
+    DynamicAuthorProfileSerializer,
+    DynamicBlogPostSerializer,
+    DynamicBookSerializer,
+)
+
+
+class ValuesFastPathTests(TestCase):
+    def setUp(self):
+        author = Author.objects.create(name="Author", bio="Bio")
+        for index in range(3):
+            Book.objects.create(
+                title=f"Book {index}",
+                author=author,
+                price=Decimal(f"1{index}.50"),
+                publication_date=datetime.date(2024, 1, index + 1),
+            )
+
+        user = User.objects.create(username="writer")
+        profile = AuthorProfile.objects.create(user=user, bio="Bio")
+        for index in range(2):
+            BlogPost.objects.create(
+                title=f"Post {index}",
+                slug=f"post-{index}",
+                author=profile,
+                content="Content",
+                publish_date=timezone.now(),
+                is_featured=index == 1,
+            )
+
+    def serialize(self, serializer_class, queryset, **kwargs):
+        serializer = serializer_class(queryset, many=True, **kwargs)
+        self.assertIsNotNone(serializer.child.get_values_shape())
+        with mock.patch.object(
+            queryset.model, "from_db", side_effect=AssertionError("instantiated")
+        ):
+            data = serializer.data
+
+        serializer_class.AUTO_OPTIMIZE_QUERYSET = False
+        try:
+            expected = serializer_class(queryset, many=True, **kwargs).data
+        finally:
+            del serializer_class.AUTO_OPTIMIZE_QUERYSET
+
+        self.assertEqual(
+            [list(item.items()) for item in data],
+            [list(item.items()) for item in expected],
+        )
+        return data
+
+    def test_flat_shape_is_read_from_value_tuples(self):
+        data = self.serialize(DynamicBookSerializer, Book.objects.order_by("id"))
+
+        self.assertEqual(data[0]["price"], "10.50")
+        self.assertEqual(data[0]["publication_date"], "2024-01-01")
+        self.assertEqual(data[0]["author"], Author.objects.get().pk)
+
+    def test_fields_and_rename_fields(self):
+        data = self.serialize(
+            DynamicBlogPostSerializer,
+            BlogPost.objects.order_by("slug"),
+            fields=["id", "title", "author", "publish_date", "is_featured"],
+            rename_fields={"title": "headline", "author": "author_id"},
+        )
+
+        self.assertEqual(
+            list(data[1]),
+            ["id", "publish_date", "is_featured", "headline", "author_id"],
+        )
+        self.assertIs(data[1]["is_featured"], True)
+
+    def test_shapes_that_need_instances_are_not_compiled(self):
+        class SummarySerializer(DynamicBlogPostSerializer):
+            summary = serializers.SerializerMethodField()
+
+            def get_summary(self, obj):
+                return obj.title
+
+        unsupported = [
+            SummarySerializer(fields=["id", "summary"]),
+            DynamicBlogPostSerializer(
+                fields=["id", "title", "author"],
+                nested={"author": DynamicAuthorProfileSerializer(fields=["bio"])},
+            ),
+            DynamicBlogPostSerializer(
+                fields=["id"], conditional_fields={"id": lambda instance, ctx: True}
+            ),
+            DynamicBlogPostSerializer(fields=["id", "tags"]),
+        ]
+        for serializer in unsupported:
+            with self.subTest(serializer=serializer):
+                self.assertIsNone(serializer.get_values_shape())
+
+    def test_batch_hook_overrides_disable_the_fast_path(self):
+        class MarkedBlogPostSerializer(DynamicBlogPostSerializer):
+            def represent_batch(self, instances):
+                return [
+                    dict(item, marked=True)
+                    for item in super().represent_batch(instances)
+                ]
+
+        serializer = MarkedBlogPostSerializer(
+            BlogPost.objects.order_by("id"), many=True, fields=["id", "title"]
+        )
+
+        self.assertIsNone(serializer.child.get_values_shape())
+        self.assertTrue(all(item["marked"] for item in serializer.data))
+
+    def test_unused_nested_branches_do_not_disable_the_fast_path(self):
+        serializer = DynamicBlogPostSerializer(
+            fields=["id", "title"],
+            nested={"author": DynamicAuthorProfileSerializer(fields=["bio"])},
+        )
+
+        self.assertIsNotNone(serializer.get_values_shape())